@@ -0,0 +1,27 @@
+"""Add composite indexes for per-user date range queries
+
+Databases created with init_db.py already have these indexes and should
+be stamped instead: `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index("idx_tx_user_created", "transactions", ["user_id", "created_at"])
+    op.create_index("idx_ci_user_date", "credit_inquiries", ["user_id", "inquiry_date"])
+    op.create_index("idx_ra_user_date", "risk_analyses", ["user_id", "analysis_date"])
+    op.create_index("idx_rass_cust_date", "risk_assessments", ["customer_id", "assessment_date"])
+
+def downgrade() -> None:
+    op.drop_index("idx_rass_cust_date", table_name="risk_assessments")
+    op.drop_index("idx_ra_user_date", table_name="risk_analyses")
+    op.drop_index("idx_ci_user_date", table_name="credit_inquiries")
+    op.drop_index("idx_tx_user_created", table_name="transactions")
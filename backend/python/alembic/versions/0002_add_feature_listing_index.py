@@ -0,0 +1,21 @@
+"""Add composite index for filtered feature listings
+
+Databases created with init_db.py already have this index and should
+be stamped instead: `alembic stamp 0002`.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index("idx_feature_active_type_name", "features", ["is_active", "data_type", "name"])
+
+def downgrade() -> None:
+    op.drop_index("idx_feature_active_type_name", table_name="features")
@@ -0,0 +1,26 @@
+"""Make the feature value (feature_id, entity_id) index unique
+
+set_feature_value upserts on this key. Duplicate rows must be removed
+before upgrading or the index build fails.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# The new index is built before the old one is dropped so the feature_id
+# foreign key always has a supporting index on MySQL
+
+def upgrade() -> None:
+    op.create_index("uq_feature_value_entity", "feature_values", ["feature_id", "entity_id"], unique=True)
+    op.drop_index("idx_feature_entity", table_name="feature_values")
+
+def downgrade() -> None:
+    op.create_index("idx_feature_entity", "feature_values", ["feature_id", "entity_id"])
+    op.drop_index("uq_feature_value_entity", table_name="feature_values")
@@ -0,0 +1,23 @@
+"""Add indexes for feature list category/status and tag filters
+
+Databases created with init_db.py already have these indexes and should
+be stamped instead: `alembic stamp 0004`.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index("idx_feature_category_active", "features", ["category", "is_active"])
+    op.create_index("idx_feature_tags_tag_feature", "feature_tags", ["tag_id", "feature_id"])
+
+def downgrade() -> None:
+    op.drop_index("idx_feature_tags_tag_feature", table_name="feature_tags")
+    op.drop_index("idx_feature_category_active", table_name="features")
@@ -0,0 +1,159 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from uuid import uuid4
+import asyncio
+import logging
+
+from cachetools import TTLCache
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+def request_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> str:
+    """
+    Build a cache key from the request path and query string.
+    The default builder hashes every endpoint argument, including the
+    per-request DB session, so it would never produce a hit.
+    """
+    if request is None:
+        return f"{namespace}:{func.__module__}:{func.__name__}"
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{namespace}:{request.url.path}?{query}"
+
+async def init_cache() -> None:
+    """
+    Initialize the response cache.
+    Uses Redis when REDIS_URL is configured, otherwise a per-process in-memory cache.
+    """
+    # Imported here so routers that only need the in-process caches stay light
+    from fastapi_cache import FastAPICache
+    from fastapi_cache.backends.inmemory import InMemoryBackend
+
+    if settings.REDIS_URL:
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+
+        redis = aioredis.from_url(settings.REDIS_URL)
+        backend = RedisBackend(redis)
+        logger.info("Response cache using Redis backend")
+    else:
+        backend = InMemoryBackend()
+        logger.info("REDIS_URL not set, response cache using in-memory backend")
+
+    FastAPICache.init(
+        backend,
+        prefix="riskai-cache",
+        expire=settings.CACHE_TTL,
+        key_builder=request_key_builder
+    )
+
+# Shared entries live under their namespace's current generation, so clearing a
+# namespace is one write instead of a key scan. The generation marker outlives
+# every entry, so a namespace never falls back to a generation still in use.
+SHARED_GENERATION_TTL = settings.CACHE_TTL_LONG
+
+def _shared_backend():
+    """The shared response cache backend, or None before ``init_cache`` has run."""
+    from fastapi_cache import FastAPICache
+
+    try:
+        return FastAPICache.get_backend()
+    except AssertionError:
+        return None
+
+def _generation_key(namespace: str) -> str:
+    from fastapi_cache import FastAPICache
+
+    return f"{FastAPICache.get_prefix()}:{namespace}:generation"
+
+async def get_or_load_shared(
+    namespace: str,
+    key: str,
+    loader: Callable[[], Awaitable[bytes]],
+    expire: Optional[int] = None
+) -> bytes:
+    """
+    Read-through cache of encoded JSON bodies in the shared response cache backend.
+    With Redis configured every worker sees the same entries; ``clear_shared``
+    drops a whole namespace after writes.
+    """
+    from fastapi_cache import FastAPICache
+
+    backend = _shared_backend()
+    if backend is None or not FastAPICache.get_enable():
+        return await loader()
+
+    generation = await backend.get(_generation_key(namespace))
+    if isinstance(generation, bytes):
+        generation = generation.decode()
+    cache_key = f"{FastAPICache.get_prefix()}:{namespace}:{generation or 0}:{key}"
+    body = await backend.get(cache_key)
+    if body is None:
+        body = await loader()
+        await backend.set(cache_key, body, expire or settings.SHARED_CACHE_TTL)
+    return body
+
+async def clear_shared(namespace: str) -> None:
+    """Drop every shared entry under ``namespace`` by moving it to a new generation."""
+    backend = _shared_backend()
+    if backend is not None:
+        await backend.set(_generation_key(namespace), uuid4().hex.encode(), SHARED_GENERATION_TTL)
+
+class ResponseBodyCache:
+    """
+    Per-process TTL cache of encoded JSON bodies for read-mostly endpoints.
+    Concurrent misses on the same key wait on one loader instead of each
+    hitting the database.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._bodies: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        """Return the cached body for ``key``, loading it on a miss. ``None`` results are not cached."""
+        body = self._bodies.get(key)
+        if body is not None:
+            return body
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                body = self._bodies.get(key)
+                if body is None:
+                    body = await loader()
+                    if body is not None:
+                        self._bodies[key] = body
+        finally:
+            if self._locks.get(key) is lock and not lock.locked():
+                del self._locks[key]
+        return body
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key`` so the next read reloads it."""
+        self._bodies.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached body."""
+        self._bodies.clear()
+
+FEATURE_CACHE = ResponseBodyCache(settings.RESPONSE_CACHE_MAXSIZE, settings.RESPONSE_CACHE_TTL)
+SQL_SET_CACHE = ResponseBodyCache(settings.RESPONSE_CACHE_MAXSIZE, settings.RESPONSE_CACHE_TTL)
+SQL_SET_STATS_CACHE = ResponseBodyCache(settings.RESPONSE_CACHE_MAXSIZE, settings.STATS_CACHE_TTL)
+FEATURE_LIST_CACHE = ResponseBodyCache(settings.RESPONSE_CACHE_MAXSIZE, settings.RESPONSE_CACHE_TTL)
+RESPONSE_BODY_CACHES = (FEATURE_CACHE, SQL_SET_CACHE, SQL_SET_STATS_CACHE, FEATURE_LIST_CACHE)
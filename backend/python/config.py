@@ -1,10 +1,13 @@
 from pydantic_settings import BaseSettings
 from typing import List, Optional
+from functools import lru_cache
+from types import MappingProxyType
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file; test harnesses set RISKAI_SKIP_DOTENV=1
+if os.getenv("RISKAI_SKIP_DOTENV") != "1":
+    load_dotenv()
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -20,6 +23,10 @@ class Settings(BaseSettings):
     FEATURE_API_URL: str = "https://api.featuremanagement.com/v1"
     FEATURE_API_KEY: str = ""  # Set this via environment variable
     FEATURE_API_TIMEOUT: int = 30  # seconds
+    FEATURE_API_CONNECT_TIMEOUT: float = 1.0  # seconds to open a connection, so an unreachable host fails fast
+    FEATURE_API_MAX_CONNECTIONS: int = 1000  # Per-process cap on open connections to the API
+    FEATURE_API_MAX_KEEPALIVE: int = 100  # Idle connections kept open for reuse
+    FEATURE_API_HTTP2: bool = True  # Multiplex requests over one connection; negotiated on https URLs only
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"  # Change in production
@@ -46,6 +53,18 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "riskai_password")
     DB_NAME: str = os.getenv("DB_NAME", "risk_ai")
     
+    # Connection pool settings
+    DB_POOL_SIZE: int = 20  # Persistent connections kept per worker
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed under burst load
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = False  # Extra round-trip per checkout; enable only behind flaky proxies
+    DB_POOL_RECYCLE: int = 300  # seconds, keep below the server's wait_timeout
+    DB_POOL_USE_LIFO: bool = True  # Reuse the most recently returned connection first
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQLAlchemy compiled statement cache size (default 500)
+    DB_HEALTH_CHECK_INTERVAL: int = 5  # seconds between background connectivity checks
+    DB_REQUIRED_AT_STARTUP: bool = False  # Refuse to start when the database is unreachable
+    AUTO_CREATE_TABLES: bool = False  # Run create_all on startup; for local development only
+    
     # API settings
     API_V1_PREFIX: str = "/api/v1"
     
@@ -58,28 +77,48 @@ class Settings(BaseSettings):
         "http://localhost:8000",  # FastAPI backend
     ]
     
-    # Logging settings
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    
     # Rate limiting settings
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_PERIOD: int = 60  # seconds
     
     # Cache settings
     CACHE_TTL: int = 300  # seconds
+    CACHE_TTL_LONG: int = 3600  # seconds, for data that rarely changes
+    REDIS_URL: Optional[str] = None  # Falls back to an in-memory cache when unset
+    RESPONSE_CACHE_TTL: int = 30  # seconds, in-process cache for single-row GETs
+    RESPONSE_CACHE_MAXSIZE: int = 10000  # entries per in-process response cache
+    STATS_CACHE_TTL: int = 5  # seconds, for aggregate stats endpoints
+    SHARED_CACHE_TTL: int = 15  # seconds, cross-worker cache for list endpoints
+    MODEL_STATE_CACHE_TTL: int = 5  # seconds, in-process cache of the model API's cutoff and state
+    MODEL_API_CACHE_TTL: int = 60  # seconds, shared cache of the model API's metrics, cutoff and feature importance
+    RISK_FACTOR_CACHE_TTL: int = 30  # seconds, in-process cache of the active risk factors
+    FEATURE_RULES_CACHE_TTL: int = 30  # seconds, in-process cache of per-feature validation rules
+    FEATURE_VALUE_CACHE_TTL: int = 30  # seconds, in-process cache of per-user feature values from the feature API
+    FEATURE_MISS_CACHE_TTL: int = 5  # seconds, feature values the feature API could not supply
     
     class Config:
         case_sensitive = True
         env_file = ".env"
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings once per process."""
+    if os.getenv("RISKAI_SKIP_DOTENV") == "1":
+        return Settings(_env_file=None)
+    return Settings()
+
 # Create global settings instance
-settings = Settings()
+settings = get_settings()
 
 # Database URL
-DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+DATABASE_URL = f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+
+# Pre-encoded bearer token so HTTP clients skip the str -> bytes conversion per request
+FEATURE_API_AUTH_BYTES = f"Bearer {settings.FEATURE_API_KEY}".encode("ascii") if settings.FEATURE_API_KEY else b""
 
-# Feature system API headers
-FEATURE_API_HEADERS = {
-    "Authorization": f"Bearer {settings.FEATURE_API_KEY}",
+# Feature system API headers, read-only since they are shared by every request
+FEATURE_API_HEADERS = MappingProxyType({
+    "Authorization": FEATURE_API_AUTH_BYTES,
     "Content-Type": "application/json"
-} if settings.FEATURE_API_KEY else {"Content-Type": "application/json"} 
\ No newline at end of file
+} if settings.FEATURE_API_KEY else {"Content-Type": "application/json"})
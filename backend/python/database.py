@@ -1,83 +1,108 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 import logging
-from typing import Generator
+from typing import Any, AsyncGenerator, List, Tuple
 
 from .config import DATABASE_URL, settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create SQLAlchemy engine
-engine = create_engine(
+# Create async SQLAlchemy engine
+engine = create_async_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_size=5,  # Set connection pool size
-    max_overflow=10,  # Allow up to 10 connections beyond pool_size
+    pool_pre_ping=settings.DB_POOL_PRE_PING,  # Per-checkout health check, off by default
+    pool_recycle=settings.DB_POOL_RECYCLE,  # Replace connections before the server drops them
+    pool_size=settings.DB_POOL_SIZE,  # Sized for concurrent request handling
+    max_overflow=settings.DB_MAX_OVERFLOW,  # Burst connections beyond pool_size
+    pool_timeout=settings.DB_POOL_TIMEOUT,  # Wait for a free connection before failing
+    pool_use_lifo=settings.DB_POOL_USE_LIFO,  # Let idle overflow connections age out
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,  # Compiled statement cache entries
     echo=settings.LOG_LEVEL == "DEBUG"  # Enable SQL query logging in debug mode
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects stay loaded after commit so that
+# serializing them does not trigger lazy I/O outside the event loop.
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Connectivity probe, built once rather than on every check
+_PING = text("SELECT 1")
 
 # Create declarative base
 Base = declarative_base()
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function to get database session.
-    Yields a database session and ensures it's closed after use.
+    Yields an async database session and ensures it's closed after use.
+    Closing the session already rolls back any open transaction, so the
+    error path only logs instead of issuing a second ROLLBACK.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception as e:
-        logger.error(f"Database session error: {e}")
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    async with SessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            raise
 
-@contextmanager
-def get_db_context() -> Generator[Session, None, None]:
+@asynccontextmanager
+async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
     """
     Context manager for database sessions.
     Provides a safe way to handle database transactions.
     """
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception as e:
-        logger.error(f"Database transaction error: {e}")
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    async with SessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Database transaction error: {e}")
+            await db.rollback()
+            raise
+
+async def fetch_page(db: AsyncSession, query: Select, offset: int, limit: int) -> Tuple[List[Any], int]:
+    """
+    Fetch one page of a single-entity query together with the unpaged total.
+    The total rides along as COUNT(*) OVER (), so a page costs one round-trip;
+    only a page past the end needs a separate count.
+    """
+    result = await db.execute(query.add_columns(func.count().over()).offset(offset).limit(limit))
+    rows = result.all()
+    if rows:
+        return [row[0] for row in rows], rows[0][-1]
+    if offset:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        return [], total
+    return [], 0
 
-def init_db() -> None:
+async def init_db() -> None:
     """
     Initialize the database by creating all tables.
     """
     try:
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
 
-def check_db_connection() -> bool:
+async def check_db_connection() -> bool:
     """
     Check if the database connection is working.
     Returns True if connection is successful, False otherwise.
     """
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        async with SessionLocal() as db:
+            await db.execute(_PING)
         return True
     except Exception as e:
         logger.error(f"Database connection check failed: {e}")
-        return False 
\ No newline at end of file
+        return False
@@ -1,13 +1,17 @@
+import asyncio
+
 from database import engine
 from models import Base
 
-def init_db():
+async def init_db():
     """
     Initialize the database by creating all tables
     """
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
 
 if __name__ == "__main__":
     print("Creating database tables...")
-    init_db()
-    print("Database tables created successfully!") 
\ No newline at end of file
+    asyncio.run(init_db())
+    print("Database tables created successfully!")
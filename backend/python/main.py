@@ -1,38 +1,155 @@
 from fastapi import FastAPI, Depends, HTTPException, Request, Query
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter, ValidationError
 from typing import Optional, Dict, Any, List
+import asyncio
+import contextlib
 import logging
-import time
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-import requests
 import os
+import queue
+import httpx
+import orjson
+import ahocorasick
 
-from .database import get_db, engine
+from .database import get_db, engine, check_db_connection
 from .models import Base
 from .config import settings
-from .services import risk_service, feature_service, model_service
-from .services.feature_service import FeatureService
-from .services.risk_service import RiskService
-from .routers import feature, sql
+from .responses import DirectJSONRoute, ORJSONResponse, dump_model, page_json_bytes, raw_json_response
+from .schemas import ChatMessage, FeatureCreate, FeaturePage, FeatureUpdate, FeatureUpdateRequest, Feature as FeatureSchema, FEATURE_PAGE_ADAPTER
+from .cache import FEATURE_CACHE, SQL_SET_STATS_CACHE, clear_shared, get_or_load_shared, init_cache
+from .middleware import ETagMiddleware, RateLimitMiddleware
+from fastapi_cache.decorator import cache
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from .routers import feature, model, risk_assessment, sql
+from .routers.feature import FEATURES_NAMESPACE
 
-# Configure logging
+# Configure logging. Handlers only enqueue records; a listener thread writes them,
+# so a burst of errors never blocks the event loop on the stream.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+log_listener = QueueListener(_log_queue, _log_stream_handler)
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Layout is applied by the listener
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[_log_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Services are stateless and shared across requests; the DB session is passed per call.
+# They are imported on first use so they stay out of the startup import graph; the
+# getters are cached, and async dependencies avoid a threadpool hop per request.
+async def feature_service_dependency():
+    from .services.feature_service import get_feature_service
+    return get_feature_service()
+
+async def risk_service_dependency():
+    from .services.risk_service import get_risk_service
+    return get_risk_service()
+
+async def model_service_dependency():
+    from .services.model_service import get_model_service
+    return get_model_service()
+
+# Free-form JSON object bodies are parsed and validated in one pass by a shared adapter
+JSON_OBJECT_ADAPTER = TypeAdapter(Dict[str, Any])
+
+async def json_object_body(request: Request) -> Dict[str, Any]:
+    """Dependency returning the request body as a JSON object."""
+    try:
+        return JSON_OBJECT_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
 
 app = FastAPI(
     title="Credit Risk AI Assistant API",
     description="API for credit risk analysis and model management",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
+# Handlers without a response_model are encoded by orjson directly, not via jsonable_encoder
+app.router.route_class = DirectJSONRoute
+
+# Create database tables in development only; deployments run init_db.py / Alembic out of band
+@app.on_event("startup")
+async def create_tables():
+    if not settings.AUTO_CREATE_TABLES:
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+@app.on_event("startup")
+async def startup_cache():
+    await init_cache()
+
+@app.on_event("startup")
+async def startup_db_check():
+    if await check_db_connection():
+        return
+    if settings.DB_REQUIRED_AT_STARTUP:
+        raise RuntimeError("Database is not reachable")
+    logger.warning("Database is not reachable at startup; /health reports it until it recovers")
+
+# Second-resolution ISO timestamp for health responses, refreshed by a background task
+_now_iso: str = datetime.utcnow().isoformat(timespec="seconds")
+_clock_task: Optional[asyncio.Task] = None
+
+async def _refresh_clock():
+    global _now_iso
+    while True:
+        _now_iso = datetime.utcnow().isoformat(timespec="seconds")
+        await asyncio.sleep(1)
+
+@app.on_event("startup")
+async def start_clock():
+    global _clock_task
+    _clock_task = asyncio.create_task(_refresh_clock())
+
+async def _cancel_task(task: Optional[asyncio.Task]) -> None:
+    """Cancel a background task and wait for it, so none outlives the app."""
+    if task is None:
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+@app.on_event("shutdown")
+async def stop_clock():
+    global _clock_task
+    await _cancel_task(_clock_task)
+    _clock_task = None
+
+# Last known database status, refreshed in the background so health probes never hit the DB
+_db_healthy: bool = False
+_db_heartbeat_task: Optional[asyncio.Task] = None
+
+async def _db_heartbeat():
+    global _db_healthy
+    while True:
+        _db_healthy = await check_db_connection()
+        await asyncio.sleep(settings.DB_HEALTH_CHECK_INTERVAL)
+
+@app.on_event("startup")
+async def start_db_heartbeat():
+    global _db_heartbeat_task
+    _db_heartbeat_task = asyncio.create_task(_db_heartbeat())
+
+@app.on_event("shutdown")
+async def stop_db_heartbeat():
+    global _db_heartbeat_task
+    await _cancel_task(_db_heartbeat_task)
+    _db_heartbeat_task = None
 
 # CORS middleware configuration
 app.add_middleware(
@@ -43,8 +160,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conditional GETs for endpoints dashboards poll
+app.add_middleware(
+    ETagMiddleware,
+    paths=(
+        r"/api/features",
+        r"/api/v1/features",
+        r"/api/v1/sql/sets",
+        r"/api/v1/sql/sets/\d+/stats",
+    ),
+)
+
 # Include routers
 app.include_router(feature.router)
+app.include_router(model.router)
+app.include_router(risk_assessment.router)
 app.include_router(sql.router)
 
 # OAuth2 scheme for authentication
@@ -53,23 +183,108 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 # Rasa server URL
 RASA_SERVER_URL = os.getenv("RASA_SERVER_URL", "http://rasa:5005")
 
-# Rate limiting middleware
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    client_ip = request.client.host
-    current_time = time.time()
-    
-    # Implement rate limiting logic here
-    # This is a simple example - you should implement proper rate limiting
-    
-    response = await call_next(request)
-    return response
+# Shared HTTP client for the Rasa server, created on startup so connections are kept alive
+rasa_client: Optional[httpx.AsyncClient] = None
+
+@app.on_event("startup")
+async def startup_rasa_client():
+    global rasa_client
+    rasa_client = httpx.AsyncClient(
+        base_url=RASA_SERVER_URL,
+        timeout=5.0,
+        limits=httpx.Limits(max_keepalive_connections=10)
+    )
+
+@app.on_event("shutdown")
+async def shutdown_rasa_client():
+    if rasa_client is not None:
+        await rasa_client.aclose()
+
+# Services hold pooled HTTP clients; close the ones that were created and drop
+# them so a restarted app builds fresh clients
+@app.on_event("shutdown")
+async def shutdown_service_clients():
+    from .services.feature_service import get_feature_service
+    from .services.model import get_model_api_service
+    from .services.model_service import get_model_service
+    for get_service in (get_feature_service, get_model_api_service, get_model_service):
+        if get_service.cache_info().currsize:
+            await get_service().aclose()
+            get_service.cache_clear()
+
+# Records logged before startup wait in the queue; stopping drains it before exit
+@app.on_event("startup")
+async def start_log_listener():
+    log_listener.start()
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    log_listener.stop()
+
+# Chat keyword rules, checked in order; a rule fires when all of its keywords appear
+CHAT_FALLBACK_RESPONSE = "I'm sorry, I'm having trouble understanding that right now. Could you try rephrasing your question?"
+CHAT_RULES = [
+    (("performance",), "Our current model performance metrics show an accuracy of 82% and a precision of 80%."),
+    (("risk", "user"), "To analyze risk for a specific user, please provide their user ID."),
+    (("approval rate",), "The current approval rate for all customers is 75%."),
+    (("risk scores",), "Risk scores are calculated based on multiple factors including credit history, income, and transaction patterns."),
+    (("calculate",), "Risk scores are calculated based on multiple factors including credit history, income, and transaction patterns."),
+    (("features", "important"), "The most important features for risk assessment are credit history, income level, and payment behavior."),
+    (("rejected",), "To understand why a user was rejected, please provide their user ID for detailed analysis."),
+    (("cutoff",), "The current risk cutoff threshold is 0.75. You can adjust this in the Model Adjustments section."),
+]
+
+def _build_chat_matcher():
+    """
+    Compile every chat keyword into a single Aho-Corasick automaton.
+    Each keyword maps to a bit so a message is scanned once and the
+    matched keywords come back as a bitmask.
+    """
+    keyword_bits = {}
+    automaton = ahocorasick.Automaton()
+    for keywords, _ in CHAT_RULES:
+        for keyword in keywords:
+            if keyword not in keyword_bits:
+                keyword_bits[keyword] = 1 << len(keyword_bits)
+                automaton.add_word(keyword, keyword_bits[keyword])
+    automaton.make_automaton()
+
+    rules = []
+    for keywords, text in CHAT_RULES:
+        mask = 0
+        for keyword in keywords:
+            mask |= keyword_bits[keyword]
+        rules.append((mask, text))
+    return automaton, rules
+
+CHAT_AUTOMATON, CHAT_RULE_MASKS = _build_chat_matcher()
+
+def match_chat_response(message: str) -> str:
+    """Return the response for the first rule whose keywords all appear in the message."""
+    matched = 0
+    for _, bit in CHAT_AUTOMATON.iter(message.lower()):
+        matched |= bit
+    for mask, text in CHAT_RULE_MASKS:
+        if matched & mask == mask:
+            return text
+    return CHAT_FALLBACK_RESPONSE
+
+# Rate limiting, shared across workers through Redis when REDIS_URL is set
+RATE_LIMIT = f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds"
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.REDIS_URL or "memory://",
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(RateLimitMiddleware)
 
 # Error handling middleware
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global error: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
@@ -77,41 +292,27 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    if not _db_healthy:
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "database": "unreachable", "timestamp": _now_iso}
+        )
+    return {"status": "healthy", "database": "ok", "timestamp": _now_iso}
 
 # Chatbot endpoints
 @app.post("/api/chat/message")
-async def send_message(request_data: Dict[str, Any]):
+async def send_message(body: ChatMessage):
     """
     Handle chat messages and return responses
     """
     try:
-        # Extract message from request
-        message = request_data.get("message", "")
-        sender_id = request_data.get("sender_id", "default_user")
+        message = body.message
         
         if not message:
             raise HTTPException(status_code=400, detail="Message is required")
         
-        # Simple response logic
-        response_text = "I'm sorry, I'm having trouble understanding that right now. Could you try rephrasing your question?"
-        
-        # Basic keyword matching
-        message_lower = message.lower()
-        if "performance" in message_lower:
-            response_text = "Our current model performance metrics show an accuracy of 82% and a precision of 80%."
-        elif "risk" in message_lower and "user" in message_lower:
-            response_text = "To analyze risk for a specific user, please provide their user ID."
-        elif "approval rate" in message_lower:
-            response_text = "The current approval rate for all customers is 75%."
-        elif "risk scores" in message_lower or "calculate" in message_lower:
-            response_text = "Risk scores are calculated based on multiple factors including credit history, income, and transaction patterns."
-        elif "features" in message_lower and "important" in message_lower:
-            response_text = "The most important features for risk assessment are credit history, income level, and payment behavior."
-        elif "rejected" in message_lower:
-            response_text = "To understand why a user was rejected, please provide their user ID for detailed analysis."
-        elif "cutoff" in message_lower:
-            response_text = "The current risk cutoff threshold is 0.75. You can adjust this in the Model Adjustments section."
+        # Single pass over the message with the precompiled keyword matcher
+        response_text = match_chat_response(message)
         
         return {"responses": [{"text": response_text}]}
     
@@ -125,142 +326,192 @@ async def check_chatbot_health():
     Check if the Rasa chatbot is healthy and responsive
     """
     try:
-        response = requests.get(f"{RASA_SERVER_URL}/status")
+        response = await rasa_client.get("/status")
         
-        if response.ok:
+        if response.is_success:
             return {
                 "status": "healthy",
                 "rasa_status": response.json(),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso
             }
         else:
             return {
                 "status": "unhealthy",
                 "detail": "Rasa server returned an error",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso
             }
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error connecting to Rasa: {e}")
         return {
             "status": "unhealthy",
             "detail": "Could not connect to Rasa server",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso
         }
 
 # Risk Analysis endpoints
 @app.get("/api/risk-analysis/{user_id}")
+@limiter.limit(RATE_LIMIT)
 async def get_risk_analysis(
+    request: Request,
     user_id: str,
     period: str = "30d",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ):
+    # Not cached: every analysis is recorded in the user's RiskAnalysis history
     try:
-        return await risk_service.analyze_user_risk(user_id, period, db)
+        return await risk_service.analyze_user_risk(db, user_id, period)
     except Exception as e:
         logger.error(f"Error analyzing risk for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/risk-analysis/{user_id}/summary")
+@cache(expire=settings.CACHE_TTL)
 async def get_risk_summary(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ):
     try:
-        return await risk_service.get_risk_summary(user_id, db)
+        return await risk_service.get_risk_summary(db, user_id)
     except Exception as e:
         logger.error(f"Error getting risk summary for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _ndjson(rows):
+    """Encode an async iterator of dicts as newline-delimited JSON."""
+    async for row in rows:
+        yield orjson.dumps(row) + b"\n"
+
 @app.get("/api/risk-analysis/{user_id}/transactions")
 async def get_user_transactions(
     user_id: str,
     period: str = "30d",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ):
+    """
+    Stream the user's transactions as NDJSON, one transaction per line.
+    """
     try:
-        return await risk_service.get_user_transactions(user_id, period, db)
+        rows = risk_service.stream_user_transactions(db, user_id, period)
+        return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
     except Exception as e:
         logger.error(f"Error getting transactions for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/risk-analysis/{user_id}/factors")
-async def get_risk_factors(
+@app.get("/api/risk-analysis/{user_id}/factors", operation_id="get_user_risk_factors")
+@cache(expire=settings.CACHE_TTL)
+async def get_user_risk_factors(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ):
     try:
-        return {"risk_factors": await risk_service.get_risk_factors(user_id, db)}
+        return {"risk_factors": await risk_service.get_risk_factors(db, user_id)}
     except Exception as e:
         logger.error(f"Error getting risk factors for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/risk-analysis/{user_id}/decision")
+@cache(expire=settings.CACHE_TTL)
 async def get_decision_explanation(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ):
     try:
-        return await risk_service.get_decision_explanation(user_id, db)
+        return await risk_service.get_decision_explanation(db, user_id)
     except Exception as e:
         logger.error(f"Error getting decision explanation for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Feature Management endpoints
-@app.get("/api/features")
+@app.get("/api/features", responses={200: {"model": FeaturePage}})
 async def get_features(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
-) -> Dict:
+    db: AsyncSession = Depends(get_db),
+    feature_service=Depends(feature_service_dependency)
+):
     """
     Get paginated list of features.
     """
+    async def load() -> bytes:
+        features, total = await feature_service.get_feature_page(db, skip=(page - 1) * page_size, limit=page_size)
+        return page_json_bytes(
+            FEATURE_PAGE_ADAPTER,
+            FeatureSchema,
+            features,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=-(-total // page_size)
+        )
+
     try:
-        feature_service = FeatureService(db)
-        return await feature_service.get_features(page=page, page_size=page_size)
+        return raw_json_response(await get_or_load_shared(FEATURES_NAMESPACE, f"page:{page}:{page_size}", load))
     except Exception as e:
         logger.error(f"Error getting features: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/features")
+@app.post("/api/features", responses={200: {"model": FeatureSchema}})
 async def create_feature(
-    feature_data: Dict,
-    db: Session = Depends(get_db)
-) -> Dict:
+    feature_data: FeatureCreate,
+    db: AsyncSession = Depends(get_db),
+    feature_service=Depends(feature_service_dependency)
+):
     """
     Create a new feature.
     """
     try:
-        feature_service = FeatureService(db)
-        return await feature_service.create_feature(feature_data)
+        feature = await feature_service.create_feature(db, feature_data)
+        SQL_SET_STATS_CACHE.invalidate(feature.sql_set_id)
+        await clear_shared(FEATURES_NAMESPACE)
+        return ORJSONResponse(content=dump_model(FeatureSchema, feature))
     except Exception as e:
         logger.error(f"Error creating feature: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.put("/api/features")
+@app.put("/api/features", responses={200: {"model": FeatureSchema}})
 async def update_feature(
-    feature_data: Dict,
-    db: Session = Depends(get_db)
-) -> Dict:
+    feature_data: FeatureUpdateRequest,
+    db: AsyncSession = Depends(get_db),
+    feature_service=Depends(feature_service_dependency)
+):
     """
     Update an existing feature.
     """
+    feature_id = feature_data.id
+    feature_update = FeatureUpdate(**feature_data.model_dump(exclude={"id"}, exclude_unset=True))
     try:
-        feature_service = FeatureService(db)
-        return await feature_service.update_feature(feature_data)
+        feature = await feature_service.update_feature(db, feature_id, feature_update)
+        if feature is None:
+            raise HTTPException(status_code=404, detail="Feature not found")
+        FEATURE_CACHE.invalidate(feature_id)
+        if "sql_set_id" in feature_update.model_fields_set:
+            # The feature may have left another set, whose id is no longer known
+            SQL_SET_STATS_CACHE.clear()
+        else:
+            SQL_SET_STATS_CACHE.invalidate(feature.sql_set_id)
+        await clear_shared(FEATURES_NAMESPACE)
+        return ORJSONResponse(content=dump_model(FeatureSchema, feature))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating feature: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/features/importance")
+@cache(expire=settings.CACHE_TTL_LONG)
 async def get_feature_importance(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    feature_service=Depends(feature_service_dependency)
 ) -> List[Dict]:
     """
     Get feature importance information.
     """
     try:
-        feature_service = FeatureService(db)
         return await feature_service.get_feature_importance()
     except Exception as e:
         logger.error(f"Error getting feature importance: {e}")
@@ -268,8 +519,10 @@ async def get_feature_importance(
 
 # Model Management endpoints
 @app.get("/api/model/metrics")
+@cache(expire=settings.CACHE_TTL)
 async def get_model_metrics(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    model_service=Depends(model_service_dependency)
 ):
     try:
         return await model_service.get_model_metrics(db)
@@ -278,22 +531,25 @@ async def get_model_metrics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/model/cutoff")
+@cache(expire=settings.CACHE_TTL_LONG)
 async def get_model_cutoff(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    model_service=Depends(model_service_dependency)
 ):
     try:
-        return {"cutoff": await model_service.get_model_cutoff(db)}
+        return {"cutoff": await model_service.get_model_cutoff()}
     except Exception as e:
         logger.error(f"Error fetching model cutoff: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/model/adjustments")
 async def create_model_adjustment(
-    adjustment_data: dict,
-    db: Session = Depends(get_db)
+    adjustment_data: Dict[str, Any] = Depends(json_object_body),
+    db: AsyncSession = Depends(get_db),
+    model_service=Depends(model_service_dependency)
 ):
     try:
-        return await model_service.record_model_adjustment(adjustment_data, db)
+        return await model_service.record_model_adjustment(db, adjustment_data)
     except Exception as e:
         logger.error(f"Error recording model adjustment: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -301,52 +557,58 @@ async def create_model_adjustment(
 @app.get("/api/model/adjustments")
 async def get_adjustment_history(
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    model_service=Depends(model_service_dependency)
 ):
     try:
-        return {"adjustments": await model_service.get_adjustment_history(limit, db)}
+        return {"adjustments": await model_service.get_adjustment_history(db, limit)}
     except Exception as e:
         logger.error(f"Error fetching adjustment history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/metrics/approval-rate")
+@cache(expire=settings.CACHE_TTL)
 async def get_approval_rate(
     period: str = "30d",
     risk_level: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ):
     try:
-        return await risk_service.get_approval_rate(period, risk_level, db)
+        return await risk_service.get_approval_rate(db, period, risk_level)
     except Exception as e:
         logger.error(f"Error fetching approval rate: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Risk assessment endpoints
 @app.post("/api/risk/assess")
+@limiter.limit(RATE_LIMIT)
 async def assess_risk(
-    assessment_data: Dict,
-    db: Session = Depends(get_db)
+    request: Request,
+    assessment_data: Dict[str, Any] = Depends(json_object_body),
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ) -> Dict:
     """
     Perform risk assessment based on provided data.
     """
     try:
-        risk_service = RiskService(db)
-        return await risk_service.assess_risk(assessment_data)
+        return await risk_service.assess_risk(db, assessment_data)
     except Exception as e:
         logger.error(f"Error assessing risk: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/risk/factors")
-async def get_risk_factors(
-    db: Session = Depends(get_db)
+@app.get("/api/risk/factors", operation_id="list_risk_factors")
+@cache(expire=settings.CACHE_TTL)
+async def list_risk_factors(
+    db: AsyncSession = Depends(get_db),
+    risk_service=Depends(risk_service_dependency)
 ) -> List[Dict]:
     """
     Get list of risk factors and their weights.
     """
     try:
-        risk_service = RiskService(db)
-        return await risk_service.get_risk_factors()
+        return await risk_service.get_risk_factors(db)
     except Exception as e:
         logger.error(f"Error getting risk factors: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,102 @@
+from hashlib import blake2b
+from typing import Iterable, List, Pattern
+import re
+
+from slowapi.middleware import SlowAPIASGIMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+class ETagMiddleware:
+    """
+    Add a strong ETag to GET responses on selected paths and answer matching
+    If-None-Match requests with 304 and no body.
+    The tag is a hash of the finished body, so a 304 saves the transfer but not
+    the handler's work; the covered endpoints keep that cheap by serving their
+    bodies from the response caches, leaving one cache read and one hash per request.
+    Written as plain ASGI so it does not wrap requests in BaseHTTPMiddleware tasks;
+    only matching paths are buffered, so streaming endpoints are untouched.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], cache_control: str = "no-cache"):
+        self.app = app
+        self.paths: List[Pattern[str]] = [re.compile(p) for p in paths]
+        self.cache_control = cache_control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not any(p.fullmatch(scope["path"]) for p in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Message = {}
+        chunks: List[bytes] = []
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            if start["status"] != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            etag = f'"{blake2b(body, digest_size=8).hexdigest()}"'
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = self.cache_control
+
+            if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+                del headers["Content-Length"]
+                if "content-type" in headers:
+                    del headers["Content-Type"]
+                await send({**start, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
+
+class RateLimitMiddleware:
+    """
+    slowapi's ASGI rate-limit middleware, forwarding ``http.response.start`` once.
+    slowapi 0.1.10 holds the start message back to add its headers and then
+    replays it before every body chunk, which breaks streaming responses;
+    the replays after the first are dropped here.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limited_app = SlowAPIASGIMiddleware(app)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+
+        async def send_start_once(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                if started:
+                    return
+                started = True
+            await send(message)
+
+        await self.limited_app(scope, receive, send_start_once)
@@ -37,6 +37,10 @@ class Transaction(Base):
     # Relationships
     user = relationship("User", back_populates="transactions")
 
+    __table_args__ = (
+        Index('idx_tx_user_created', 'user_id', 'created_at'),  # Per-user transactions within a period
+    )
+
 class CreditInquiry(Base):
     __tablename__ = "credit_inquiries"
     
@@ -49,6 +53,10 @@ class CreditInquiry(Base):
     # Relationships
     user = relationship("User", back_populates="credit_inquiries")
 
+    __table_args__ = (
+        Index('idx_ci_user_date', 'user_id', 'inquiry_date'),  # Per-user inquiries within a period
+    )
+
 class RiskAnalysis(Base):
     __tablename__ = "risk_analyses"
     
@@ -62,6 +70,10 @@ class RiskAnalysis(Base):
     # Relationships
     user = relationship("User", back_populates="risk_analyses")
 
+    __table_args__ = (
+        Index('idx_ra_user_date', 'user_id', 'analysis_date'),  # Latest analysis per user
+    )
+
 class SqlType(enum.Enum):
     SIMPLE_QUERY = "SIMPLE_QUERY"
     POST_PROCESS_REQUIRED_QUERY = "POST_PROCESS_REQUIRED_QUERY"
@@ -80,7 +92,8 @@ feature_tags = Table(
     'feature_tags',
     Base.metadata,
     Column('feature_id', Integer, ForeignKey('features.id', ondelete='CASCADE')),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'))
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE')),
+    Index('idx_feature_tags_tag_feature', 'tag_id', 'feature_id')  # Features carrying a tag, without touching the base rows
 )
 
 class SqlSet(Base):
@@ -108,7 +121,7 @@ class SqlStatement(Base):
     sql_type = Column(Enum(SqlType), nullable=False)
     sql_set_id = Column(Integer, ForeignKey('sql_sets.id', ondelete='CASCADE'), nullable=False)
     is_active = Column(Boolean, default=True)
-    metadata = Column(JSON)  # Store parsed SQL metadata
+    meta_json = Column("metadata", JSON)  # Store parsed SQL metadata; `metadata` is reserved by SQLAlchemy
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -143,6 +156,16 @@ class Feature(Base):
     sql_statement = relationship("SqlStatement", back_populates="features")
     risk_factors = relationship("RiskFactor", back_populates="feature")
 
+    __table_args__ = (
+        Index('idx_feature_active_type_name', 'is_active', 'data_type', 'name'),  # Filtered feature listings ordered by name
+        Index('idx_feature_category_active', 'category', 'is_active'),  # Feature lists filtered by category and status
+    )
+
+    @property
+    def tag_names(self) -> list:
+        """Names of the feature's tags, as exposed by the API."""
+        return [tag.name for tag in self.tags]
+
     def __repr__(self):
         return f"<Feature(id={self.id}, name='{self.name}', data_type='{self.data_type}')>"
 
@@ -172,7 +195,7 @@ class FeatureValue(Base):
     feature = relationship("Feature", back_populates="feature_values")
 
     __table_args__ = (
-        Index('idx_feature_entity', 'feature_id', 'entity_id'),  # Composite index for faster lookups
+        Index('uq_feature_value_entity', 'feature_id', 'entity_id', unique=True),  # One value per feature and entity; upsert conflict target
     )
 
 class RiskFactor(Base):
@@ -205,20 +228,24 @@ class RiskAssessment(Base):
     risk_level = Column(String)
     assessment_date = Column(DateTime, default=datetime.utcnow)
     factors = Column(JSON)  # Store contributing risk factors
-    metadata = Column(JSON)  # Store additional assessment metadata
+    meta_json = Column("metadata", JSON)  # Store additional assessment metadata
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_rass_cust_date', 'customer_id', 'assessment_date'),  # Assessment history per customer
+    )
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary."""
+        """Convert model to dictionary. Datetimes are left for the response encoder."""
         return {
             "id": self.id,
             "customer_id": self.customer_id,
             "risk_score": self.risk_score,
             "risk_level": self.risk_level,
-            "assessment_date": self.assessment_date.isoformat(),
+            "assessment_date": self.assessment_date,
             "factors": self.factors,
-            "metadata": self.metadata,
-            "created_at": self.created_at.isoformat()
+            "metadata": self.meta_json,
+            "created_at": self.created_at
         }
 
 class ModelAdjustment(Base):
@@ -242,4 +269,4 @@ class ModelMetrics(Base):
     metric_value = Column(Float)
     evaluation_date = Column(DateTime, default=datetime.utcnow)
     period = Column(String(50))  # e.g., "daily", "weekly", "monthly"
-    metadata = Column(JSON)  # Additional metric metadata 
\ No newline at end of file
+    meta_json = Column("metadata", JSON)  # Additional metric metadata
\ No newline at end of file
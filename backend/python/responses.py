@@ -0,0 +1,133 @@
+from decimal import Decimal
+from typing import Any, Callable, Iterable, List, Type
+import functools
+import inspect
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+class ORJSONResponse(Response):
+    """
+    JSON response rendered with orjson.
+    Datetimes are encoded natively as UTC with a ``Z`` suffix (naive ones are
+    taken as UTC), and numpy scalars/arrays are supported.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+def _encode_fallback(obj: Any) -> Any:
+    """orjson hook for types it has no native encoding for; unknown types are an error."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, Decimal):
+        return float(obj)  # Amounts stay JSON numbers, as with the previous encoder
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_bytes(content: Any) -> bytes:
+    """Encode ``content`` exactly as ``ORJSONResponse`` would."""
+    return orjson.dumps(
+        content,
+        default=_encode_fallback,
+        option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+def dump_model(schema: Type[BaseModel], obj: Any) -> dict:
+    """
+    Convert an ORM object, dict or model instance to a plain dict shaped by ``schema``.
+    ORM objects skip validation when the schema supports ``from_orm_fast``.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    if not isinstance(obj, dict) and hasattr(schema, "from_orm_fast"):
+        # Constructed models may hold ORM-side types (e.g. enums), which orjson encodes directly
+        return schema.from_orm_fast(obj).model_dump(by_alias=True, warnings=False)
+    return schema.model_validate(obj).model_dump(by_alias=True)
+
+def dump_models(schema: Type[BaseModel], objs: Iterable[Any]) -> List[dict]:
+    """Convert a sequence of objects to plain dicts shaped by ``schema``."""
+    return [dump_model(schema, obj) for obj in objs]
+
+def list_json_bytes(adapter: TypeAdapter, schema: Type[BaseModel], objs: Iterable[Any]) -> bytes:
+    """
+    Serialize ORM rows to JSON bytes with a prebuilt list adapter.
+    Skips validation; the adapter builds the plain values in pydantic-core and
+    ``json_bytes`` encodes them, so datetimes match the detail endpoints.
+    """
+    items = [schema.from_orm_fast(obj) for obj in objs]
+    return json_bytes(adapter.dump_python(items, by_alias=True, warnings=False))
+
+def list_json_response(adapter: TypeAdapter, schema: Type[BaseModel], objs: Iterable[Any]) -> Response:
+    """Response wrapper around ``list_json_bytes``."""
+    return raw_json_response(list_json_bytes(adapter, schema, objs))
+
+def page_json_bytes(
+    adapter: TypeAdapter,
+    schema: Type[BaseModel],
+    objs: Iterable[Any],
+    **page: int
+) -> bytes:
+    """
+    Serialize a page of ORM rows plus its counters with a prebuilt page adapter.
+    The envelope is a plain dict, so nothing is validated on the way out.
+    """
+    content = {"items": [schema.from_orm_fast(obj) for obj in objs], **page}
+    return json_bytes(adapter.dump_python(content, by_alias=True, warnings=False))
+
+def page_json_response(
+    adapter: TypeAdapter,
+    schema: Type[BaseModel],
+    objs: Iterable[Any],
+    **page: int
+) -> Response:
+    """Response wrapper around ``page_json_bytes``."""
+    return raw_json_response(page_json_bytes(adapter, schema, objs, **page))
+
+def raw_json_response(body: bytes) -> Response:
+    """Wrap an already-encoded JSON body, e.g. one served from a response cache."""
+    return Response(content=body, media_type="application/json")
+
+def _takes_response(endpoint: Callable[..., Any]) -> bool:
+    """Whether the endpoint (or a decorator such as fastapi-cache) injects the Response to set headers on."""
+    return any(
+        isinstance(param.annotation, type) and issubclass(param.annotation, Response)
+        for param in inspect.signature(endpoint).parameters.values()
+    )
+
+class DirectJSONRoute(APIRoute):
+    """
+    Route that hands plain results of handlers without a ``response_model``
+    straight to the response class, skipping FastAPI's ``jsonable_encoder`` walk.
+    orjson encodes datetimes, enums and models natively; handlers that need the
+    injected Response object keep the default path so their headers survive.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_model = kwargs.get("response_model")
+        if isinstance(response_model, DefaultPlaceholder):
+            response_model = response_model.value
+        if (
+            response_model is None
+            and inspect.signature(endpoint).return_annotation is inspect.Signature.empty
+            and inspect.iscoroutinefunction(endpoint)
+            and not _takes_response(endpoint)
+        ):
+            response_class = kwargs.get("response_class")
+            if isinstance(response_class, DefaultPlaceholder):
+                response_class = response_class.value
+            endpoint = self._encode_directly(endpoint, response_class or ORJSONResponse, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _encode_directly(endpoint: Callable[..., Any], response_class: Type[Response], status_code: Any) -> Callable[..., Any]:
+        @functools.wraps(endpoint)
+        async def direct(*args: Any, **kwargs: Any) -> Any:
+            content = await endpoint(*args, **kwargs)
+            if isinstance(content, Response):
+                return content
+            return response_class(content=content, status_code=status_code or 200)
+        return direct
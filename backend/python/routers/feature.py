@@ -1,117 +1,226 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
 from datetime import datetime
 
+from ..cache import FEATURE_CACHE, SQL_SET_STATS_CACHE, clear_shared, get_or_load_shared
 from ..database import get_db
-from ..services.feature_service import FeatureService
+from ..models import Feature as FeatureModel
+from ..responses import DirectJSONRoute, ORJSONResponse, dump_model, dump_models, json_bytes, list_json_bytes, raw_json_response
 from ..schemas import (
     Feature, FeatureCreate, FeatureUpdate,
     FeatureValue, FeatureValueCreate, FeatureValueUpdate,
-    FeatureValidation
+    FeatureValidation, FEATURE_LIST_ADAPTER
 )
 
-router = APIRouter(prefix="/api/v1/features", tags=["features"])
+# Shared (cross-worker) cache namespace for feature list pages
+FEATURES_NAMESPACE = "features"
 
-@router.post("", response_model=Feature)
+router = APIRouter(prefix="/api/v1/features", tags=["features"], default_response_class=ORJSONResponse, route_class=DirectJSONRoute)
+
+def _feature_service():
+    # Imported on first use so loading the router does not pull in the service's HTTP client stack
+    from ..services.feature_service import get_feature_service
+    return get_feature_service()
+
+async def feature_or_404(feature_id: int, db: AsyncSession = Depends(get_db)) -> FeatureModel:
+    """Load the path's feature once for the handlers that modify it, or answer 404."""
+    feature = await _feature_service().get_feature(db, feature_id)
+    if not feature:
+        raise HTTPException(status_code=404, detail="Feature not found")
+    return feature
+
+@router.post("", responses={200: {"model": Feature}})
 async def create_feature(
     feature: FeatureCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new feature."""
-    service = FeatureService(db)
-    return await service.create_feature(feature)
+    service = _feature_service()
+    created = await service.create_feature(db, feature)
+    SQL_SET_STATS_CACHE.invalidate(created.sql_set_id)
+    await clear_shared(FEATURES_NAMESPACE)
+    return ORJSONResponse(content=dump_model(Feature, created))
 
-@router.get("", response_model=List[Feature])
+@router.get("", responses={200: {"model": List[Feature]}})
 async def get_features(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = None,
     category: Optional[str] = None,
     is_active: Optional[bool] = None,
-    tags: Optional[List[str]] = Query(None),
-    db: Session = Depends(get_db)
+    tags: Optional[str] = Query(None, description="Comma-separated tag names"),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get features with filtering and pagination."""
-    service = FeatureService(db)
-    return await service.get_features(
-        skip=skip,
-        limit=limit,
-        search=search,
-        category=category,
-        is_active=is_active,
-        tags=tags
-    )
+    tag_names = tuple(tag for tag in tags.split(",") if tag) if tags else ()
+
+    async def load() -> bytes:
+        features = await _feature_service().get_features(
+            db,
+            skip=skip,
+            limit=limit,
+            search=search,
+            category=category,
+            is_active=is_active,
+            tags=tag_names
+        )
+        return list_json_bytes(FEATURE_LIST_ADAPTER, Feature, features)
+
+    key = f"{skip}:{limit}:{search or ''}:{category or ''}:{is_active}:{','.join(tag_names)}"
+    return raw_json_response(await get_or_load_shared(FEATURES_NAMESPACE, key, load))
+
+@router.post("/bulk")
+async def bulk_create_features(
+    features: List[FeatureCreate] = Body(..., min_length=1, max_length=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many features in one request."""
+    created = await _feature_service().bulk_create_features(db, features)
+    SQL_SET_STATS_CACHE.clear()
+    await clear_shared(FEATURES_NAMESPACE)
+    return {"created": created}
+
+@router.get("/listing")
+async def list_features(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=100),
+    data_type: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: the previous page's next_cursor"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List features by name with their listing columns only. When a full
+    page is returned, ``next_cursor`` is the ``cursor`` for the next page.
+    """
+    async def load() -> bytes:
+        listing = await _feature_service().list_features(
+            db,
+            page=page,
+            page_size=page_size,
+            data_type=data_type,
+            is_active=is_active,
+            search=search,
+            cursor=cursor
+        )
+        return json_bytes(listing)
+
+    key = f"listing:{page}:{page_size}:{data_type or ''}:{is_active}:{search or ''}:{cursor or ''}"
+    return raw_json_response(await get_or_load_shared(FEATURES_NAMESPACE, key, load))
+
+@router.post("/compute")
+async def compute_features(
+    user_id: str = Body(...),
+    feature_names: List[str] = Body(..., min_length=1)
+):
+    """Compute a user's values of the named features through the feature API."""
+    return {"values": await _feature_service().compute_features(user_id, feature_names)}
 
-@router.get("/{feature_id}", response_model=Feature)
+@router.get("/{feature_id}", responses={200: {"model": Feature}})
 async def get_feature(
     feature_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific feature by ID."""
-    service = FeatureService(db)
-    feature = await service.get_feature(feature_id)
-    if not feature:
+    async def load() -> Optional[bytes]:
+        feature = await _feature_service().get_feature(db, feature_id)
+        return json_bytes(dump_model(Feature, feature)) if feature else None
+
+    body = await FEATURE_CACHE.get_or_load(feature_id, load)
+    if body is None:
         raise HTTPException(status_code=404, detail="Feature not found")
-    return feature
+    return raw_json_response(body)
 
-@router.put("/{feature_id}", response_model=Feature)
+@router.put("/{feature_id}", responses={200: {"model": Feature}})
 async def update_feature(
-    feature_id: int,
     feature: FeatureUpdate,
-    db: Session = Depends(get_db)
+    db_feature: FeatureModel = Depends(feature_or_404),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a specific feature."""
-    service = FeatureService(db)
-    updated_feature = await service.update_feature(feature_id, feature)
-    if not updated_feature:
-        raise HTTPException(status_code=404, detail="Feature not found")
-    return updated_feature
+    previous_sql_set_id = db_feature.sql_set_id
+    updated_feature = await _feature_service().apply_feature_update(db, db_feature, feature)
+    FEATURE_CACHE.invalidate(db_feature.id)
+    SQL_SET_STATS_CACHE.invalidate(previous_sql_set_id)
+    SQL_SET_STATS_CACHE.invalidate(updated_feature.sql_set_id)
+    await clear_shared(FEATURES_NAMESPACE)
+    return ORJSONResponse(content=dump_model(Feature, updated_feature))
 
 @router.delete("/{feature_id}")
 async def delete_feature(
-    feature_id: int,
-    db: Session = Depends(get_db)
+    db_feature: FeatureModel = Depends(feature_or_404),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Delete (soft delete) a feature."""
-    service = FeatureService(db)
-    if not await service.delete_feature(feature_id):
-        raise HTTPException(status_code=404, detail="Feature not found")
+    """Delete a feature."""
+    sql_set_id = db_feature.sql_set_id
+    await _feature_service().delete_loaded_feature(db, db_feature)
+    FEATURE_CACHE.invalidate(db_feature.id)
+    SQL_SET_STATS_CACHE.invalidate(sql_set_id)
+    await clear_shared(FEATURES_NAMESPACE)
     return {"message": "Feature deleted successfully"}
 
-@router.post("/{feature_id}/values", response_model=FeatureValue)
+@router.post("/{feature_id}/values", responses={200: {"model": FeatureValue}})
 async def set_feature_value(
     feature_id: int,
     value: FeatureValueCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Set a value for a feature."""
-    service = FeatureService(db)
-    return await service.set_feature_value(feature_id, value)
+    service = _feature_service()
+    feature_value = await service.set_feature_value(db, feature_id, value)
+    return ORJSONResponse(content=dump_model(FeatureValue, feature_value))
 
-@router.get("/{feature_id}/values", response_model=List[FeatureValue])
+@router.get("/{feature_id}/values", responses={200: {"model": List[FeatureValue]}})
 async def get_feature_values(
     feature_id: int,
-    entity_ids: Optional[List[int]] = Query(None),
+    entity_ids: Optional[str] = Query(None, pattern=r"^\d+(,\d+)*$", description="Comma-separated entity IDs"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor: return values with a larger id"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get values for a feature."""
-    service = FeatureService(db)
-    return await service.get_feature_values(
+    """
+    Get values for a feature, ordered by id. When a full page is returned,
+    the X-Next-Cursor header holds the ``after_id`` for the next page.
+    """
+    service = _feature_service()
+    values = await service.get_feature_values(
+        db,
         feature_id,
-        entity_ids=entity_ids,
+        entity_ids=tuple(map(int, entity_ids.split(","))) if entity_ids else (),
         skip=skip,
-        limit=limit
+        limit=limit,
+        after_id=after_id
     )
+    response = ORJSONResponse(content=dump_models(FeatureValue, values))
+    if len(values) == limit:
+        response.headers["X-Next-Cursor"] = str(values[-1].id)
+    return response
 
-@router.post("/{feature_id}/validate", response_model=FeatureValidation)
+@router.post("/{feature_id}/validate", responses={200: {"model": FeatureValidation}})
 async def validate_feature_value(
     feature_id: int,
-    value: any,
-    db: Session = Depends(get_db)
+    value: Any = Body(...),
+    db: AsyncSession = Depends(get_db)
 ):
     """Validate a value for a feature."""
-    service = FeatureService(db)
-    return await service.validate_feature_value(feature_id, value) 
\ No newline at end of file
+    service = _feature_service()
+    validation = await service.validate_feature_value(db, feature_id, value)
+    return ORJSONResponse(content=dump_model(FeatureValidation, validation)) 
+
+@router.post("/{feature_id}/values/validate", responses={200: {"model": FeatureValidation}})
+async def validate_feature_values(
+    feature_id: int,
+    values: List[Any] = Body(..., embed=True),
+    fail_fast: bool = Query(False, description="Stop at the first invalid value"),
+    max_errors: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Validate a list of values for a feature."""
+    service = _feature_service()
+    validation = await service.validate_feature_values(
+        db, feature_id, values, fail_fast=fail_fast, max_errors=max_errors
+    )
+    return ORJSONResponse(content=dump_model(FeatureValidation, validation))
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Body, Query
+from typing import List
+
+from ..responses import DirectJSONRoute, ORJSONResponse
+
+router = APIRouter(prefix="/api/v1/model", tags=["model"], default_response_class=ORJSONResponse, route_class=DirectJSONRoute)
+
+def _model_api_service():
+    # Imported on first use so loading the router does not pull in the service's HTTP client stack
+    from ..services.model import get_model_api_service
+    return get_model_api_service()
+
+@router.get("/dashboard")
+async def get_model_dashboard(days: int = Query(30, ge=1, le=365)):
+    """Get model metrics, cutoff, feature importance and performance trends in one response."""
+    return await _model_api_service().get_dashboard(days)
+
+@router.post("/predictions")
+async def get_model_predictions(user_ids: List[str] = Body(..., embed=True, min_length=1)):
+    """Get the model's predictions for ``user_ids``, keyed by user ID."""
+    return {"predictions": await _model_api_service().get_model_predictions(user_ids)}
+
+@router.get("/performance-trends")
+async def get_model_performance_trends(days: int = Query(30, ge=1, le=365)):
+    """Get the model's performance trends over the last ``days`` days."""
+    return await _model_api_service().get_model_performance_trends(days)
+
+@router.post("/simulate-cutoff")
+async def simulate_cutoff_change(cutoff: float = Body(..., embed=True, ge=0, le=1)):
+    """Simulate the impact of changing the model cutoff to ``cutoff``."""
+    return await _model_api_service().simulate_cutoff_change(cutoff)
@@ -1,142 +1,175 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from ..cache import SQL_SET_CACHE, SQL_SET_STATS_CACHE, clear_shared, get_or_load_shared
 from ..database import get_db
-from ..services.sql_service import SqlService
-from ..services.sqlset_service import SqlSetService
-from ..models import SqlType, Feature
+from ..responses import DirectJSONRoute, ORJSONResponse, dump_model, json_bytes, list_json_response, page_json_bytes, page_json_response, raw_json_response
+from ..models import SqlType, Feature, SqlSet as SqlSetModel
 from ..schemas import (
     SqlSet, SqlSetCreate, SqlSetUpdate,
     SqlStatement, SqlStatementCreate, SqlStatementUpdate,
-    SqlParseResult, PageResponse, Feature as FeatureSchema
+    SqlParseResult, SqlSetPage, FeaturePage, Feature as FeatureSchema,
+    SQL_STATEMENT_LIST_ADAPTER, SQL_SET_PAGE_ADAPTER, FEATURE_PAGE_ADAPTER
 )
 
-router = APIRouter(prefix="/api/v1/sql", tags=["sql"])
+router = APIRouter(prefix="/api/v1/sql", tags=["sql"], default_response_class=ORJSONResponse, route_class=DirectJSONRoute)
+
+# Shared (cross-worker) cache namespace for SQL set list pages
+SQL_SETS_NAMESPACE = "sqlsets"
+
+# Services are imported on first use to keep router import cheap at worker start
+def _sql_service(db: AsyncSession):
+    from ..services.sql_service import SqlService
+    return SqlService(db)
+
+def _sqlset_service(db: AsyncSession):
+    from ..services.sqlset_service import SqlSetService
+    return SqlSetService(db)
+
+async def sql_set_or_404(sql_set_id: int, db: AsyncSession = Depends(get_db)) -> SqlSetModel:
+    """Load the path's SQL set once for the handlers that modify it, or answer 404."""
+    sql_set = await _sqlset_service(db).get_sql_set(sql_set_id)
+    if not sql_set:
+        raise HTTPException(status_code=404, detail="SQL set not found")
+    return sql_set
+
+def _pagination(skip: int, limit: int, total: int) -> Dict[str, int]:
+    """Page counters for a skip/limit query; ``limit >= 1`` is enforced by Query."""
+    return {"page": skip // limit + 1, "page_size": limit, "total_pages": -(-total // limit)}
 
 # SQL Set endpoints
-@router.post("/sets", response_model=SqlSet)
+@router.post("/sets", responses={200: {"model": SqlSet}})
 async def create_sql_set(
     sql_set: SqlSetCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new SQL set."""
-    service = SqlSetService(db)
-    return await service.create_sql_set(sql_set)
+    service = _sqlset_service(db)
+    created = await service.create_sql_set(sql_set)
+    await clear_shared(SQL_SETS_NAMESPACE)
+    return ORJSONResponse(content=dump_model(SqlSet, created))
 
-@router.get("/sets", response_model=PageResponse[SqlSet])
+@router.get("/sets", responses={200: {"model": SqlSetPage}})
 async def get_sql_sets(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get SQL sets with filtering."""
-    service = SqlSetService(db)
-    sql_sets, total_count = await service.get_sql_sets(
-        skip=skip,
-        limit=limit,
-        search=search,
-        is_active=is_active
-    )
-    
-    return PageResponse(
-        items=sql_sets,
-        total=total_count,
-        page=skip // limit + 1 if limit > 0 else 1,
-        size=limit,
-        pages=(total_count + limit - 1) // limit if limit > 0 else 1
-    )
+    async def load() -> bytes:
+        sql_sets, total_count = await _sqlset_service(db).get_sql_sets(
+            skip=skip,
+            limit=limit,
+            search=search,
+            is_active=is_active
+        )
+        return page_json_bytes(
+            SQL_SET_PAGE_ADAPTER,
+            SqlSet,
+            sql_sets,
+            total=total_count,
+            **_pagination(skip, limit, total_count)
+        )
+
+    key = f"{skip}:{limit}:{search or ''}:{is_active}"
+    return raw_json_response(await get_or_load_shared(SQL_SETS_NAMESPACE, key, load))
 
-@router.get("/sets/{sql_set_id}", response_model=SqlSet)
+@router.get("/sets/{sql_set_id}", responses={200: {"model": SqlSet}})
 async def get_sql_set(
     sql_set_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific SQL set by ID."""
-    service = SqlSetService(db)
-    sql_set = await service.get_sql_set(sql_set_id)
-    if not sql_set:
+    async def load() -> Optional[bytes]:
+        sql_set = await _sqlset_service(db).get_sql_set(sql_set_id)
+        return json_bytes(dump_model(SqlSet, sql_set)) if sql_set else None
+
+    body = await SQL_SET_CACHE.get_or_load(sql_set_id, load)
+    if body is None:
         raise HTTPException(status_code=404, detail="SQL set not found")
-    return sql_set
+    return raw_json_response(body)
 
-@router.put("/sets/{sql_set_id}", response_model=SqlSet)
+@router.put("/sets/{sql_set_id}", responses={200: {"model": SqlSet}})
 async def update_sql_set(
-    sql_set_id: int,
     sql_set: SqlSetUpdate,
-    db: Session = Depends(get_db)
+    db_sql_set: SqlSetModel = Depends(sql_set_or_404),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a specific SQL set."""
-    service = SqlSetService(db)
-    updated_sql_set = await service.update_sql_set(sql_set_id, sql_set)
-    if not updated_sql_set:
-        raise HTTPException(status_code=404, detail="SQL set not found")
-    return updated_sql_set
+    updated_sql_set = await _sqlset_service(db).apply_sql_set_update(db_sql_set, sql_set)
+    SQL_SET_CACHE.invalidate(db_sql_set.id)
+    SQL_SET_STATS_CACHE.invalidate(db_sql_set.id)
+    await clear_shared(SQL_SETS_NAMESPACE)
+    return ORJSONResponse(content=dump_model(SqlSet, updated_sql_set))
 
 @router.delete("/sets/{sql_set_id}")
 async def delete_sql_set(
-    sql_set_id: int,
-    db: Session = Depends(get_db)
+    db_sql_set: SqlSetModel = Depends(sql_set_or_404),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a SQL set."""
-    service = SqlSetService(db)
-    if not await service.delete_sql_set(sql_set_id):
-        raise HTTPException(status_code=404, detail="SQL set not found")
+    sql_set_id = db_sql_set.id
+    await _sqlset_service(db).delete_loaded_sql_set(db_sql_set)
+    SQL_SET_CACHE.invalidate(sql_set_id)
+    SQL_SET_STATS_CACHE.invalidate(sql_set_id)
+    await clear_shared(SQL_SETS_NAMESPACE)
     return {"message": "SQL set deleted successfully"}
 
-@router.get("/sets/{sql_set_id}/features", response_model=PageResponse[FeatureSchema])
+@router.get("/sets/{sql_set_id}/features", responses={200: {"model": FeaturePage}})
 async def get_sql_set_features(
     sql_set_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get features associated with a specific SQL set."""
-    service = SqlSetService(db)
-    
-    # Make sure SQL set exists
-    sql_set = await service.get_sql_set(sql_set_id)
-    if not sql_set:
-        raise HTTPException(status_code=404, detail="SQL set not found")
-    
-    features, total_count = await service.get_sql_set_features(
+    service = _sqlset_service(db)
+    exists, features, total_count = await service.get_features_with_set_check(
         sql_set_id=sql_set_id,
         skip=skip,
         limit=limit,
         search=search
     )
+    if not exists:
+        raise HTTPException(status_code=404, detail="SQL set not found")
     
-    return PageResponse(
-        items=features,
+    return page_json_response(
+        FEATURE_PAGE_ADAPTER,
+        FeatureSchema,
+        features,
         total=total_count,
-        page=skip // limit + 1 if limit > 0 else 1,
-        size=limit,
-        pages=(total_count + limit - 1) // limit if limit > 0 else 1
+        **_pagination(skip, limit, total_count)
     )
 
 @router.get("/sets/{sql_set_id}/stats")
 async def get_sql_set_stats(
     sql_set_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get statistics for a specific SQL set."""
-    service = SqlSetService(db)
-    return await service.get_sql_set_stats(sql_set_id)
+    async def load() -> bytes:
+        return json_bytes(await _sqlset_service(db).get_sql_set_stats(sql_set_id))
+
+    return raw_json_response(await SQL_SET_STATS_CACHE.get_or_load(sql_set_id, load))
 
 # SQL Statement endpoints
-@router.post("/statements", response_model=SqlStatement)
+@router.post("/statements", responses={200: {"model": SqlStatement}})
 async def create_sql_statement(
     sql_statement: SqlStatementCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new SQL statement."""
-    service = SqlService(db)
-    return await service.create_sql_statement(sql_statement)
+    service = _sql_service(db)
+    created = await service.create_sql_statement(sql_statement)
+    SQL_SET_STATS_CACHE.invalidate(created.sql_set_id)
+    return ORJSONResponse(content=dump_model(SqlStatement, created))
 
-@router.get("/statements", response_model=List[SqlStatement])
+@router.get("/statements", responses={200: {"model": List[SqlStatement]}})
 async def get_sql_statements(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -144,11 +177,11 @@ async def get_sql_statements(
     sql_set_id: Optional[int] = None,
     sql_type: Optional[SqlType] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get SQL statements with filtering."""
-    service = SqlService(db)
-    return await service.get_sql_statements(
+    service = _sql_service(db)
+    sql_statements = await service.get_sql_statements(
         skip=skip,
         limit=limit,
         search=search,
@@ -156,48 +189,53 @@ async def get_sql_statements(
         sql_type=sql_type,
         is_active=is_active
     )
+    return list_json_response(SQL_STATEMENT_LIST_ADAPTER, SqlStatement, sql_statements)
 
-@router.get("/statements/{sql_id}", response_model=SqlStatement)
+@router.get("/statements/{sql_id}", responses={200: {"model": SqlStatement}})
 async def get_sql_statement(
     sql_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific SQL statement by ID."""
-    service = SqlService(db)
+    service = _sql_service(db)
     sql_statement = await service.get_sql_statement(sql_id)
     if not sql_statement:
         raise HTTPException(status_code=404, detail="SQL statement not found")
-    return sql_statement
+    return ORJSONResponse(content=dump_model(SqlStatement, sql_statement))
 
-@router.put("/statements/{sql_id}", response_model=SqlStatement)
+@router.put("/statements/{sql_id}", responses={200: {"model": SqlStatement}})
 async def update_sql_statement(
     sql_id: int,
     sql_statement: SqlStatementUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a specific SQL statement."""
-    service = SqlService(db)
+    service = _sql_service(db)
     updated_sql_statement = await service.update_sql_statement(sql_id, sql_statement)
     if not updated_sql_statement:
         raise HTTPException(status_code=404, detail="SQL statement not found")
-    return updated_sql_statement
+    # The statement may have moved between sets, so every set's counts are stale
+    SQL_SET_STATS_CACHE.clear()
+    return ORJSONResponse(content=dump_model(SqlStatement, updated_sql_statement))
 
 @router.delete("/statements/{sql_id}")
 async def delete_sql_statement(
     sql_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a SQL statement."""
-    service = SqlService(db)
+    service = _sql_service(db)
     if not await service.delete_sql_statement(sql_id):
         raise HTTPException(status_code=404, detail="SQL statement not found")
+    SQL_SET_STATS_CACHE.clear()
     return {"message": "SQL statement deleted successfully"}
 
-@router.post("/statements/parse", response_model=SqlParseResult)
+@router.post("/statements/parse", responses={200: {"model": SqlParseResult}})
 async def parse_sql(
     statement: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Parse a SQL statement to extract fields and metadata."""
-    service = SqlService(db)
-    return await service.parse_sql(statement) 
\ No newline at end of file
+    service = _sql_service(db)
+    parse_result = await service.parse_sql(statement)
+    return ORJSONResponse(content=dump_model(SqlParseResult, parse_result)) 
\ No newline at end of file
@@ -1,7 +1,36 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter, ValidationInfo, field_validator
 from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 from enum import Enum
+from typing_extensions import TypedDict
+
+class ORMFastMixin:
+    """
+    Build response models from trusted ORM rows without re-running validation.
+    Rows loaded from our own database already satisfy the schema, so
+    ``model_construct`` is used instead of ``model_validate``.
+    """
+
+    @classmethod
+    def _orm_attributes(cls) -> Dict[str, str]:
+        """Map field names to the ORM attribute they are read from, built once per class."""
+        attrs = cls.__dict__.get("_orm_attribute_map")
+        if attrs is None:
+            attrs = {}
+            for name, field in cls.model_fields.items():
+                alias = field.validation_alias
+                if isinstance(alias, AliasChoices):
+                    alias = alias.choices[0]
+                attrs[name] = alias if isinstance(alias, str) else name
+            cls._orm_attribute_map = attrs
+        return attrs
+
+    @classmethod
+    def from_orm_fast(cls, obj: Any):
+        """Create an instance from an ORM object, skipping validation."""
+        return cls.model_construct(
+            **{name: getattr(obj, attr, None) for name, attr in cls._orm_attributes().items()}
+        )
 
 class DataType(str, Enum):
     """Enumeration of supported feature data types."""
@@ -55,14 +84,13 @@ class SqlSetUpdate(SqlSetBase):
     description: Optional[str] = Field(None, max_length=500)
     is_active: Optional[bool] = None
 
-class SqlSet(SqlSetBase):
+class SqlSet(ORMFastMixin, SqlSetBase):
     """Pydantic model for SQL Set response."""
     id: int
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SqlStatementBase(BaseModel):
     """Base Pydantic model for SQL Statement data."""
@@ -86,14 +114,43 @@ class SqlStatementUpdate(SqlStatementBase):
     is_active: Optional[bool] = None
     metadata: Optional[Dict[str, Any]] = None
 
-class SqlStatement(SqlStatementBase):
+class SqlStatement(ORMFastMixin, SqlStatementBase):
     """Pydantic model for SQL Statement response."""
     id: int
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta_json", "metadata"))
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+_DATA_TYPES = ("numeric", "categorical", "boolean", "text", "date")
+_VALID_DATA_TYPES = frozenset(_DATA_TYPES)
+_DATA_TYPE_ERROR = f"data_type must be one of {list(_DATA_TYPES)}"
+
+def _validate_numeric_constraints(v: Dict[str, Any]) -> None:
+    if "min" not in v or "max" not in v:
+        raise ValueError("Numeric features must have min and max constraints")
+    if v["min"] > v["max"]:
+        raise ValueError("min value cannot be greater than max value")
+
+def _validate_categorical_constraints(v: Dict[str, Any]) -> None:
+    if "categories" not in v:
+        raise ValueError("Categorical features must have categories defined")
+    if not isinstance(v["categories"], list):
+        raise ValueError("categories must be a list")
+    if not v["categories"]:
+        raise ValueError("categories cannot be empty")
+
+def _validate_text_constraints(v: Dict[str, Any]) -> None:
+    if "max_length" not in v:
+        raise ValueError("Text features must have max_length defined")
+
+# Constraint checks per data_type; types without an entry accept any constraints
+_CONSTRAINT_VALIDATORS = {
+    "numeric": _validate_numeric_constraints,
+    "categorical": _validate_categorical_constraints,
+    "text": _validate_text_constraints,
+}
 
 class FeatureBase(BaseModel):
     """Base Pydantic model for Feature data."""
@@ -111,35 +168,22 @@ class FeatureBase(BaseModel):
     field_name: Optional[str] = Field(None, max_length=100)
     tags: Optional[List[str]] = Field(default_factory=list)
 
-    @validator('data_type')
+    @field_validator('data_type')
+    @classmethod
     def validate_data_type(cls, v):
-        valid_types = ["numeric", "categorical", "boolean", "text", "date"]
-        if v not in valid_types:
-            raise ValueError(f"data_type must be one of {valid_types}")
+        if v not in _VALID_DATA_TYPES:
+            raise ValueError(_DATA_TYPE_ERROR)
         return v
 
-    @validator('constraints')
-    def validate_constraints(cls, v, values):
+    @field_validator('constraints')
+    @classmethod
+    def validate_constraints(cls, v, info: ValidationInfo):
         if not v:
             return v
             
-        data_type = values.get('data_type')
-        if data_type == "numeric":
-            if not all(key in v for key in ["min", "max"]):
-                raise ValueError("Numeric features must have min and max constraints")
-            if v["min"] > v["max"]:
-                raise ValueError("min value cannot be greater than max value")
-        elif data_type == "categorical":
-            if "categories" not in v:
-                raise ValueError("Categorical features must have categories defined")
-            if not isinstance(v["categories"], list):
-                raise ValueError("categories must be a list")
-            if not v["categories"]:
-                raise ValueError("categories cannot be empty")
-        elif data_type == "text":
-            if "max_length" not in v:
-                raise ValueError("Text features must have max_length defined")
-        
+        validate = _CONSTRAINT_VALIDATORS.get(info.data.get('data_type'))
+        if validate is not None:
+            validate(v)
         return v
 
 class FeatureCreate(FeatureBase):
@@ -162,23 +206,27 @@ class FeatureUpdate(BaseModel):
     field_name: Optional[str] = Field(None, max_length=100)
     tags: Optional[List[str]] = None
 
-    @validator('data_type')
+    @field_validator('data_type')
+    @classmethod
     def validate_data_type(cls, v):
         if v is None:
             return v
-        valid_types = ["numeric", "categorical", "boolean", "text", "date"]
-        if v not in valid_types:
-            raise ValueError(f"data_type must be one of {valid_types}")
+        if v not in _VALID_DATA_TYPES:
+            raise ValueError(_DATA_TYPE_ERROR)
         return v
 
-class Feature(FeatureBase):
+class FeatureUpdateRequest(FeatureUpdate):
+    """Pydantic model for a Feature update that names the feature in its body."""
+    id: int
+
+class Feature(ORMFastMixin, FeatureBase):
     """Pydantic model for Feature response."""
     id: int
     created_at: datetime
     updated_at: datetime
+    tags: List[str] = Field(default_factory=list, validation_alias=AliasChoices("tag_names", "tags"))
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FeatureList(BaseModel):
     """Pydantic model for list of Features response."""
@@ -215,14 +263,13 @@ class RiskFactorUpdate(BaseModel):
     description: Optional[str] = None
     is_active: Optional[bool] = None
 
-class RiskFactor(RiskFactorBase):
+class RiskFactor(ORMFastMixin, RiskFactorBase):
     """Model for risk factor response."""
     id: int
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class RiskAssessmentRequest(BaseModel):
     """Model for risk assessment request."""
@@ -230,7 +277,7 @@ class RiskAssessmentRequest(BaseModel):
     features: Dict[str, Any] = Field(..., description="Feature values for assessment")
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
-class RiskAssessmentResponse(BaseModel):
+class RiskAssessmentResponse(ORMFastMixin, BaseModel):
     """Model for risk assessment response."""
     id: int
     customer_id: str
@@ -238,11 +285,10 @@ class RiskAssessmentResponse(BaseModel):
     risk_level: RiskLevel
     assessment_date: datetime
     factors: List[Dict[str, Any]] = Field(..., description="Contributing risk factors")
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any] = Field(..., validation_alias=AliasChoices("meta_json", "metadata"))
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PaginatedResponse(BaseModel):
     """Generic model for paginated responses."""
@@ -258,8 +304,7 @@ class FeatureValue(BaseModel):
     entity_id: int
     value: Any
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FeatureValueCreate(BaseModel):
     """Pydantic model for creating feature values."""
@@ -276,6 +321,11 @@ class FeatureValueResponse(FeatureValue):
     created_at: datetime
     updated_at: datetime
 
+class ChatMessage(BaseModel):
+    """Pydantic model for an incoming chat message."""
+    message: str
+    sender_id: str = "default_user"
+
 class SqlParseResult(BaseModel):
     """Pydantic model for SQL parsing results."""
     fields: List[str]
@@ -287,4 +337,32 @@ class PageResponse(BaseModel):
     total: int
     page: int
     page_size: int
-    total_pages: int 
\ No newline at end of file
+    total_pages: int
+
+class SqlSetPage(TypedDict):
+    """Paginated SQL sets, serialized straight to JSON without building a model."""
+    items: List[SqlSet]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+
+class FeaturePage(TypedDict):
+    """Paginated features, serialized straight to JSON without building a model."""
+    items: List[Feature]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+
+# List serializers built once; dump_python shapes the rows in pydantic-core for json_bytes
+SQL_SET_LIST_ADAPTER = TypeAdapter(List[SqlSet])
+SQL_STATEMENT_LIST_ADAPTER = TypeAdapter(List[SqlStatement])
+FEATURE_LIST_ADAPTER = TypeAdapter(List[Feature])
+SQL_SET_PAGE_ADAPTER = TypeAdapter(SqlSetPage)
+FEATURE_PAGE_ADAPTER = TypeAdapter(FeaturePage)
+
+# Pydantic v2 builds validators and serializers when each class is defined, so
+# the only lazy per-schema state left is the ORM attribute map; build it now
+for _schema in (SqlSet, SqlStatement, Feature, RiskFactor, RiskAssessmentResponse):
+    _schema._orm_attributes()
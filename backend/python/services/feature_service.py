@@ -1,131 +1,227 @@
-from sqlalchemy.orm import Session
-from typing import Dict, List, Optional, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterator, List, Mapping, Optional, Any, Sequence, Tuple, Union
+import asyncio
 import logging
+import re
 from uuid import uuid4
+from functools import lru_cache
 import httpx
 from datetime import datetime
 from fastapi import HTTPException, status
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_
-
-from ..models import Feature, Tag, FeatureValue
-from ..config import settings
+from sqlalchemy import and_, delete, func, insert, inspect, or_, select, text, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from cachetools import LRUCache, TTLCache
+
+from ..database import fetch_page
+from ..models import Feature, Tag, FeatureValue, RiskFactor, feature_tags
+from ..config import settings, FEATURE_API_HEADERS
 from ..schemas import FeatureCreate, FeatureUpdate, FeatureValidation, FeatureValueCreate, FeatureValueUpdate
+from ..upstream import FEATURE_API_CONNECT_RETRIES, FeatureAPIUnavailable, feature_api_request
 
 logger = logging.getLogger(__name__)
 
+# Hashed categorical constraints keyed by id() of the loaded categories list;
+# the list itself is kept in the entry so a reused id is never mistaken for it
+_CATEGORY_SETS: LRUCache = LRUCache(maxsize=256)
+
+def _category_set(categories: Sequence[Any]) -> Union[frozenset, Sequence[Any]]:
+    """Membership view of ``categories``, built once per loaded constraints list."""
+    entry = _CATEGORY_SETS.get(id(categories))
+    if entry is not None and entry[0] is categories:
+        return entry[1]
+    try:
+        members = frozenset(categories)
+    except TypeError:  # unhashable categories fall back to list membership
+        members = categories
+    _CATEGORY_SETS[id(categories)] = (categories, members)
+    return members
+
+def _validate_numeric(value: Any, constraints: Mapping[str, Any]) -> List[str]:
+    if not isinstance(value, (int, float)):
+        return ["Value must be numeric"]
+    errors = []
+    min_val = constraints.get("min")
+    max_val = constraints.get("max")
+    if min_val is not None and value < min_val:
+        errors.append(f"Value must be greater than or equal to {min_val}")
+    if max_val is not None and value > max_val:
+        errors.append(f"Value must be less than or equal to {max_val}")
+    return errors
+
+def _validate_categorical(value: Any, constraints: Mapping[str, Any]) -> List[str]:
+    categories = constraints.get("categories", [])
+    try:
+        allowed = value in _category_set(categories)
+    except TypeError:  # unhashable value
+        allowed = False
+    if allowed:
+        return []
+    return [f"Value must be one of: {', '.join(categories)}"]
+
+def _validate_boolean(value: Any, constraints: Mapping[str, Any]) -> List[str]:
+    return [] if isinstance(value, bool) else ["Value must be a boolean"]
+
+@lru_cache(maxsize=256)
+def _compiled(pattern: str) -> re.Pattern:
+    """Compile a constraint pattern once per distinct pattern string."""
+    return re.compile(pattern)
+
+def _validate_text(value: Any, constraints: Mapping[str, Any]) -> List[str]:
+    if not isinstance(value, str):
+        return ["Value must be a string"]
+    errors = []
+    length = len(value)
+    min_length = constraints.get("min_length")
+    if min_length and length < min_length:
+        errors.append(f"Text length must be greater than or equal to {min_length}")
+    max_length = constraints.get("max_length")
+    if max_length and length > max_length:
+        errors.append(f"Text length must be less than or equal to {max_length}")
+    pattern = constraints.get("pattern")
+    if pattern and not _compiled(pattern).match(value):
+        errors.append(f"Text must match pattern {pattern}")
+    return errors
+
+# Every ISO 8601 date starts with a four-digit year; anything else is rejected without parsing
+_ISO_DATE_PREFIX = re.compile(r"\d{4}")
+
+def _validate_date(value: Any, constraints: Mapping[str, Any]) -> List[str]:
+    if not isinstance(value, str) or not _ISO_DATE_PREFIX.match(value):
+        return ["Value must be a valid ISO format date string"]
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return ["Value must be a valid ISO format date string"]
+    return []
+
+# (data_type, constraints) per feature id for value validation, shared across
+# requests; every feature write in this process evicts its entry
+_FEATURE_RULES: TTLCache = TTLCache(maxsize=10000, ttl=settings.FEATURE_RULES_CACHE_TTL)
+
+def _forget_feature(feature_id: Optional[int]) -> None:
+    """Drop a feature's cached validation rules after it is created, changed or deleted."""
+    _FEATURE_RULES.pop(feature_id, None)
+
+# Per-user feature values from the feature API, keyed by (user_id, feature_name).
+# Failed lookups are remembered briefly so an outage is not retried on every call.
+_VALUE_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=settings.FEATURE_VALUE_CACHE_TTL)
+_MISSING_VALUE_CACHE: TTLCache = TTLCache(maxsize=10000, ttl=settings.FEATURE_MISS_CACHE_TTL)
+
+def _store_value(key: Tuple[str, str], value: Optional[float]) -> None:
+    if value is None:
+        _MISSING_VALUE_CACHE[key] = True
+    else:
+        _VALUE_CACHE[key] = value
+
+# Columns shown on feature listing pages
+_FEATURE_LIST_COLUMNS = (Feature.id, Feature.name, Feature.data_type, Feature.is_active)
+
+# InnoDB's row estimate for the features table; avoids a full COUNT(*) for unfiltered pages
+_FEATURE_ROW_ESTIMATE = text(
+    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'features'"
+)
+
+# Upper bound on feature API requests in flight when compute_features falls back to single fetches
+MAX_CONCURRENT_FETCHES = 32
+
+# get_feature_values filters on at most this many entity IDs per query
+ENTITY_ID_CHUNK_SIZE = 1000
+
+# Dialect INSERT constructs that support upserts, for set_feature_value
+_UPSERT_INSERTS = {
+    "mysql": mysql.insert,
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Value validators by feature data type; types without an entry accept any value
+_VALIDATORS = {
+    "numeric": _validate_numeric,
+    "categorical": _validate_categorical,
+    "boolean": _validate_boolean,
+    "text": _validate_text,
+    "date": _validate_date,
+}
+
+# Numeric value lists at least this long are range-checked with NumPy in one pass
+NUMPY_VALIDATION_THRESHOLD = 64
+
+def _numeric_violations(values: Sequence[Any], constraints: Mapping[str, Any]) -> Optional[Sequence[int]]:
+    """
+    Indices of values outside the min/max constraints, found with NumPy.
+    None when the values are not all plain numbers, so each must go through the validator.
+    """
+    # Imported here so NumPy is only loaded by processes that validate long value lists
+    import numpy as np
+
+    try:
+        arr = np.asarray(values)
+    except (ValueError, TypeError):  # ragged nested lists
+        return None
+    if arr.ndim != 1 or arr.dtype.kind not in "biuf":
+        return None
+
+    bad = np.zeros(arr.shape, dtype=bool)
+    try:
+        if constraints.get("min") is not None:
+            bad |= arr < constraints["min"]
+        if constraints.get("max") is not None:
+            bad |= arr > constraints["max"]
+    except TypeError:  # non-numeric bounds
+        return None
+    return np.flatnonzero(bad).tolist()
+
+def _value_errors(
+    values: Sequence[Any],
+    data_type: str,
+    constraints: Mapping[str, Any]
+) -> Iterator[Tuple[int, List[str]]]:
+    """Yield the index and error messages of each invalid value, in order."""
+    validator = _VALIDATORS.get(data_type)
+    if validator is None:
+        return
+
+    indices: Sequence[int] = range(len(values))
+    if data_type == "numeric" and len(values) >= NUMPY_VALIDATION_THRESHOLD:
+        violations = _numeric_violations(values, constraints)
+        if violations is not None:
+            # Only offending values go through the validator to build their messages
+            indices = violations
+    for index in indices:
+        errors = validator(values[index], constraints)
+        if errors:
+            yield index, errors
+
 class FeatureService:
-    def __init__(self, db: Session):
-        self.db = db
+    """Feature operations. Holds no session; callers pass ``db`` per call."""
+
+    def __init__(self):
         self.api_url = settings.FEATURE_API_URL
-        self.api_key = settings.FEATURE_API_KEY
         self.timeout = settings.FEATURE_API_TIMEOUT
-
-    async def get_features(self, page: int = 1, page_size: int = 10) -> Dict:
-        """
-        Get features from the Feature Management API.
-        
-        Args:
-            page: Page number
-            page_size: Number of items per page
-            
-        Returns:
-            Dictionary containing features and pagination info
-        """
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/feature/management/features",
-                    params={
-                        "page": page,
-                        "pageSize": page_size
-                    },
-                    headers=self._get_headers(),
-                    timeout=self.timeout
+        # One pooled client for the process so API calls reuse keep-alive connections
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url,
+            headers=self._get_headers(),
+            timeout=httpx.Timeout(self.timeout, connect=settings.FEATURE_API_CONNECT_TIMEOUT),
+            # Pool limits and HTTP/2 belong to the transport; a client given a transport ignores its own
+            transport=httpx.AsyncHTTPTransport(
+                retries=FEATURE_API_CONNECT_RETRIES,
+                http2=settings.FEATURE_API_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.FEATURE_API_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FEATURE_API_MAX_KEEPALIVE
                 )
-                response.raise_for_status()
-                return response.json()
-                
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error fetching features: {e}")
-            raise HTTPException(status_code=e.response.status_code if hasattr(e, 'response') else 500,
-                              detail="Error fetching features from Feature Management API")
-        except Exception as e:
-            logger.error(f"Error fetching features: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error")
-
-    async def create_feature(self, feature: FeatureCreate) -> Feature:
-        """Create a new feature with tags."""
-        try:
-            # Create tags if they don't exist
-            tags = []
-            for tag_name in feature.tags:
-                tag = self.db.query(Tag).filter(Tag.name == tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    self.db.add(tag)
-                tags.append(tag)
-            
-            # Create feature
-            db_feature = Feature(
-                name=feature.name,
-                description=feature.description,
-                data_type=feature.data_type,
-                constraints=feature.constraints,
-                is_active=feature.is_active,
-                importance_score=feature.importance_score,
-                category=feature.category,
-                computation_logic=feature.computation_logic,
-                tags=tags
             )
-            
-            self.db.add(db_feature)
-            await self.db.flush()
-            return db_feature
-        except Exception as e:
-            logger.error(f"Error creating feature: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to create feature: {str(e)}"
-            )
-
-    async def update_feature(
-        self,
-        feature_id: int,
-        feature_update: FeatureUpdate
-    ) -> Optional[Feature]:
-        """Update a feature."""
-        try:
-            db_feature = await self.get_feature(feature_id)
-            if not db_feature:
-                return None
+        )
 
-            # Update tags if provided
-            if feature_update.tags is not None:
-                tags = []
-                for tag_name in feature_update.tags:
-                    tag = self.db.query(Tag).filter(Tag.name == tag_name).first()
-                    if not tag:
-                        tag = Tag(name=tag_name)
-                        self.db.add(tag)
-                    tags.append(tag)
-                db_feature.tags = tags
-
-            # Update other fields
-            update_data = feature_update.dict(exclude_unset=True)
-            update_data.pop('tags', None)  # Remove tags as they're handled separately
-            
-            for field, value in update_data.items():
-                setattr(db_feature, field, value)
-
-            await self.db.flush()
-            return db_feature
-        except Exception as e:
-            logger.error(f"Error updating feature: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to update feature: {str(e)}"
-            )
+    async def aclose(self) -> None:
+        """Close the Feature Management API client."""
+        await self._client.aclose()
 
     async def get_feature_importance(self) -> List[Dict]:
         """
@@ -140,60 +236,33 @@ class FeatureService:
             {"name": "employment_status", "importance": 0.05}
         ]
 
-    def _get_headers(self) -> Dict[str, str]:
+    def _get_headers(self) -> Mapping[str, Union[str, bytes]]:
         """Get headers for API requests"""
-        headers = {
-            "Content-Type": "application/json"
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        return headers
+        return FEATURE_API_HEADERS
 
-    async def delete_feature(self, feature_id: int) -> bool:
-        """Soft delete a feature."""
-        try:
-            db_feature = await self.get_feature(feature_id)
-            if not db_feature:
-                return False
-
-            db_feature.is_active = False
-            db_feature.updated_at = datetime.utcnow()
-            await self.db.flush()
-            return True
-        except Exception as e:
-            logger.error(f"Error deleting feature: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to delete feature: {str(e)}"
-            )
-
-    async def get_feature_metrics(self, feature_id: str) -> Dict:
+    async def get_feature_metrics(self, db: AsyncSession, feature_id: str) -> Dict:
         """
         Get metrics for a specific feature.
         
         Args:
+            db: Database session
             feature_id: ID of the feature
             
         Returns:
             Dictionary containing feature metrics
         """
         try:
-            feature = self.db.query(Feature).filter(Feature.id == feature_id).first()
+            feature = await db.get(Feature, feature_id)
             if not feature:
                 raise ValueError(f"Feature {feature_id} not found")
             
             # Get metrics from feature system API
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/features/{feature_id}/metrics",
-                    headers=self._get_headers(),
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await feature_api_request(self._client, "GET", f"/features/{feature_id}/metrics")
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
-            logger.error(f"Error getting metrics for feature {feature_id}: {e}")
+            logger.error("Error getting metrics for feature %s: %s", feature_id, e)
             raise
 
     def _validate_feature_data(self, feature_data: Dict) -> None:
@@ -213,68 +282,133 @@ class FeatureService:
     async def _register_feature_with_api(self, feature: Feature) -> None:
         """Register feature with feature system API."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/features",
-                    headers=self._get_headers(),
-                    json={
-                        "id": feature.id,
-                        "name": feature.name,
-                        "description": feature.description,
-                        "computation_logic": feature.computation_logic
-                    },
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
+            response = await feature_api_request(
+                self._client, "POST",
+                "/features",
+                json={
+                    "id": feature.id,
+                    "name": feature.name,
+                    "description": feature.description,
+                    "computation_logic": feature.computation_logic
+                }
+            )
+            response.raise_for_status()
                 
         except Exception as e:
-            logger.error(f"Error registering feature with API: {e}")
+            logger.error("Error registering feature with API: %s", e)
             raise
 
     async def _update_feature_in_api(self, feature: Feature) -> None:
         """Update feature in feature system API."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    f"{self.api_url}/features/{feature.id}",
-                    headers=self._get_headers(),
-                    json={
-                        "name": feature.name,
-                        "description": feature.description,
-                        "computation_logic": feature.computation_logic
-                    },
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
+            response = await feature_api_request(
+                self._client, "PUT",
+                f"/features/{feature.id}",
+                json={
+                    "name": feature.name,
+                    "description": feature.description,
+                    "computation_logic": feature.computation_logic
+                }
+            )
+            response.raise_for_status()
                 
         except Exception as e:
-            logger.error(f"Error updating feature in API: {e}")
+            logger.error("Error updating feature in API: %s", e)
             raise
 
     async def _remove_feature_from_api(self, feature_id: str) -> None:
         """Remove feature from feature system API."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"{self.api_url}/features/{feature_id}",
-                    headers=self._get_headers(),
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
+            response = await feature_api_request(self._client, "DELETE", f"/features/{feature_id}")
+            response.raise_for_status()
                 
         except Exception as e:
-            logger.error(f"Error removing feature from API: {e}")
+            logger.error("Error removing feature from API: %s", e)
             raise
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop every cached feature API value and miss."""
+        _VALUE_CACHE.clear()
+        _MISSING_VALUE_CACHE.clear()
+
+    async def get_feature_value(self, user_id: str, feature_name: str) -> Optional[float]:
+        """A user's value of a feature from the feature API, or None when it cannot be fetched."""
+        key = (user_id, feature_name)
+        cached = _VALUE_CACHE.get(key)
+        if cached is not None or key in _MISSING_VALUE_CACHE:
+            return cached
+        try:
+            response = await feature_api_request(self._client, "GET", f"/features/{feature_name}/users/{user_id}")
+            response.raise_for_status()
+            value = response.json()["value"]
+        except httpx.HTTPError as e:
+            logger.warning("Error fetching feature value %s for user %s: %s", feature_name, user_id, e)
+            value = None
+        _store_value(key, value)
+        return value
+
+    async def compute_features(self, user_id: str, feature_names: Sequence[str]) -> Dict[str, float]:
+        """
+        Fetch a user's values of several features with one batch request,
+        falling back to concurrent single fetches if the batch call fails.
+        Features without a value are left out. Cached values and misses are
+        not requested again.
+        """
+        results: Dict[str, float] = {}
+        pending: List[str] = []
+        for name in dict.fromkeys(feature_names):
+            key = (user_id, name)
+            cached = _VALUE_CACHE.get(key)
+            if cached is not None:
+                results[name] = cached
+            elif key not in _MISSING_VALUE_CACHE:
+                pending.append(name)
+        if not pending:
+            return results
+
+        try:
+            response = await feature_api_request(
+                self._client, "POST",
+                "/features/batch",
+                json={"user_id": user_id, "features": pending}
+            )
+            response.raise_for_status()
+            values = response.json()["values"]
+        except FeatureAPIUnavailable:
+            return results
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            logger.warning("Batch feature fetch failed, fetching individually: %s", e)
+            results.update(await self._compute_features_individually(user_id, pending))
+            return results
+
+        for name in pending:
+            value = values.get(name)
+            _store_value((user_id, name), value)
+            if value is not None:
+                results[name] = value
+        return results
+
+    async def _compute_features_individually(self, user_id: str, feature_names: List[str]) -> Dict[str, float]:
+        """Fetch each feature value separately, at most MAX_CONCURRENT_FETCHES requests at a time."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        async def fetch(feature_name: str) -> Optional[float]:
+            async with semaphore:
+                return await self.get_feature_value(user_id, feature_name)
+
+        values = await asyncio.gather(*(fetch(name) for name in feature_names))
+        return {name: value for name, value in zip(feature_names, values) if value is not None}
+
     @staticmethod
     async def get_features(
-        db: Session,
+        db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
         search: Optional[str] = None,
         category: Optional[str] = None,
         is_active: Optional[bool] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[Sequence[str]] = None
     ) -> List[Feature]:
         """
         Get features with filtering and pagination.
@@ -291,29 +425,104 @@ class FeatureService:
         Returns:
             List of features matching the criteria
         """
-        query = db.query(Feature)
+        # Tags for the whole page come in one extra query; any other lazy load raises
+        query = select(Feature).options(selectinload(Feature.tags), raiseload('*'))
 
         # Apply filters
         if search:
+            # Bound as a parameter; % and _ in the term match literally
             search_filter = or_(
-                Feature.name.ilike(f"%{search}%"),
-                Feature.description.ilike(f"%{search}%")
+                Feature.name.icontains(search, autoescape=True),
+                Feature.description.icontains(search, autoescape=True)
             )
-            query = query.filter(search_filter)
+            query = query.where(search_filter)
 
         if category:
-            query = query.filter(Feature.category == category)
+            query = query.where(Feature.category == category)
 
         if is_active is not None:
-            query = query.filter(Feature.is_active == is_active)
+            query = query.where(Feature.is_active == is_active)
 
         if tags:
-            query = query.filter(Feature.tags.any(Tag.name.in_(tags)))
+            query = query.where(Feature.tags.any(Tag.name.in_(tags)))
+
+        result = await db.scalars(query.offset(skip).limit(limit))
+        return result.all()
+
+    @staticmethod
+    async def get_feature_page(db: AsyncSession, skip: int = 0, limit: int = 100) -> Tuple[List[Feature], int]:
+        """
+        Get a page of features ordered by name, together with the total count.
+        
+        Args:
+            db: Database session
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            
+        Returns:
+            Tuple of the page's features and the total number of features
+        """
+        query = select(Feature).options(selectinload(Feature.tags), raiseload('*'))
+        return await fetch_page(db, query.order_by(Feature.name), skip, limit)
 
-        return query.offset(skip).limit(limit).all()
+    @staticmethod
+    async def list_features(
+        db: AsyncSession,
+        page: int = 1,
+        page_size: int = 100,
+        data_type: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        A page of the feature listing, ordered by name.
+        Items hold the listing columns only; use get_feature for a full feature.
+        Pass the previous page's ``next_cursor`` as ``cursor`` to page by name
+        without an OFFSET scan; without a cursor ``page`` is used. The total of
+        an unfiltered listing is MySQL's table statistics estimate.
+        """
+        query = select(*_FEATURE_LIST_COLUMNS)
+
+        # Apply filters
+        filters = []
+        if data_type:
+            filters.append(Feature.data_type == data_type)
+        if is_active is not None:
+            filters.append(Feature.is_active == is_active)
+        if search:
+            filters.append(or_(
+                Feature.name.icontains(search, autoescape=True),
+                Feature.description.icontains(search, autoescape=True)
+            ))
+        if filters:
+            query = query.where(*filters)
+
+        # Total: the table statistics estimate when unfiltered, an exact count otherwise
+        total = None
+        if not filters and db.bind.dialect.name == "mysql":
+            total = await db.scalar(_FEATURE_ROW_ESTIMATE)
+        if total is None:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+        # Apply pagination
+        query = query.order_by(Feature.name).limit(page_size)
+        if cursor is not None:
+            query = query.where(Feature.name > cursor)
+        else:
+            query = query.offset((page - 1) * page_size)
+        items = [dict(row) for row in (await db.execute(query)).mappings()]
+
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": items[-1]["name"] if len(items) == page_size else None
+        }
 
     @staticmethod
-    async def get_feature_by_id(db: Session, feature_id: int) -> Feature:
+    async def get_feature_by_id(db: AsyncSession, feature_id: int) -> Feature:
         """
         Retrieve a feature by its ID.
         
@@ -327,7 +536,7 @@ class FeatureService:
         Raises:
             HTTPException: If feature is not found
         """
-        feature = db.query(Feature).filter(Feature.id == feature_id).first()
+        feature = await FeatureService.get_feature(db, feature_id)
         if not feature:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -336,7 +545,20 @@ class FeatureService:
         return feature
 
     @staticmethod
-    async def get_feature_by_name(db: Session, name: str) -> Feature:
+    async def get_feature(db: AsyncSession, feature_id: int) -> Optional[Feature]:
+        """
+        Retrieve a feature by its ID with its tags loaded, or None if it does not exist.
+        Served from the session's identity map when the row is already loaded;
+        otherwise its tags are joined into the same query.
+        """
+        feature = await db.get(Feature, feature_id, options=[joinedload(Feature.tags)])
+        # db.get skips loader options for a row already in the session
+        if feature is not None and "tags" in inspect(feature).unloaded:
+            await db.refresh(feature, attribute_names=["tags"])
+        return feature
+
+    @staticmethod
+    async def get_feature_by_name(db: AsyncSession, name: str) -> Feature:
         """
         Retrieve a feature by its name.
         
@@ -350,7 +572,9 @@ class FeatureService:
         Raises:
             HTTPException: If feature is not found
         """
-        feature = db.query(Feature).filter(Feature.name == name).first()
+        feature = await db.scalar(
+            select(Feature).where(Feature.name == name).options(joinedload(Feature.tags))
+        )
         if not feature:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -359,7 +583,29 @@ class FeatureService:
         return feature
 
     @staticmethod
-    async def create_feature(db: Session, feature: FeatureCreate) -> Feature:
+    async def _get_or_create_tags(db: AsyncSession, names: Sequence[str]) -> List[Tag]:
+        """
+        Resolve tag names to Tag rows, in order and without duplicates.
+        Existing tags are fetched with one IN query; missing ones are added to the session.
+        
+        Args:
+            db: Database session
+            names: Tag names
+            
+        Returns:
+            Tag instances for the given names
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        existing = {tag.name: tag for tag in await db.scalars(select(Tag).where(Tag.name.in_(names)))}
+        missing = [Tag(name=name) for name in names if name not in existing]
+        db.add_all(missing)
+        existing.update((tag.name, tag) for tag in missing)
+        return [existing[name] for name in names]
+
+    @staticmethod
+    async def create_feature(db: AsyncSession, feature: FeatureCreate) -> Feature:
         """
         Create a new feature.
         
@@ -371,33 +617,65 @@ class FeatureService:
             Created feature instance
         """
         # Create tags if they don't exist
-        tags = []
-        for tag_name in feature.tags:
-            tag = db.query(Tag).filter(Tag.name == tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-            tags.append(tag)
+        tags = await FeatureService._get_or_create_tags(db, feature.tags)
         
         # Create feature
-        db_feature = Feature(
-            name=feature.name,
-            description=feature.description,
-            data_type=feature.data_type,
-            constraints=feature.constraints,
-            is_active=feature.is_active,
-            importance_score=feature.importance_score,
-            category=feature.category,
-            tags=tags
-        )
+        db_feature = Feature(**feature.model_dump(exclude={'tags'}), tags=tags)
         
         db.add(db_feature)
-        await db.flush()
+        try:
+            await db.flush()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Feature with name '{feature.name}' already exists"
+            )
+        _forget_feature(db_feature.id)
         return db_feature
 
+    @staticmethod
+    async def bulk_create_features(db: AsyncSession, features: Sequence[FeatureCreate]) -> int:
+        """
+        Create many features with one executemany INSERT, bypassing the ORM unit of work.
+        
+        Args:
+            db: Database session
+            features: Feature creation data
+            
+        Returns:
+            Number of features created
+        """
+        if not features:
+            return 0
+        try:
+            await db.execute(insert(Feature), [feature.model_dump(exclude={'tags'}) for feature in features])
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A feature with one of these names already exists"
+            )
+
+        # Names are unique, so new IDs are read back by name to link tags in one more INSERT
+        tagged = {feature.name: list(dict.fromkeys(feature.tags)) for feature in features if feature.tags}
+        if tagged:
+            ids = dict((await db.execute(
+                select(Feature.name, Feature.id).where(Feature.name.in_(tagged))
+            )).all())
+            tags = await FeatureService._get_or_create_tags(db, [name for names in tagged.values() for name in names])
+            await db.flush()
+            tag_ids = {tag.name: tag.id for tag in tags}
+            await db.execute(insert(feature_tags), [
+                {"feature_id": ids[feature_name], "tag_id": tag_ids[tag_name]}
+                for feature_name, tag_names in tagged.items()
+                for tag_name in tag_names
+            ])
+        return len(features)
+
     @staticmethod
     async def update_feature(
-        db: Session,
+        db: AsyncSession,
         feature_id: int,
         feature_update: FeatureUpdate
     ) -> Optional[Feature]:
@@ -415,30 +693,45 @@ class FeatureService:
         db_feature = await FeatureService.get_feature(db, feature_id)
         if not db_feature:
             return None
+        return await FeatureService.apply_feature_update(db, db_feature, feature_update)
 
-        # Update tags if provided
-        if feature_update.tags is not None:
-            tags = []
-            for tag_name in feature_update.tags:
-                tag = db.query(Tag).filter(Tag.name == tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.add(tag)
-                tags.append(tag)
-            db_feature.tags = tags
-
-        # Update other fields
-        update_data = feature_update.dict(exclude_unset=True)
-        update_data.pop('tags', None)  # Remove tags as they're handled separately
+    @staticmethod
+    async def apply_feature_update(
+        db: AsyncSession,
+        db_feature: Feature,
+        feature_update: FeatureUpdate
+    ) -> Feature:
+        """
+        Apply an update to a feature that has already been loaded.
         
-        for field, value in update_data.items():
-            setattr(db_feature, field, value)
+        Args:
+            db: Database session
+            db_feature: Feature to update
+            feature_update: Update data
+            
+        Returns:
+            Updated feature instance
+        """
+        # Changed columns go out as one UPDATE; the loaded instance is synced in Python.
+        # updated_at is set here because a SQL now() could not be synced without a re-SELECT
+        values = feature_update.model_dump(exclude_unset=True, exclude={'tags'})
+        if values:
+            await db.execute(
+                update(Feature)
+                .where(Feature.id == db_feature.id)
+                .values(**values, updated_at=datetime.utcnow())
+            )
 
-        await db.flush()
+        # Tags are a relationship, so they still go through the unit of work
+        if feature_update.tags is not None:
+            db_feature.tags = await FeatureService._get_or_create_tags(db, feature_update.tags)
+            await db.flush()
+
+        _forget_feature(db_feature.id)
         return db_feature
 
     @staticmethod
-    async def delete_feature(db: Session, feature_id: int) -> bool:
+    async def delete_feature(db: AsyncSession, feature_id: int) -> bool:
         """
         Delete a feature.
         
@@ -449,16 +742,33 @@ class FeatureService:
         Returns:
             True if feature was deleted, False if not found
         """
-        db_feature = await FeatureService.get_feature(db, feature_id)
-        if not db_feature:
-            return False
+        # Deleted without loading it: values and tag links go by ON DELETE CASCADE,
+        # risk factors are detached as the ORM cascade would have done
+        await db.execute(
+            update(RiskFactor)
+            .where(RiskFactor.feature_id == feature_id)
+            .values(feature_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(delete(Feature).where(Feature.id == feature_id))
+        _forget_feature(feature_id)
+        return result.rowcount > 0
 
-        db.delete(db_feature)
+    @staticmethod
+    async def delete_loaded_feature(db: AsyncSession, db_feature: Feature) -> None:
+        """
+        Delete a feature that has already been loaded.
+        
+        Args:
+            db: Database session
+            db_feature: Feature to delete
+        """
+        await db.delete(db_feature)
         await db.flush()
-        return True
+        _forget_feature(db_feature.id)
 
     @staticmethod
-    async def validate_feature(db: Session, feature_id: int) -> FeatureValidation:
+    async def validate_feature(db: AsyncSession, feature_id: int) -> FeatureValidation:
         """
         Validate a feature's configuration.
         
@@ -491,9 +801,25 @@ class FeatureService:
             errors=errors
         )
 
+    @staticmethod
+    async def _get_feature_rules(
+        db: AsyncSession,
+        feature_id: int
+    ) -> Optional[Tuple[str, Mapping[str, Any]]]:
+        """A feature's data type and constraints, from the rules cache or two columns of its row."""
+        rules = _FEATURE_RULES.get(feature_id)
+        if rules is None:
+            row = (await db.execute(
+                select(Feature.data_type, Feature.constraints).where(Feature.id == feature_id)
+            )).first()
+            if row is None:
+                return None
+            rules = _FEATURE_RULES[feature_id] = (row.data_type, row.constraints or {})
+        return rules
+
     @staticmethod
     async def validate_feature_value(
-        db: Session,
+        db: AsyncSession,
         feature_id: int,
         value: Any
     ) -> FeatureValidation:
@@ -508,90 +834,99 @@ class FeatureService:
         Returns:
             Validation result
         """
-        feature = await FeatureService.get_feature(db, feature_id)
-        if not feature:
+        rules = await FeatureService._get_feature_rules(db, feature_id)
+        if rules is None:
             return FeatureValidation(is_valid=False, errors=["Feature not found"])
 
-        errors = []
-
-        # Validate based on data type
-        if feature.data_type == "numeric":
-            if not isinstance(value, (int, float)):
-                errors.append("Value must be numeric")
-            else:
-                min_val = feature.constraints.get("min")
-                max_val = feature.constraints.get("max")
-                if min_val is not None and value < min_val:
-                    errors.append(f"Value must be greater than or equal to {min_val}")
-                if max_val is not None and value > max_val:
-                    errors.append(f"Value must be less than or equal to {max_val}")
-
-        elif feature.data_type == "categorical":
-            categories = feature.constraints.get("categories", [])
-            if value not in categories:
-                errors.append(f"Value must be one of: {', '.join(categories)}")
-
-        elif feature.data_type == "boolean":
-            if not isinstance(value, bool):
-                errors.append("Value must be a boolean")
-
-        elif feature.data_type == "text":
-            if not isinstance(value, str):
-                errors.append("Value must be a string")
-            else:
-                max_length = feature.constraints.get("max_length")
-                if max_length and len(value) > max_length:
-                    errors.append(f"Text length must be less than or equal to {max_length}")
+        data_type, constraints = rules
+        validator = _VALIDATORS.get(data_type)
+        errors = validator(value, constraints) if validator else []
+        return FeatureValidation(is_valid=len(errors) == 0, errors=errors)
 
-        elif feature.data_type == "date":
-            try:
-                datetime.fromisoformat(value.replace('Z', '+00:00'))
-            except (ValueError, AttributeError):
-                errors.append("Value must be a valid ISO format date string")
+    @staticmethod
+    async def validate_feature_values(
+        db: AsyncSession,
+        feature_id: int,
+        values: Sequence[Any],
+        fail_fast: bool = False,
+        max_errors: int = 100
+    ) -> FeatureValidation:
+        """
+        Validate many values against a feature's constraints, reading its rules once.
+        Each error names the index of the value it is about.
+        
+        Args:
+            db: Database session
+            feature_id: ID of the feature to validate against
+            values: Values to validate
+            fail_fast: Stop at the first invalid value
+            max_errors: Most error messages to return; the rest are counted in a final message
+            
+        Returns:
+            Validation result
+        """
+        rules = await FeatureService._get_feature_rules(db, feature_id)
+        if rules is None:
+            return FeatureValidation(is_valid=False, errors=["Feature not found"])
 
+        data_type, constraints = rules
+        errors: List[str] = []
+        skipped = 0
+        for index, value_errors in _value_errors(values, data_type, constraints):
+            room = max(max_errors - len(errors), 0)
+            errors.extend(f"Value {index}: {message}" for message in value_errors[:room])
+            skipped += len(value_errors[room:])
+            if fail_fast:
+                break
+
+        if skipped:
+            errors.append(f"...and {skipped} more errors")
         return FeatureValidation(is_valid=len(errors) == 0, errors=errors)
 
     @staticmethod
     async def set_feature_value(
-        db: Session,
+        db: AsyncSession,
         feature_id: int,
         value_data: FeatureValueCreate
     ) -> FeatureValue:
-        """Set a value for a feature-entity combination."""
+        """
+        Set a value for a feature-entity combination.
+        The row is written without being read back, so the returned value
+        carries the written fields only, not ``id`` or timestamps.
+        """
         try:
             # Validate the value first
             validation = await FeatureService.validate_feature_value(db, feature_id, value_data.value)
             if not validation.is_valid:
                 raise ValueError(f"Invalid value: {', '.join(validation.errors)}")
 
-            # Get or create feature value
-            feature_value = db.query(FeatureValue).filter(
-                and_(
-                    FeatureValue.feature_id == feature_id,
-                    FeatureValue.entity_id == value_data.entity_id
-                )
-            ).first()
-
-            if feature_value:
-                feature_value.value = value_data.value
-                feature_value.updated_at = datetime.utcnow()
+            # One INSERT ... ON DUPLICATE KEY/ON CONFLICT UPDATE on (feature_id, entity_id)
+            insert = _UPSERT_INSERTS[db.bind.dialect.name]
+            stmt = insert(FeatureValue).values(
+                feature_id=feature_id,
+                entity_id=value_data.entity_id,
+                value=value_data.value
+            )
+            if db.bind.dialect.name == "mysql":
+                stmt = stmt.on_duplicate_key_update(value=stmt.inserted.value, updated_at=func.now())
             else:
-                feature_value = FeatureValue(
-                    feature_id=feature_id,
-                    entity_id=value_data.entity_id,
-                    value=value_data.value
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[FeatureValue.feature_id, FeatureValue.entity_id],
+                    set_={"value": stmt.excluded.value, "updated_at": func.now()}
                 )
-                db.add(feature_value)
-
-            await db.flush()
-            return feature_value
+            await db.execute(stmt)
+            return FeatureValue(
+                feature_id=feature_id,
+                entity_id=value_data.entity_id,
+                value=value_data.value
+            )
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
         except Exception as e:
-            logger.error(f"Error setting feature value: {e}")
+            logger.error("Error setting feature value: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to set feature value: {str(e)}"
@@ -599,22 +934,47 @@ class FeatureService:
 
     async def get_feature_values(
         self,
+        db: AsyncSession,
         feature_id: int,
-        entity_ids: Optional[List[int]] = None,
+        entity_ids: Optional[Sequence[int]] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[FeatureValue]:
-        """Get feature values with optional filtering by entity IDs."""
+        """
+        Get feature values ordered by id, optionally filtered by entity IDs.
+        Pass the last seen id as ``after_id`` to page by keyset instead of
+        ``skip``. Long entity ID lists are queried in chunks.
+        """
         try:
-            query = self.db.query(FeatureValue).filter(FeatureValue.feature_id == feature_id)
-            
-            if entity_ids:
-                query = query.filter(FeatureValue.entity_id.in_(entity_ids))
-            
-            return query.offset(skip).limit(limit).all()
+            query = select(FeatureValue).where(FeatureValue.feature_id == feature_id)
+            if after_id is not None:
+                query = query.where(FeatureValue.id > after_id)
+            query = query.order_by(FeatureValue.id)
+
+            if not entity_ids or len(entity_ids) <= ENTITY_ID_CHUNK_SIZE:
+                if entity_ids:
+                    query = query.where(FeatureValue.entity_id.in_(entity_ids))
+                result = await db.scalars(query.offset(skip).limit(limit))
+                return result.all()
+
+            # Each chunk yields its first skip + limit rows; the page is cut from their merge
+            rows: List[FeatureValue] = []
+            for start in range(0, len(entity_ids), ENTITY_ID_CHUNK_SIZE):
+                chunk = entity_ids[start:start + ENTITY_ID_CHUNK_SIZE]
+                result = await db.scalars(query.where(FeatureValue.entity_id.in_(chunk)).limit(skip + limit))
+                rows.extend(result.all())
+            rows.sort(key=lambda row: row.id)
+            return rows[skip:skip + limit]
         except Exception as e:
-            logger.error(f"Error getting feature values: {e}")
+            logger.error("Error getting feature values: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get feature values: {str(e)}"
-            ) 
\ No newline at end of file
+            )
+
+
+@lru_cache(maxsize=None)
+def get_feature_service() -> FeatureService:
+    """Return the process-wide FeatureService instance."""
+    return FeatureService()
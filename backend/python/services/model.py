@@ -1,139 +1,201 @@
-from typing import Dict, List, Optional
-from sqlalchemy.orm import Session
-from models import ModelAdjustment
-from config import FEATURE_API_URL, FEATURE_API_HEADERS
-import requests
+from typing import Dict, List
+from functools import lru_cache
+import asyncio
+import logging
+import httpx
+import orjson
 
-class ModelService:
-    def __init__(self, db: Session):
-        self.db = db
+from ..cache import clear_shared, get_or_load_shared
+from ..config import settings, FEATURE_API_HEADERS
+from ..upstream import FEATURE_API_CONNECT_RETRIES, feature_api_request
 
-    def get_model_metrics(self) -> Dict:
+logger = logging.getLogger(__name__)
+
+# Predictions for large user lists are requested in chunks of this many users,
+# with at most MAX_CONCURRENT_PREDICTIONS chunk requests in flight
+PREDICTION_CHUNK_SIZE = 500
+MAX_CONCURRENT_PREDICTIONS = 20
+
+# Slow-changing model API reads (metrics, cutoff, feature importance) are kept
+# in the shared cache under this namespace; applied model adjustments clear it
+MODEL_CACHE_NAMESPACE = "model"
+
+class ModelAPIService:
+    """
+    Reads and simulations served by the model API. Model adjustments and their
+    history are recorded by ModelService in services/model_service.py.
+    """
+
+    def __init__(self):
+        # One pooled client for the process so model API calls reuse keep-alive connections
+        self._client = httpx.AsyncClient(
+            base_url=settings.FEATURE_API_URL,
+            headers=FEATURE_API_HEADERS,
+            timeout=httpx.Timeout(settings.FEATURE_API_TIMEOUT, connect=settings.FEATURE_API_CONNECT_TIMEOUT),
+            # Pool limits and HTTP/2 belong to the transport; a client given a transport ignores its own
+            transport=httpx.AsyncHTTPTransport(
+                retries=FEATURE_API_CONNECT_RETRIES,
+                http2=settings.FEATURE_API_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.FEATURE_API_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FEATURE_API_MAX_KEEPALIVE
+                )
+            )
+        )
+        self._prediction_slots = asyncio.Semaphore(MAX_CONCURRENT_PREDICTIONS)
+
+    async def aclose(self) -> None:
+        """
+        Close the model API client
+        """
+        await self._client.aclose()
+
+    async def _get_cached(self, key: str, path: str) -> Dict:
+        """
+        GET a model API resource through the shared cache. Upstream errors
+        propagate and are not cached.
+        """
+        async def load() -> bytes:
+            response = await feature_api_request(self._client, "GET", path)
+            response.raise_for_status()
+            return response.content
+
+        return orjson.loads(await get_or_load_shared(MODEL_CACHE_NAMESPACE, key, load, settings.MODEL_API_CACHE_TTL))
+
+    async def get_model_metrics(self) -> Dict:
         """
         Get current model performance metrics
         """
         try:
-            response = requests.get(
-                f"{FEATURE_API_URL}/model/metrics",
-                headers=FEATURE_API_HEADERS
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching model metrics: {e}")
+            return await self._get_cached("metrics", "/model/metrics")
+        except httpx.HTTPError as e:
+            logger.error("Error fetching model metrics: %s", e)
             return {}
 
-    def get_model_cutoff(self) -> float:
+    async def get_model_cutoff(self) -> float:
         """
         Get current model cutoff threshold
         """
         try:
-            response = requests.get(
-                f"{FEATURE_API_URL}/model/cutoff",
-                headers=FEATURE_API_HEADERS
-            )
-            response.raise_for_status()
-            return response.json()["cutoff"]
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching model cutoff: {e}")
+            return (await self._get_cached("cutoff", "/model/cutoff"))["cutoff"]
+        except httpx.HTTPError as e:
+            logger.error("Error fetching model cutoff: %s", e)
             return 0.5  # Default cutoff
 
-    def update_model_cutoff(self, new_cutoff: float) -> bool:
+    async def update_model_cutoff(self, new_cutoff: float) -> bool:
         """
         Update model cutoff threshold
         """
         try:
-            response = requests.post(
-                f"{FEATURE_API_URL}/model/cutoff",
-                headers=FEATURE_API_HEADERS,
+            response = await feature_api_request(
+                self._client, "POST",
+                "/model/cutoff",
                 json={"cutoff": new_cutoff}
             )
             response.raise_for_status()
-            return True
-        except requests.exceptions.RequestException as e:
-            print(f"Error updating model cutoff: {e}")
+        except httpx.HTTPError as e:
+            logger.error("Error updating model cutoff: %s", e)
             return False
+        await clear_shared(MODEL_CACHE_NAMESPACE)
+        return True
 
-    def get_model_predictions(self, user_ids: List[str]) -> Dict[str, float]:
+    async def get_dashboard(self, days: int = 30) -> Dict:
         """
-        Get model predictions for multiple users
+        Get metrics, cutoff, feature importance and performance trends together,
+        fetched concurrently
+        """
+        metrics, cutoff, importance, trends = await asyncio.gather(
+            self.get_model_metrics(),
+            self.get_model_cutoff(),
+            self.get_feature_importance(),
+            self.get_model_performance_trends(days)
+        )
+        return {
+            "metrics": metrics,
+            "cutoff": cutoff,
+            "feature_importance": importance,
+            "performance_trends": trends
+        }
+
+    async def get_model_predictions(self, user_ids: List[str]) -> Dict[str, float]:
+        """
+        Get model predictions for multiple users, requesting large lists
+        in concurrent chunks
+        """
+        if len(user_ids) <= PREDICTION_CHUNK_SIZE:
+            return await self._predict_chunk(user_ids)
+
+        chunks = [
+            user_ids[i:i + PREDICTION_CHUNK_SIZE]
+            for i in range(0, len(user_ids), PREDICTION_CHUNK_SIZE)
+        ]
+        predictions: Dict[str, float] = {}
+        for chunk_predictions in await asyncio.gather(*(self._predict_chunk(c) for c in chunks)):
+            predictions.update(chunk_predictions)
+        return predictions
+
+    async def _predict_chunk(self, user_ids: List[str]) -> Dict[str, float]:
+        """
+        Get model predictions for one chunk of users. The request and response
+        bodies are encoded and parsed with orjson rather than httpx's json module
         """
         try:
-            response = requests.post(
-                f"{FEATURE_API_URL}/model/predict",
-                headers=FEATURE_API_HEADERS,
-                json={"user_ids": user_ids}
-            )
+            async with self._prediction_slots:
+                response = await feature_api_request(
+                    self._client, "POST",
+                    "/model/predict",
+                    content=orjson.dumps({"user_ids": user_ids})  # Content-Type comes from the client headers
+                )
             response.raise_for_status()
-            return response.json()["predictions"]
-        except requests.exceptions.RequestException as e:
-            print(f"Error getting model predictions: {e}")
+            return orjson.loads(response.content)["predictions"]
+        except httpx.HTTPError as e:
+            logger.error("Error getting model predictions: %s", e)
             return {}
 
-    def get_feature_importance(self) -> Dict[str, float]:
+    async def get_feature_importance(self) -> Dict[str, float]:
         """
         Get feature importance scores from the model
         """
         try:
-            response = requests.get(
-                f"{FEATURE_API_URL}/model/feature-importance",
-                headers=FEATURE_API_HEADERS
-            )
-            response.raise_for_status()
-            return response.json()["importance"]
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching feature importance: {e}")
+            return (await self._get_cached("importance", "/model/feature-importance"))["importance"]
+        except httpx.HTTPError as e:
+            logger.error("Error fetching feature importance: %s", e)
             return {}
 
-    def simulate_cutoff_change(self, new_cutoff: float) -> Dict:
+    async def simulate_cutoff_change(self, new_cutoff: float) -> Dict:
         """
         Simulate the impact of changing the model cutoff
         """
         try:
-            response = requests.post(
-                f"{FEATURE_API_URL}/model/simulate-cutoff",
-                headers=FEATURE_API_HEADERS,
+            response = await feature_api_request(
+                self._client, "POST",
+                "/model/simulate-cutoff",
                 json={"cutoff": new_cutoff}
             )
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error simulating cutoff change: {e}")
+        except httpx.HTTPError as e:
+            logger.error("Error simulating cutoff change: %s", e)
             return {}
 
-    def record_model_adjustment(self, adjustment_data: Dict) -> ModelAdjustment:
-        """
-        Record a model adjustment in the database
-        """
-        adjustment = ModelAdjustment(
-            previous_cutoff=adjustment_data["previous_cutoff"],
-            new_cutoff=adjustment_data["new_cutoff"],
-            expected_improvements=adjustment_data["expected_improvements"],
-            rationale=adjustment_data["rationale"]
-        )
-        self.db.add(adjustment)
-        self.db.commit()
-        self.db.refresh(adjustment)
-        return adjustment
-
-    def get_adjustment_history(self) -> List[ModelAdjustment]:
-        """
-        Get history of model adjustments
-        """
-        return self.db.query(ModelAdjustment).order_by(ModelAdjustment.adjustment_date.desc()).all()
-
-    def get_model_performance_trends(self, days: int = 30) -> Dict:
+    async def get_model_performance_trends(self, days: int = 30) -> Dict:
         """
         Get model performance trends over time
         """
         try:
-            response = requests.get(
-                f"{FEATURE_API_URL}/model/performance-trends",
-                headers=FEATURE_API_HEADERS,
+            response = await feature_api_request(
+                self._client, "GET",
+                "/model/performance-trends",
                 params={"days": days}
             )
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching performance trends: {e}")
-            return {} 
\ No newline at end of file
+        except httpx.HTTPError as e:
+            logger.error("Error fetching performance trends: %s", e)
+            return {} 
+
+
+@lru_cache(maxsize=None)
+def get_model_api_service() -> ModelAPIService:
+    """Return the process-wide ModelAPIService instance."""
+    return ModelAPIService()
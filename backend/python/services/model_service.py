@@ -1,42 +1,72 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Dict, List, Optional
+import asyncio
 import logging
 from uuid import uuid4
+from functools import lru_cache
 from datetime import datetime
 import httpx
+from cachetools import TTLCache
 
+from ..cache import clear_shared
 from ..models import ModelAdjustment, ModelMetrics
-from ..config import settings
+from ..config import settings, FEATURE_API_HEADERS
+from ..upstream import FEATURE_API_CONNECT_RETRIES, feature_api_request
+from .model import MODEL_CACHE_NAMESPACE
 
 logger = logging.getLogger(__name__)
 
+# Model API cutoff and state, keyed by name; dropped after this process applies an adjustment
+_MODEL_STATE_CACHE: TTLCache = TTLCache(maxsize=2, ttl=settings.MODEL_STATE_CACHE_TTL)
+
 class ModelService:
-    def __init__(self, db: Session):
-        self.db = db
+    """Model management operations. Holds no session; callers pass ``db`` per call."""
+
+    def __init__(self):
         self.feature_api_url = settings.FEATURE_API_URL
-        self.feature_api_key = settings.FEATURE_API_KEY
+        # One pooled client for the process so model API calls reuse keep-alive connections
+        self._client = httpx.AsyncClient(
+            base_url=self.feature_api_url,
+            headers=FEATURE_API_HEADERS,
+            timeout=httpx.Timeout(settings.FEATURE_API_TIMEOUT, connect=settings.FEATURE_API_CONNECT_TIMEOUT),
+            # Pool limits and HTTP/2 belong to the transport; a client given a transport ignores its own
+            transport=httpx.AsyncHTTPTransport(
+                retries=FEATURE_API_CONNECT_RETRIES,
+                http2=settings.FEATURE_API_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.FEATURE_API_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FEATURE_API_MAX_KEEPALIVE
+                )
+            )
+        )
 
-    async def get_model_metrics(self, period: str = "30d") -> Dict:
+    async def aclose(self) -> None:
+        """Close the model API client."""
+        await self._client.aclose()
+
+    async def get_model_metrics(self, db: AsyncSession, period: str = "30d") -> Dict:
         """
         Get model performance metrics.
         
         Args:
+            db: Database session
             period: Time period for metrics (e.g., "30d", "90d", "1y")
             
         Returns:
             Dictionary containing model metrics
         """
         try:
-            # Get metrics from database
-            metrics = (
-                self.db.query(ModelMetrics)
-                .filter(ModelMetrics.period == period)
-                .order_by(ModelMetrics.evaluation_date.desc())
-                .all()
+            # Metrics come from the database and the cutoff from the API, fetched concurrently
+            result, current_cutoff = await asyncio.gather(
+                db.scalars(
+                    select(ModelMetrics)
+                    .where(ModelMetrics.period == period)
+                    .order_by(ModelMetrics.evaluation_date.desc())
+                ),
+                self.get_model_cutoff()
             )
-            
-            # Get current model cutoff
-            current_cutoff = await self._get_model_cutoff()
+            metrics = result.all()
             
             return {
                 "current_cutoff": current_cutoff,
@@ -46,7 +76,7 @@ class ModelService:
                         "value": m.metric_value,
                         "evaluation_date": m.evaluation_date.isoformat(),
                         "period": m.period,
-                        "metadata": m.metadata
+                        "metadata": m.meta_json
                     }
                     for m in metrics
                 ]
@@ -56,12 +86,19 @@ class ModelService:
             logger.error(f"Error fetching model metrics: {e}")
             raise
 
-    async def record_model_adjustment(self, adjustment_data: Dict) -> Dict:
+    async def record_model_adjustment(
+        self,
+        db: AsyncSession,
+        adjustment_data: Dict,
+        current_state: Optional[Dict] = None
+    ) -> Dict:
         """
         Record a model adjustment.
         
         Args:
+            db: Database session
             adjustment_data: Dictionary containing adjustment information
+            current_state: Model state already fetched by the caller, if any
             
         Returns:
             Created adjustment record
@@ -71,7 +108,8 @@ class ModelService:
             self._validate_adjustment_data(adjustment_data)
             
             # Get current model state
-            current_state = await self._get_model_state()
+            if current_state is None:
+                current_state = await self._get_model_state()
             
             # Create adjustment record
             adjustment = ModelAdjustment(
@@ -85,12 +123,14 @@ class ModelService:
                 status="pending"
             )
             
-            self.db.add(adjustment)
-            self.db.commit()
-            self.db.refresh(adjustment)
+            db.add(adjustment)
+            await db.commit()
+            await db.refresh(adjustment)
             
             # Apply adjustment in feature system API
             await self._apply_model_adjustment(adjustment)
+            _MODEL_STATE_CACHE.clear()
+            await clear_shared(MODEL_CACHE_NAMESPACE)
             
             return {
                 "id": adjustment.id,
@@ -106,7 +146,7 @@ class ModelService:
             
         except Exception as e:
             logger.error(f"Error recording model adjustment: {e}")
-            self.db.rollback()
+            await db.rollback()
             raise
 
     async def get_model_cutoff(self) -> float:
@@ -116,24 +156,31 @@ class ModelService:
         Returns:
             Current cutoff value
         """
+        cutoff = _MODEL_STATE_CACHE.get("cutoff")
+        if cutoff is not None:
+            return cutoff
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.feature_api_url}/model/cutoff",
-                    headers={"Authorization": f"Bearer {self.feature_api_key}"}
-                )
-                response.raise_for_status()
-                return response.json()["cutoff"]
-                
+            response = await feature_api_request(self._client, "GET", "/model/cutoff")
+            response.raise_for_status()
+            cutoff = _MODEL_STATE_CACHE["cutoff"] = response.json()["cutoff"]
+            return cutoff
+            
         except Exception as e:
             logger.error(f"Error getting model cutoff: {e}")
             raise
 
-    async def update_model_cutoff(self, new_cutoff: float, rationale: str, created_by: str) -> Dict:
+    async def update_model_cutoff(
+        self,
+        db: AsyncSession,
+        new_cutoff: float,
+        rationale: str,
+        created_by: str
+    ) -> Dict:
         """
         Update model cutoff threshold.
         
         Args:
+            db: Database session
             new_cutoff: New cutoff value
             rationale: Reason for the change
             created_by: User making the change
@@ -142,39 +189,45 @@ class ModelService:
             Created adjustment record
         """
         try:
-            current_cutoff = await self._get_model_cutoff()
-            
+            async def expected_impact() -> Dict:
+                current_cutoff = await self.get_model_cutoff()
+                return await self._simulate_cutoff_change(current_cutoff, new_cutoff)
+
+            # The model state does not depend on the cutoff simulation, so both go out together
+            current_state, impact = await asyncio.gather(self._get_model_state(), expected_impact())
+
             adjustment_data = {
                 "type": "cutoff",
                 "new_value": {"cutoff": new_cutoff},
                 "rationale": rationale,
-                "expected_impact": await self._simulate_cutoff_change(current_cutoff, new_cutoff),
+                "expected_impact": impact,
                 "created_by": created_by
             }
             
-            return await self.record_model_adjustment(adjustment_data)
+            return await self.record_model_adjustment(db, adjustment_data, current_state=current_state)
             
         except Exception as e:
             logger.error(f"Error updating model cutoff: {e}")
             raise
 
-    async def get_adjustment_history(self, limit: int = 10) -> List[Dict]:
+    async def get_adjustment_history(self, db: AsyncSession, limit: int = 10) -> List[Dict]:
         """
         Get history of model adjustments.
         
         Args:
+            db: Database session
             limit: Maximum number of adjustments to return
             
         Returns:
             List of adjustment records
         """
         try:
-            adjustments = (
-                self.db.query(ModelAdjustment)
+            result = await db.scalars(
+                select(ModelAdjustment)
                 .order_by(ModelAdjustment.created_at.desc())
                 .limit(limit)
-                .all()
             )
+            adjustments = result.all()
             
             return [
                 {
@@ -197,15 +250,15 @@ class ModelService:
 
     async def _get_model_state(self) -> Dict:
         """Get current model state from feature system API."""
+        state = _MODEL_STATE_CACHE.get("state")
+        if state is not None:
+            return state
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.feature_api_url}/model/state",
-                    headers={"Authorization": f"Bearer {self.feature_api_key}"}
-                )
-                response.raise_for_status()
-                return response.json()
-                
+            response = await feature_api_request(self._client, "GET", "/model/state")
+            response.raise_for_status()
+            state = _MODEL_STATE_CACHE["state"] = response.json()
+            return state
+            
         except Exception as e:
             logger.error(f"Error getting model state: {e}")
             raise
@@ -213,19 +266,18 @@ class ModelService:
     async def _apply_model_adjustment(self, adjustment: ModelAdjustment) -> None:
         """Apply model adjustment in feature system API."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.feature_api_url}/model/adjustments",
-                    headers={"Authorization": f"Bearer {self.feature_api_key}"},
-                    json={
-                        "id": adjustment.id,
-                        "type": adjustment.adjustment_type,
-                        "new_value": adjustment.new_value,
-                        "expected_impact": adjustment.expected_impact
-                    }
-                )
-                response.raise_for_status()
-                
+            response = await feature_api_request(
+                self._client, "POST",
+                "/model/adjustments",
+                json={
+                    "id": adjustment.id,
+                    "type": adjustment.adjustment_type,
+                    "new_value": adjustment.new_value,
+                    "expected_impact": adjustment.expected_impact
+                }
+            )
+            response.raise_for_status()
+            
         except Exception as e:
             logger.error(f"Error applying model adjustment: {e}")
             raise
@@ -233,18 +285,17 @@ class ModelService:
     async def _simulate_cutoff_change(self, current_cutoff: float, new_cutoff: float) -> Dict:
         """Simulate impact of cutoff change."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.feature_api_url}/model/simulate-cutoff",
-                    headers={"Authorization": f"Bearer {self.feature_api_key}"},
-                    json={
-                        "current_cutoff": current_cutoff,
-                        "new_cutoff": new_cutoff
-                    }
-                )
-                response.raise_for_status()
-                return response.json()
-                
+            response = await feature_api_request(
+                self._client, "POST",
+                "/model/simulate-cutoff",
+                json={
+                    "current_cutoff": current_cutoff,
+                    "new_cutoff": new_cutoff
+                }
+            )
+            response.raise_for_status()
+            return response.json()
+            
         except Exception as e:
             logger.error(f"Error simulating cutoff change: {e}")
             raise
@@ -261,4 +312,10 @@ class ModelService:
             raise ValueError("Rationale cannot be empty")
         
         if not adjustment_data["created_by"].strip():
-            raise ValueError("Created by cannot be empty") 
\ No newline at end of file
+            raise ValueError("Created by cannot be empty")
+
+
+@lru_cache(maxsize=None)
+def get_model_service() -> ModelService:
+    """Return the process-wide ModelService instance."""
+    return ModelService()
@@ -1,66 +1,69 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import pandas as pd
-import numpy as np
-from sqlalchemy.orm import Session
-from models import User, Transaction, CreditInquiry, RiskAnalysis
-from config import FEATURE_API_URL, FEATURE_API_HEADERS
-import requests
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import User, Transaction, CreditInquiry, RiskAnalysis
 
 class RiskAnalysisService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def calculate_risk_metrics(self, user_ids: List[str], analysis_period: int = 30) -> Dict:
+    async def calculate_risk_metrics(self, user_ids: List[str], analysis_period: int = 30) -> Dict:
         """
-        Calculate risk metrics for given user IDs
+        Calculate risk metrics for given user IDs. Counts, rates and risk
+        segments are aggregated in SQL; no rows are loaded. Conditional counts
+        use COUNT(CASE ...) so MySQL returns integers rather than DECIMAL sums.
+        The approval rate is the share of approved credit inquiries; the schema
+        records no loan outcomes, so analyses rated "high" stand in for defaults
         """
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=analysis_period)
 
-        # Get user data
-        users = self.db.query(User).filter(User.id.in_(user_ids)).all()
-        
-        # Get transactions
-        transactions = self.db.query(Transaction).filter(
+        total_transactions = await self.db.scalar(select(func.count(Transaction.id)).where(
             Transaction.user_id.in_(user_ids),
-            Transaction.transaction_date.between(start_date, end_date)
-        ).all()
-
-        # Get credit inquiries
-        credit_inquiries = self.db.query(CreditInquiry).filter(
+            Transaction.created_at.between(start_date, end_date)
+        ))
+
+        # Calculate approval rate
+        total_inquiries, approved = (await self.db.execute(select(
+            func.count(CreditInquiry.id),
+            func.count(case((CreditInquiry.status == "approved", 1)))
+        ).where(
             CreditInquiry.user_id.in_(user_ids),
             CreditInquiry.inquiry_date.between(start_date, end_date)
-        ).all()
+        ))).one()
 
-        # Calculate metrics
-        total_users = len(users)
-        total_transactions = len(transactions)
-        total_inquiries = len(credit_inquiries)
+        approval_rate = approved / total_inquiries if total_inquiries else 0
 
-        # Calculate approval and default rates
-        risk_analyses = self.db.query(RiskAnalysis).filter(
+        # Calculate default rate
+        analysis_filter = and_(
             RiskAnalysis.user_id.in_(user_ids),
             RiskAnalysis.analysis_date.between(start_date, end_date)
-        ).all()
-
-        approved = sum(1 for analysis in risk_analyses if analysis.approval_status == "approved")
-        defaulted = sum(1 for analysis in risk_analyses if analysis.default_status == "defaulted")
+        )
+        total_analyses, defaulted = (await self.db.execute(select(
+            func.count(RiskAnalysis.id),
+            func.count(case((RiskAnalysis.risk_level == "high", 1)))
+        ).where(analysis_filter))).one()
 
-        approval_rate = approved / len(risk_analyses) if risk_analyses else 0
-        default_rate = defaulted / len(risk_analyses) if risk_analyses else 0
+        default_rate = defaulted / total_analyses if total_analyses else 0
 
         # Calculate user segments
-        risk_scores = [user.risk_score for user in users if user.risk_score is not None]
-        if risk_scores:
-            low_risk = sum(1 for score in risk_scores if score >= 0.7) / len(risk_scores)
-            medium_risk = sum(1 for score in risk_scores if 0.4 <= score < 0.7) / len(risk_scores)
-            high_risk = sum(1 for score in risk_scores if score < 0.4) / len(risk_scores)
+        scored, low, medium, high = (await self.db.execute(select(
+            func.count(User.risk_score),
+            func.count(case((User.risk_score >= 0.7, 1))),
+            func.count(case((and_(User.risk_score >= 0.4, User.risk_score < 0.7), 1))),
+            func.count(case((User.risk_score < 0.4, 1)))
+        ).where(User.id.in_(user_ids)))).one()
+        if scored:
+            low_risk = low / scored
+            medium_risk = medium / scored
+            high_risk = high / scored
         else:
             low_risk = medium_risk = high_risk = 0
 
         # Analyze trends
-        trends = self._analyze_trends(risk_analyses)
+        trends = await self._analyze_trends(analysis_filter, total_analyses)
 
         return {
             "approval_rate": approval_rate,
@@ -75,31 +78,38 @@ class RiskAnalysisService:
             "total_inquiries": total_inquiries
         }
 
-    def _analyze_trends(self, risk_analyses: List[RiskAnalysis]) -> Dict:
+    async def _analyze_trends(self, analysis_filter, total_analyses: int) -> Dict:
         """
-        Analyze trends in risk metrics
+        Analyze trends in risk metrics, comparing the default rate of the
+        earlier and later half of the matching analyses
         """
-        if not risk_analyses:
+        if not total_analyses:
             return {
                 "default_rate_trend": "insufficient_data",
                 "transaction_frequency_impact": "insufficient_data"
             }
 
-        # Sort analyses by date
-        sorted_analyses = sorted(risk_analyses, key=lambda x: x.analysis_date)
-        
-        # Calculate default rate trend
-        first_half = sorted_analyses[:len(sorted_analyses)//2]
-        second_half = sorted_analyses[len(sorted_analyses)//2:]
-        
-        first_default_rate = sum(1 for x in first_half if x.default_status == "defaulted") / len(first_half)
-        second_default_rate = sum(1 for x in second_half if x.default_status == "defaulted") / len(second_half)
-        
+        # Number the analyses by date so each half is counted in one pass
+        ordered = select(
+            RiskAnalysis.risk_level,
+            func.row_number().over(order_by=RiskAnalysis.analysis_date).label("position")
+        ).where(analysis_filter).subquery()
+
+        half = total_analyses // 2
+        defaulted = ordered.c.risk_level == "high"
+        first_defaulted, second_defaulted = (await self.db.execute(select(
+            func.count(case((and_(ordered.c.position <= half, defaulted), 1))),
+            func.count(case((and_(ordered.c.position > half, defaulted), 1)))
+        ))).one()
+
+        first_default_rate = first_defaulted / half if half else 0
+        second_default_rate = second_defaulted / (total_analyses - half)
+
         default_rate_trend = "increasing" if second_default_rate > first_default_rate else "decreasing"
 
         # Analyze transaction frequency impact
         # This would typically involve more complex analysis of transaction patterns
-        transaction_frequency_impact = "significant" if len(sorted_analyses) > 100 else "moderate"
+        transaction_frequency_impact = "significant" if total_analyses > 100 else "moderate"
 
         return {
             "default_rate_trend": default_rate_trend,
@@ -1,23 +1,54 @@
-from typing import List, Optional
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+import operator
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, func, select
 
+from ..config import settings
+from ..database import fetch_page
 from ..models import Feature, RiskFactor, RiskAssessment
 from ..schemas import (
     RiskFactorCreate, RiskFactorUpdate,
-    RiskAssessmentRequest, RiskAssessmentResponse
+    RiskAssessmentRequest
 )
 
+class _ActiveFactor(NamedTuple):
+    """Detached copy of an active risk factor row, safe to share across sessions."""
+    id: int
+    feature_id: int
+    weight: float
+    threshold: float
+    operator: str
+    matches: Callable[[Any, Any], bool]  # Comparison for ``operator``, resolved at load time
+
+# Factor operators; unknown operators never match
+_OPERATORS = {
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "eq": operator.eq,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "in": lambda value, threshold: value in threshold
+}
+
+def _never_matches(value: Any, threshold: Any) -> bool:
+    return False
+
+# Active risk factors, read by every assessment; changes made through this
+# process drop the entry, other workers reload it after the TTL
+_ACTIVE_FACTORS: TTLCache = TTLCache(maxsize=1, ttl=settings.RISK_FACTOR_CACHE_TTL)
+
 class RiskAssessmentService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_risk_factor(self, risk_factor: RiskFactorCreate) -> RiskFactor:
         """Create a new risk factor."""
-        db_risk_factor = RiskFactor(**risk_factor.dict())
+        db_risk_factor = RiskFactor(**risk_factor.model_dump())
         self.db.add(db_risk_factor)
         await self.db.commit()
+        _ACTIVE_FACTORS.clear()
         await self.db.refresh(db_risk_factor)
         return db_risk_factor
 
@@ -29,21 +60,23 @@ class RiskAssessmentService:
         is_active: Optional[bool] = None
     ) -> dict:
         """List risk factors with pagination and filtering."""
-        query = self.db.query(RiskFactor)
+        query = select(RiskFactor)
         
         if feature_id:
-            query = query.filter(RiskFactor.feature_id == feature_id)
+            query = query.where(RiskFactor.feature_id == feature_id)
         if is_active is not None:
-            query = query.filter(RiskFactor.is_active == is_active)
+            query = query.where(RiskFactor.is_active == is_active)
 
-        total = await query.count()
-        risk_factors = await query.offset((page - 1) * page_size).limit(page_size).all()
+        risk_factors, total = await fetch_page(
+            self.db, query.order_by(RiskFactor.id), (page - 1) * page_size, page_size
+        )
 
         return {
             "items": risk_factors,
             "total": total,
             "page": page,
-            "page_size": page_size
+            "page_size": page_size,
+            "total_pages": -(-total // page_size)
         }
 
     async def update_risk_factor(
@@ -52,26 +85,22 @@ class RiskAssessmentService:
         risk_factor: RiskFactorUpdate
     ) -> Optional[RiskFactor]:
         """Update a risk factor."""
-        db_risk_factor = await self.db.query(RiskFactor).filter(
-            RiskFactor.id == risk_factor_id
-        ).first()
+        db_risk_factor = await self.db.get(RiskFactor, risk_factor_id)
 
         if not db_risk_factor:
             return None
 
-        for field, value in risk_factor.dict(exclude_unset=True).items():
+        for field, value in risk_factor.model_dump(exclude_unset=True).items():
             setattr(db_risk_factor, field, value)
 
         await self.db.commit()
+        _ACTIVE_FACTORS.clear()
         await self.db.refresh(db_risk_factor)
         return db_risk_factor
 
-    async def assess_risk(self, assessment: RiskAssessmentRequest) -> RiskAssessmentResponse:
+    async def assess_risk(self, assessment: RiskAssessmentRequest) -> RiskAssessment:
         """Perform risk assessment based on provided features."""
-        # Get all active risk factors
-        risk_factors = await self.db.query(RiskFactor).filter(
-            RiskFactor.is_active == True
-        ).all()
+        risk_factors = await self._active_factors()
 
         # Calculate risk score based on risk factors
         total_score = 0
@@ -79,7 +108,8 @@ class RiskAssessmentService:
         risk_details = []
 
         for factor in risk_factors:
-            feature_value = assessment.features.get(factor.feature_id)
+            # JSON object keys are strings, so features are keyed by the feature ID's string form
+            feature_value = assessment.features.get(str(factor.feature_id))
             if feature_value is not None:
                 factor_score = self._calculate_factor_score(factor, feature_value)
                 total_score += factor_score
@@ -90,57 +120,41 @@ class RiskAssessmentService:
                     "max_score": factor.weight
                 })
 
-        # Normalize score to 0-100 range
-        normalized_score = (total_score / max_possible_score * 100) if max_possible_score > 0 else 0
+        # Normalize score to 0-1 range
+        normalized_score = (total_score / max_possible_score) if max_possible_score > 0 else 0
 
         # Create risk assessment record
         db_assessment = RiskAssessment(
             customer_id=assessment.customer_id,
             risk_score=normalized_score,
+            risk_level=self._determine_risk_level(normalized_score),
             assessment_date=datetime.utcnow(),
-            details=risk_details
+            factors=risk_details,
+            meta_json=assessment.metadata
         )
         self.db.add(db_assessment)
         await self.db.commit()
         await self.db.refresh(db_assessment)
-
-        return RiskAssessmentResponse(
-            id=db_assessment.id,
-            customer_id=db_assessment.customer_id,
-            risk_score=normalized_score,
-            risk_level=self._determine_risk_level(normalized_score),
-            assessment_date=db_assessment.assessment_date,
-            details=risk_details
-        )
+        return db_assessment
 
     async def get_customer_assessments(
         self,
         customer_id: str,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
-    ) -> List[RiskAssessmentResponse]:
+    ) -> List[RiskAssessment]:
         """Get risk assessment history for a customer."""
-        query = self.db.query(RiskAssessment).filter(
+        query = select(RiskAssessment).where(
             RiskAssessment.customer_id == customer_id
         )
 
         if start_date:
-            query = query.filter(RiskAssessment.assessment_date >= start_date)
+            query = query.where(RiskAssessment.assessment_date >= start_date)
         if end_date:
-            query = query.filter(RiskAssessment.assessment_date <= end_date)
-
-        assessments = await query.order_by(RiskAssessment.assessment_date.desc()).all()
-        return [
-            RiskAssessmentResponse(
-                id=assessment.id,
-                customer_id=assessment.customer_id,
-                risk_score=assessment.risk_score,
-                risk_level=self._determine_risk_level(assessment.risk_score),
-                assessment_date=assessment.assessment_date,
-                details=assessment.details
-            )
-            for assessment in assessments
-        ]
+            query = query.where(RiskAssessment.assessment_date <= end_date)
+
+        result = await self.db.scalars(query.order_by(RiskAssessment.assessment_date.desc()))
+        return list(result.all())
 
     async def get_assessment_stats(
         self,
@@ -148,19 +162,20 @@ class RiskAssessmentService:
         end_date: Optional[datetime] = None
     ) -> dict:
         """Get statistical summary of risk assessments."""
-        query = self.db.query(RiskAssessment)
+        query = select(RiskAssessment)
 
         if start_date:
-            query = query.filter(RiskAssessment.assessment_date >= start_date)
+            query = query.where(RiskAssessment.assessment_date >= start_date)
         if end_date:
-            query = query.filter(RiskAssessment.assessment_date <= end_date)
+            query = query.where(RiskAssessment.assessment_date <= end_date)
 
-        stats = await query.with_entities(
+        result = await self.db.execute(query.with_only_columns(
             func.count().label('total_assessments'),
             func.avg(RiskAssessment.risk_score).label('avg_risk_score'),
             func.min(RiskAssessment.risk_score).label('min_risk_score'),
             func.max(RiskAssessment.risk_score).label('max_risk_score')
-        ).first()
+        ))
+        stats = result.first()
 
         risk_level_distribution = await self._get_risk_level_distribution(query)
 
@@ -172,39 +187,56 @@ class RiskAssessmentService:
             "risk_level_distribution": risk_level_distribution
         }
 
-    def _calculate_factor_score(self, factor: RiskFactor, feature_value: any) -> float:
+    async def _active_factors(self) -> Tuple[_ActiveFactor, ...]:
+        """All active risk factors, from the process cache or one column-only query."""
+        factors = _ACTIVE_FACTORS.get("active")
+        if factors is None:
+            result = await self.db.execute(
+                select(
+                    RiskFactor.id,
+                    RiskFactor.feature_id,
+                    RiskFactor.weight,
+                    RiskFactor.threshold,
+                    RiskFactor.operator
+                ).where(RiskFactor.is_active == True)
+            )
+            factors = _ACTIVE_FACTORS["active"] = tuple(
+                _ActiveFactor(*row, _OPERATORS.get(row.operator, _never_matches))
+                for row in result
+            )
+        return factors
+
+    def _calculate_factor_score(self, factor: _ActiveFactor, feature_value: Any) -> float:
         """Calculate score for a single risk factor."""
-        # Implementation depends on factor.operator and factor.threshold
-        if factor.operator == "gt":
-            return factor.weight if feature_value > factor.threshold else 0
-        elif factor.operator == "lt":
-            return factor.weight if feature_value < factor.threshold else 0
-        elif factor.operator == "eq":
-            return factor.weight if feature_value == factor.threshold else 0
-        elif factor.operator == "in":
-            return factor.weight if feature_value in factor.threshold else 0
-        return 0
+        return factor.weight if factor.matches(feature_value, factor.threshold) else 0
 
     def _determine_risk_level(self, risk_score: float) -> str:
         """Determine risk level based on risk score."""
-        if risk_score >= 80:
-            return "HIGH"
-        elif risk_score >= 50:
-            return "MEDIUM"
+        if risk_score >= 0.8:
+            return "high"
+        elif risk_score >= 0.5:
+            return "medium"
         else:
-            return "LOW"
+            return "low"
 
     async def _get_risk_level_distribution(self, base_query) -> dict:
-        """Get distribution of risk levels."""
+        """Get distribution of risk levels, bucketed by the database."""
         distribution = {
-            "HIGH": 0,
-            "MEDIUM": 0,
-            "LOW": 0
+            "high": 0,
+            "medium": 0,
+            "low": 0
         }
 
-        assessments = await base_query.all()
-        for assessment in assessments:
-            risk_level = self._determine_risk_level(assessment.risk_score)
-            distribution[risk_level] += 1
+        # Same thresholds as _determine_risk_level
+        risk_level = case(
+            (RiskAssessment.risk_score >= 0.8, "high"),
+            (RiskAssessment.risk_score >= 0.5, "medium"),
+            else_="low"
+        ).label("risk_level")
+        result = await self.db.execute(
+            base_query.with_only_columns(risk_level, func.count()).group_by(risk_level)
+        )
+        for level, count in result:
+            distribution[level] = count
 
-        return distribution 
\ No newline at end of file
+        return distribution
@@ -1,23 +1,77 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Row
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import logging
+import time
 from uuid import uuid4
+from functools import lru_cache
 
-from ..models import User, Transaction, CreditInquiry, RiskAnalysis
+from ..models import User, Transaction, CreditInquiry, RiskAnalysis, RiskFactor
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round-trip when streaming transactions
+TRANSACTION_STREAM_BATCH_SIZE = 500
+
+# Hot read queries are built once with bound parameters so their compiled SQL is
+# reused from the engine's cache, and select columns so rows skip ORM identity mapping.
+_USER_TRANSACTIONS = (
+    select(
+        Transaction.id,
+        Transaction.amount,
+        Transaction.type,
+        Transaction.status,
+        Transaction.created_at
+    )
+    .where(
+        Transaction.user_id == bindparam("user_id"),
+        Transaction.created_at.between(bindparam("start_date"), bindparam("end_date"))
+    )
+    .order_by(Transaction.created_at)
+)
+_USER_TRANSACTIONS_STREAM = _USER_TRANSACTIONS.execution_options(yield_per=TRANSACTION_STREAM_BATCH_SIZE)
+
+_USER_CREDIT_INQUIRIES = (
+    select(
+        CreditInquiry.id,
+        CreditInquiry.inquiry_date,
+        CreditInquiry.inquiry_type,
+        CreditInquiry.status
+    )
+    .where(
+        CreditInquiry.user_id == bindparam("user_id"),
+        CreditInquiry.inquiry_date.between(bindparam("start_date"), bindparam("end_date"))
+    )
+)
+
+_LATEST_RISK_ANALYSIS = (
+    select(
+        RiskAnalysis.risk_score,
+        RiskAnalysis.risk_level,
+        RiskAnalysis.analysis_date,
+        RiskAnalysis.metrics
+    )
+    .where(RiskAnalysis.user_id == bindparam("user_id"))
+    .order_by(RiskAnalysis.analysis_date.desc())
+    .limit(1)
+)
+
 class RiskService:
-    def __init__(self, db: Session):
-        self.db = db
+    """Risk analysis operations. Holds no session; callers pass ``db`` per call."""
+
+    def __init__(self):
+        # (loaded_at, factors) for the global risk factor list, which changes rarely
+        self._risk_factors_cache: Optional[Tuple[float, List[Dict]]] = None
 
-    async def analyze_user_risk(self, user_id: str, period: str = "30d") -> Dict:
+    async def analyze_user_risk(self, db: AsyncSession, user_id: str, period: str = "30d") -> Dict:
         """
         Analyze risk metrics for a specific user over a given period.
         
         Args:
+            db: Database session
             user_id: The ID of the user to analyze
             period: Analysis period (e.g., "30d", "90d", "1y")
             
@@ -26,7 +80,7 @@ class RiskService:
         """
         try:
             # Get user data
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = await db.get(User, user_id)
             if not user:
                 raise ValueError(f"User {user_id} not found")
 
@@ -35,16 +89,16 @@ class RiskService:
             start_date = self._calculate_start_date(end_date, period)
 
             # Get transactions
-            transactions = self._get_user_transactions(user_id, start_date, end_date)
+            transactions = await self._get_user_transactions(db, user_id, start_date, end_date)
             
             # Get credit inquiries
-            credit_inquiries = self._get_user_credit_inquiries(user_id, start_date, end_date)
+            credit_inquiries = await self._get_user_credit_inquiries(db, user_id, start_date, end_date)
 
             # Calculate risk metrics
             risk_metrics = self._calculate_risk_metrics(transactions, credit_inquiries)
 
             # Create risk analysis record
-            risk_analysis = self._create_risk_analysis(user_id, risk_metrics)
+            risk_analysis = await self._create_risk_analysis(db, user_id, risk_metrics)
 
             return {
                 "user_id": user_id,
@@ -61,11 +115,12 @@ class RiskService:
             logger.error(f"Error analyzing risk for user {user_id}: {e}")
             raise
 
-    async def get_risk_summary(self, user_id: str) -> Dict:
+    async def get_risk_summary(self, db: AsyncSession, user_id: str) -> Dict:
         """
         Get a summary of the user's risk profile.
         
         Args:
+            db: Database session
             user_id: The ID of the user
             
         Returns:
@@ -73,12 +128,8 @@ class RiskService:
         """
         try:
             # Get latest risk analysis
-            latest_analysis = (
-                self.db.query(RiskAnalysis)
-                .filter(RiskAnalysis.user_id == user_id)
-                .order_by(RiskAnalysis.analysis_date.desc())
-                .first()
-            )
+            result = await db.execute(_LATEST_RISK_ANALYSIS, {"user_id": user_id})
+            latest_analysis = result.first()
 
             if not latest_analysis:
                 raise ValueError(f"No risk analysis found for user {user_id}")
@@ -95,6 +146,92 @@ class RiskService:
             logger.error(f"Error getting risk summary for user {user_id}: {e}")
             raise
 
+    async def get_risk_factors(self, db: AsyncSession, user_id: Optional[str] = None) -> List[Dict]:
+        """
+        Get active risk factors and their weights.
+        
+        Args:
+            db: Database session
+            user_id: When given, only factors for the user's latest risk level are returned
+            
+        Returns:
+            List of risk factor dicts
+        """
+        try:
+            factors = await self._get_active_risk_factors(db)
+            if user_id is None:
+                return factors
+
+            result = await db.execute(_LATEST_RISK_ANALYSIS, {"user_id": user_id})
+            latest_analysis = result.first()
+            if latest_analysis is None:
+                raise ValueError(f"No risk analysis found for user {user_id}")
+
+            return [f for f in factors if f["risk_level"] == latest_analysis.risk_level]
+
+        except Exception as e:
+            logger.error(f"Error getting risk factors: {e}")
+            raise
+
+    async def _get_active_risk_factors(self, db: AsyncSession) -> List[Dict]:
+        """Get active risk factors, cached for CACHE_TTL seconds."""
+        if self._risk_factors_cache is not None:
+            loaded_at, factors = self._risk_factors_cache
+            if time.monotonic() - loaded_at < settings.CACHE_TTL:
+                return factors
+
+        result = await db.scalars(
+            select(RiskFactor)
+            .where(RiskFactor.is_active == True)
+            .order_by(RiskFactor.weight.desc())
+        )
+        factors = [
+            {
+                "id": factor.id,
+                "feature_id": factor.feature_id,
+                "weight": factor.weight,
+                "threshold": factor.threshold,
+                "operator": factor.operator,
+                "risk_level": factor.risk_level,
+                "description": factor.description
+            }
+            for factor in result.all()
+        ]
+        self._risk_factors_cache = (time.monotonic(), factors)
+        return factors
+
+    def stream_user_transactions(self, db: AsyncSession, user_id: str, period: str = "30d") -> AsyncIterator[Dict]:
+        """
+        Stream a user's transactions within a period, oldest first.
+        The period is validated here, so bad input fails before any rows are sent.
+        
+        Args:
+            db: Database session, which must stay open while the stream is consumed
+            user_id: The ID of the user
+            period: Period to cover (e.g., "30d", "90d", "1y")
+            
+        Returns:
+            Async iterator of transaction dicts
+        """
+        end_date = datetime.utcnow()
+        start_date = self._calculate_start_date(end_date, period)
+        return self._iter_user_transactions(db, user_id, start_date, end_date)
+
+    async def _iter_user_transactions(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> AsyncIterator[Dict]:
+        """Yield transactions from a server-side cursor in batches."""
+        result = await db.stream(
+            _USER_TRANSACTIONS_STREAM,
+            {"user_id": user_id, "start_date": start_date, "end_date": end_date}
+        )
+        async for row in result.mappings():
+            yield dict(row)
+
     def _calculate_start_date(self, end_date: datetime, period: str) -> datetime:
         """Calculate start date based on period string."""
         period_map = {
@@ -109,42 +246,38 @@ class RiskService:
             
         return end_date - period_map[period]
 
-    def _get_user_transactions(
+    async def _get_user_transactions(
         self,
+        db: AsyncSession,
         user_id: str,
         start_date: datetime,
         end_date: datetime
-    ) -> List[Transaction]:
+    ) -> List[Row]:
         """Get user transactions within date range."""
-        return (
-            self.db.query(Transaction)
-            .filter(
-                Transaction.user_id == user_id,
-                Transaction.created_at.between(start_date, end_date)
-            )
-            .all()
+        result = await db.execute(
+            _USER_TRANSACTIONS,
+            {"user_id": user_id, "start_date": start_date, "end_date": end_date}
         )
+        return result.all()
 
-    def _get_user_credit_inquiries(
+    async def _get_user_credit_inquiries(
         self,
+        db: AsyncSession,
         user_id: str,
         start_date: datetime,
         end_date: datetime
-    ) -> List[CreditInquiry]:
+    ) -> List[Row]:
         """Get user credit inquiries within date range."""
-        return (
-            self.db.query(CreditInquiry)
-            .filter(
-                CreditInquiry.user_id == user_id,
-                CreditInquiry.inquiry_date.between(start_date, end_date)
-            )
-            .all()
+        result = await db.execute(
+            _USER_CREDIT_INQUIRIES,
+            {"user_id": user_id, "start_date": start_date, "end_date": end_date}
         )
+        return result.all()
 
     def _calculate_risk_metrics(
         self,
-        transactions: List[Transaction],
-        credit_inquiries: List[CreditInquiry]
+        transactions: List[Row],
+        credit_inquiries: List[Row]
     ) -> Dict:
         """Calculate risk metrics from transaction and credit inquiry data."""
         # Calculate transaction metrics
@@ -166,7 +299,7 @@ class RiskService:
             "credit_metrics": credit_metrics
         }
 
-    def _calculate_transaction_metrics(self, transactions: List[Transaction]) -> Dict:
+    def _calculate_transaction_metrics(self, transactions: List[Row]) -> Dict:
         """Calculate metrics from transaction data."""
         if not transactions:
             return {
@@ -188,7 +321,7 @@ class RiskService:
             "success_rate": (len(transactions) - failed_transactions) / len(transactions)
         }
 
-    def _calculate_credit_metrics(self, credit_inquiries: List[CreditInquiry]) -> Dict:
+    def _calculate_credit_metrics(self, credit_inquiries: List[Row]) -> Dict:
         """Calculate metrics from credit inquiry data."""
         if not credit_inquiries:
             return {
@@ -233,7 +366,7 @@ class RiskService:
         else:
             return "high"
 
-    def _create_risk_analysis(self, user_id: str, risk_metrics: Dict) -> RiskAnalysis:
+    async def _create_risk_analysis(self, db: AsyncSession, user_id: str, risk_metrics: Dict) -> RiskAnalysis:
         """Create a new risk analysis record."""
         risk_analysis = RiskAnalysis(
             id=str(uuid4()),
@@ -243,13 +376,13 @@ class RiskService:
             metrics=risk_metrics
         )
         
-        self.db.add(risk_analysis)
-        self.db.commit()
-        self.db.refresh(risk_analysis)
+        db.add(risk_analysis)
+        await db.commit()
+        await db.refresh(risk_analysis)
         
         return risk_analysis
 
-    def _summarize_transactions(self, transactions: List[Transaction]) -> Dict:
+    def _summarize_transactions(self, transactions: List[Row]) -> Dict:
         """Create a summary of transaction data."""
         if not transactions:
             return {
@@ -272,7 +405,7 @@ class RiskService:
 
         return summary
 
-    def _summarize_credit_inquiries(self, credit_inquiries: List[CreditInquiry]) -> Dict:
+    def _summarize_credit_inquiries(self, credit_inquiries: List[Row]) -> Dict:
         """Create a summary of credit inquiry data."""
         if not credit_inquiries:
             return {
@@ -291,4 +424,10 @@ class RiskService:
             summary["by_type"][i.inquiry_type] = summary["by_type"].get(i.inquiry_type, 0) + 1
             summary["by_status"][i.status] = summary["by_status"].get(i.status, 0) + 1
 
-        return summary 
\ No newline at end of file
+        return summary
+
+
+@lru_cache(maxsize=None)
+def get_risk_service() -> RiskService:
+    """Return the process-wide RiskService instance."""
+    return RiskService()
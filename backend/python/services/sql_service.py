@@ -1,16 +1,12 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select
 from datetime import datetime
 import logging
 from fastapi import HTTPException, status
-import sqlparse
-from sqlparse.sql import IdentifierList, Identifier
-from sqlparse.tokens import Keyword, DML
 
-from ..models import SqlSet, SqlStatement, Feature, SqlType
+from ..models import SqlStatement, Feature, SqlType
 from ..schemas import (
-    SqlSetCreate, SqlSetUpdate,
     SqlStatementCreate, SqlStatementUpdate,
     SqlParseResult
 )
@@ -18,108 +14,9 @@ from ..schemas import (
 logger = logging.getLogger(__name__)
 
 class SqlService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_sql_set(self, sql_set: SqlSetCreate) -> SqlSet:
-        """Create a new SQL set."""
-        try:
-            db_sql_set = SqlSet(
-                name=sql_set.name,
-                description=sql_set.description,
-                is_active=sql_set.is_active
-            )
-            self.db.add(db_sql_set)
-            await self.db.flush()
-            return db_sql_set
-        except Exception as e:
-            logger.error(f"Error creating SQL set: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to create SQL set: {str(e)}"
-            )
-
-    async def get_sql_sets(
-        self,
-        skip: int = 0,
-        limit: int = 100,
-        search: Optional[str] = None,
-        is_active: Optional[bool] = None
-    ) -> List[SqlSet]:
-        """Get SQL sets with filtering."""
-        try:
-            query = self.db.query(SqlSet)
-
-            if search:
-                search_filter = or_(
-                    SqlSet.name.ilike(f"%{search}%"),
-                    SqlSet.description.ilike(f"%{search}%")
-                )
-                query = query.filter(search_filter)
-
-            if is_active is not None:
-                query = query.filter(SqlSet.is_active == is_active)
-
-            return query.offset(skip).limit(limit).all()
-        except Exception as e:
-            logger.error(f"Error getting SQL sets: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to get SQL sets: {str(e)}"
-            )
-
-    async def get_sql_set(self, sql_set_id: int) -> Optional[SqlSet]:
-        """Get a SQL set by ID."""
-        try:
-            return self.db.query(SqlSet).filter(SqlSet.id == sql_set_id).first()
-        except Exception as e:
-            logger.error(f"Error getting SQL set: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to get SQL set: {str(e)}"
-            )
-
-    async def update_sql_set(
-        self,
-        sql_set_id: int,
-        sql_set: SqlSetUpdate
-    ) -> Optional[SqlSet]:
-        """Update a SQL set."""
-        try:
-            db_sql_set = await self.get_sql_set(sql_set_id)
-            if not db_sql_set:
-                return None
-
-            update_data = sql_set.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_sql_set, field, value)
-
-            await self.db.flush()
-            return db_sql_set
-        except Exception as e:
-            logger.error(f"Error updating SQL set: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to update SQL set: {str(e)}"
-            )
-
-    async def delete_sql_set(self, sql_set_id: int) -> bool:
-        """Delete a SQL set."""
-        try:
-            db_sql_set = await self.get_sql_set(sql_set_id)
-            if not db_sql_set:
-                return False
-
-            self.db.delete(db_sql_set)
-            await self.db.flush()
-            return True
-        except Exception as e:
-            logger.error(f"Error deleting SQL set: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to delete SQL set: {str(e)}"
-            )
-
     async def create_sql_statement(
         self,
         sql_statement: SqlStatementCreate
@@ -135,7 +32,7 @@ class SqlService:
                 sql_type=sql_statement.sql_type,
                 sql_set_id=sql_statement.sql_set_id,
                 is_active=sql_statement.is_active,
-                metadata=parse_result.metadata
+                meta_json=parse_result.metadata
             )
             self.db.add(db_sql_statement)
             await self.db.flush()
@@ -158,25 +55,26 @@ class SqlService:
     ) -> List[SqlStatement]:
         """Get SQL statements with filtering."""
         try:
-            query = self.db.query(SqlStatement)
+            query = select(SqlStatement)
 
             if search:
                 search_filter = or_(
                     SqlStatement.name.ilike(f"%{search}%"),
                     SqlStatement.statement.ilike(f"%{search}%")
                 )
-                query = query.filter(search_filter)
+                query = query.where(search_filter)
 
             if sql_set_id:
-                query = query.filter(SqlStatement.sql_set_id == sql_set_id)
+                query = query.where(SqlStatement.sql_set_id == sql_set_id)
 
             if sql_type:
-                query = query.filter(SqlStatement.sql_type == sql_type)
+                query = query.where(SqlStatement.sql_type == sql_type)
 
             if is_active is not None:
-                query = query.filter(SqlStatement.is_active == is_active)
+                query = query.where(SqlStatement.is_active == is_active)
 
-            return query.offset(skip).limit(limit).all()
+            result = await self.db.scalars(query.offset(skip).limit(limit))
+            return result.all()
         except Exception as e:
             logger.error(f"Error getting SQL statements: {e}")
             raise HTTPException(
@@ -187,7 +85,7 @@ class SqlService:
     async def get_sql_statement(self, sql_id: int) -> Optional[SqlStatement]:
         """Get a SQL statement by ID."""
         try:
-            return self.db.query(SqlStatement).filter(SqlStatement.id == sql_id).first()
+            return await self.db.get(SqlStatement, sql_id)
         except Exception as e:
             logger.error(f"Error getting SQL statement: {e}")
             raise HTTPException(
@@ -206,12 +104,14 @@ class SqlService:
             if not db_sql_statement:
                 return None
 
-            update_data = sql_statement.dict(exclude_unset=True)
+            update_data = sql_statement.model_dump(exclude_unset=True)
+            if 'metadata' in update_data:
+                update_data['meta_json'] = update_data.pop('metadata')
             
             # If statement is updated, parse it again
             if 'statement' in update_data:
                 parse_result = await self.parse_sql(update_data['statement'])
-                update_data['metadata'] = parse_result.metadata
+                update_data['meta_json'] = parse_result.metadata
 
             for field, value in update_data.items():
                 setattr(db_sql_statement, field, value)
@@ -232,7 +132,7 @@ class SqlService:
             if not db_sql_statement:
                 return False
 
-            self.db.delete(db_sql_statement)
+            await self.db.delete(db_sql_statement)
             await self.db.flush()
             return True
         except Exception as e:
@@ -244,6 +144,11 @@ class SqlService:
 
     async def parse_sql(self, sql: str) -> SqlParseResult:
         """Parse SQL statement to extract fields and metadata."""
+        # sqlparse is only needed here, so keep it out of the startup import graph
+        import sqlparse
+        from sqlparse.sql import IdentifierList, Identifier
+        from sqlparse.tokens import Keyword, DML
+
         try:
             parsed = sqlparse.parse(sql)[0]
             fields = []
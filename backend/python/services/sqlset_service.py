@@ -1,10 +1,12 @@
 from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.orm import selectinload
 from datetime import datetime
 import logging
 from fastapi import HTTPException, status
 
+from ..database import fetch_page
 from ..models import SqlSet, SqlStatement, Feature
 from ..schemas import (
     SqlSetCreate, SqlSetUpdate,
@@ -14,7 +16,7 @@ from ..schemas import (
 logger = logging.getLogger(__name__)
 
 class SqlSetService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_sql_set(self, sql_set: SqlSetCreate) -> SqlSet:
@@ -49,25 +51,19 @@ class SqlSetService:
             Tuple containing list of SQL sets and total count
         """
         try:
-            query = self.db.query(SqlSet)
+            query = select(SqlSet)
 
             if search:
                 search_filter = or_(
                     SqlSet.name.ilike(f"%{search}%"),
                     SqlSet.description.ilike(f"%{search}%")
                 )
-                query = query.filter(search_filter)
+                query = query.where(search_filter)
 
             if is_active is not None:
-                query = query.filter(SqlSet.is_active == is_active)
+                query = query.where(SqlSet.is_active == is_active)
                 
-            # Get total count for pagination
-            total_count = query.count()
-            
-            # Apply pagination
-            sql_sets = query.order_by(SqlSet.name).offset(skip).limit(limit).all()
-            
-            return sql_sets, total_count
+            return await fetch_page(self.db, query.order_by(SqlSet.name), skip, limit)
         except Exception as e:
             logger.error(f"Error getting SQL sets: {e}")
             raise HTTPException(
@@ -78,7 +74,7 @@ class SqlSetService:
     async def get_sql_set(self, sql_set_id: int) -> Optional[SqlSet]:
         """Get a SQL set by ID."""
         try:
-            return self.db.query(SqlSet).filter(SqlSet.id == sql_set_id).first()
+            return await self.db.get(SqlSet, sql_set_id)
         except Exception as e:
             logger.error(f"Error getting SQL set: {e}")
             raise HTTPException(
@@ -92,14 +88,20 @@ class SqlSetService:
         sql_set: SqlSetUpdate
     ) -> Optional[SqlSet]:
         """Update a SQL set."""
-        try:
-            db_sql_set = await self.get_sql_set(sql_set_id)
-            if not db_sql_set:
-                return None
+        db_sql_set = await self.get_sql_set(sql_set_id)
+        if not db_sql_set:
+            return None
+        return await self.apply_sql_set_update(db_sql_set, sql_set)
 
-            update_data = sql_set.dict(exclude_unset=True)
+    async def apply_sql_set_update(self, db_sql_set: SqlSet, sql_set: SqlSetUpdate) -> SqlSet:
+        """Apply an update to a SQL set that has already been loaded."""
+        try:
+            update_data = sql_set.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_sql_set, field, value)
+            # Set here rather than by the column's SQL now(), which would expire it and force a re-SELECT
+            if update_data:
+                db_sql_set.updated_at = datetime.utcnow()
 
             await self.db.flush()
             return db_sql_set
@@ -112,14 +114,17 @@ class SqlSetService:
 
     async def delete_sql_set(self, sql_set_id: int) -> bool:
         """Delete a SQL set."""
-        try:
-            db_sql_set = await self.get_sql_set(sql_set_id)
-            if not db_sql_set:
-                return False
+        db_sql_set = await self.get_sql_set(sql_set_id)
+        if not db_sql_set:
+            return False
+        await self.delete_loaded_sql_set(db_sql_set)
+        return True
 
-            self.db.delete(db_sql_set)
+    async def delete_loaded_sql_set(self, db_sql_set: SqlSet) -> None:
+        """Delete a SQL set that has already been loaded."""
+        try:
+            await self.db.delete(db_sql_set)
             await self.db.flush()
-            return True
         except Exception as e:
             logger.error(f"Error deleting SQL set: {e}")
             raise HTTPException(
@@ -127,15 +132,15 @@ class SqlSetService:
                 detail=f"Failed to delete SQL set: {str(e)}"
             )
     
-    async def get_sql_set_features(
+    async def get_features_with_set_check(
         self, 
         sql_set_id: int,
         skip: int = 0,
         limit: int = 100,
         search: Optional[str] = None
-    ) -> Tuple[List[Feature], int]:
+    ) -> Tuple[bool, List[Feature], int]:
         """
-        Get features associated with a specific SQL set.
+        Get a page of the features in a SQL set, checking the set exists in the same query.
         
         Args:
             sql_set_id: ID of the SQL set
@@ -144,26 +149,46 @@ class SqlSetService:
             search: Optional search term for filtering features
             
         Returns:
-            Tuple containing list of features and total count
+            Tuple of (set exists, list of features, total count)
         """
         try:
-            query = self.db.query(Feature).filter(Feature.sql_set_id == sql_set_id)
-            
+            join_on = Feature.sql_set_id == SqlSet.id
             if search:
-                search_filter = or_(
+                join_on = and_(join_on, or_(
                     Feature.name.ilike(f"%{search}%"),
                     Feature.description.ilike(f"%{search}%"),
                     Feature.category.ilike(f"%{search}%")
+                ))
+
+            # The set row anchors the outer join: no rows means no set, and a set
+            # without matching features yields one row with a NULL feature
+            result = await self.db.execute(
+                select(Feature, func.count(Feature.id).over())
+                .select_from(SqlSet)
+                .outerjoin(Feature, join_on)
+                .where(SqlSet.id == sql_set_id)
+                .options(selectinload(Feature.tags))  # Tag names are serialized with each feature
+                .order_by(Feature.name)
+                .offset(skip)
+                .limit(limit)
+            )
+            rows = result.all()
+
+            if not rows and skip:
+                # Paged past the end, so the window count never came back
+                total_count = await self.db.scalar(
+                    select(func.count(Feature.id))
+                    .select_from(SqlSet)
+                    .outerjoin(Feature, join_on)
+                    .where(SqlSet.id == sql_set_id)
+                    .group_by(SqlSet.id)
                 )
-                query = query.filter(search_filter)
-                
-            # Get total count for pagination
-            total_count = query.count()
-            
-            # Apply pagination
-            features = query.order_by(Feature.name).offset(skip).limit(limit).all()
-            
-            return features, total_count
+                return total_count is not None, [], total_count or 0
+            if not rows:
+                return False, [], 0
+
+            features = [feature for feature, _ in rows if feature is not None]
+            return True, features, rows[0][1]
         except Exception as e:
             logger.error(f"Error getting SQL set features: {e}")
             raise HTTPException(
@@ -195,30 +220,35 @@ class SqlSetService:
                 )
             
             # Count features
-            feature_count = self.db.query(func.count(Feature.id)).filter(
-                Feature.sql_set_id == sql_set_id
-            ).scalar()
+            feature_count = await self.db.scalar(
+                select(func.count(Feature.id)).where(Feature.sql_set_id == sql_set_id)
+            )
             
             # Count active features
-            active_feature_count = self.db.query(func.count(Feature.id)).filter(
-                and_(
-                    Feature.sql_set_id == sql_set_id,
-                    Feature.is_active == True
+            active_feature_count = await self.db.scalar(
+                select(func.count(Feature.id)).where(
+                    and_(
+                        Feature.sql_set_id == sql_set_id,
+                        Feature.is_active == True
+                    )
                 )
-            ).scalar()
+            )
             
             # Count SQL statements
-            sql_statement_count = self.db.query(func.count(SqlStatement.id)).filter(
-                SqlStatement.sql_set_id == sql_set_id
-            ).scalar()
+            sql_statement_count = await self.db.scalar(
+                select(func.count(SqlStatement.id)).where(SqlStatement.sql_set_id == sql_set_id)
+            )
             
             # Get feature type distribution
-            feature_types = self.db.query(
-                Feature.feature_type,
-                func.count(Feature.id).label("count")
-            ).filter(
-                Feature.sql_set_id == sql_set_id
-            ).group_by(Feature.feature_type).all()
+            result = await self.db.execute(
+                select(
+                    Feature.feature_type,
+                    func.count(Feature.id).label("count")
+                ).where(
+                    Feature.sql_set_id == sql_set_id
+                ).group_by(Feature.feature_type)
+            )
+            feature_types = result.all()
             
             feature_type_distribution = {
                 str(ft_type): count for ft_type, count in feature_types
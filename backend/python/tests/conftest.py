@@ -1,43 +1,92 @@
+import os
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 
-from ..database import Base, get_db
+# Settings come from defaults, not the developer's .env; set before the app modules load
+os.environ.setdefault("RISKAI_SKIP_DOTENV", "1")
+
+from ..cache import RESPONSE_BODY_CACHES
+from ..database import get_db
+from ..models import Base
+from ..services.feature_service import FeatureService
+from ..services.risk_assessment import _ACTIVE_FACTORS
+from .. import main
 from ..main import app
 
 # Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-engine = create_engine(
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 @pytest.fixture(scope="function")
-def db_session():
+async def db_session():
     """Create a clean database session for a test."""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     session = TestingSessionLocal()
     try:
         yield session
     finally:
-        session.close()
-        Base.metadata.drop_all(bind=engine)
+        await session.close()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+def count_queries():
+    """Record the SQL statements run against the test database inside a ``with`` block."""
+    @contextmanager
+    def counter() -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    return counter
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, monkeypatch):
     """Create a test client with a clean database."""
-    def override_get_db():
+    async def database_reachable() -> bool:
+        return True
+
+    # Startup and the health heartbeat ping the real engine; the test database is always up
+    monkeypatch.setattr(main, "check_db_connection", database_reachable)
+
+    async def override_get_db():
         try:
             yield db_session
         finally:
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    # Row IDs restart with every fresh database, so cached bodies must not leak between tests
+    for response_cache in RESPONSE_BODY_CACHES:
+        response_cache.clear()
+    _ACTIVE_FACTORS.clear()
+    FeatureService.clear_cache()
+    # Startup re-initializes the shared cache; the in-memory backend keeps its entries on the class
+    FastAPICache.reset()
+    InMemoryBackend._store.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
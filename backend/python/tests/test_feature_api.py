@@ -1,14 +1,12 @@
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from ..main import app
-from ..models import Feature, Tag
+from ..models import Feature, FeatureType, Tag
 from ..schemas import FeatureCreate, FeatureUpdate
-
-@pytest.fixture
-def client():
-    return TestClient(app)
+from ..services.feature_service import get_feature_service
 
 @pytest.fixture
 def sample_feature_data():
@@ -16,6 +14,7 @@ def sample_feature_data():
         "name": "test_feature",
         "description": "Test feature for API tests",
         "data_type": "numeric",
+        "feature_type": "NUMERIC",
         "constraints": {
             "min": 0,
             "max": 100
@@ -189,6 +188,14 @@ def test_validate_feature_value(client, sample_feature_data):
     assert response.status_code == 200
     assert response.json()["is_valid"] is False
 
+def test_validate_feature_values(client, sample_feature_data):
+    """A list of values is validated in one request"""
+    feature_id = client.post("/api/v1/features", json=sample_feature_data).json()["id"]
+
+    response = client.post(f"/api/v1/features/{feature_id}/values/validate", json={"values": [50, 150]})
+    assert response.status_code == 200
+    assert response.json() == {"is_valid": False, "errors": ["Value 1: Value must be less than or equal to 100"]}
+
 @pytest.mark.parametrize("invalid_data,expected_status", [
     ({"name": ""}, 422),  # Empty name
     ({"data_type": "invalid"}, 422),  # Invalid data type
@@ -211,4 +218,122 @@ def test_feature_unique_name_constraint(client, sample_feature_data):
     
     # Try to create another feature with the same name
     response = client.post("/api/v1/features", json=sample_feature_data)
-    assert response.status_code == 400  # or your chosen error code for duplicates 
\ No newline at end of file
+    assert response.status_code == 400  # or your chosen error code for duplicates
+
+def test_list_and_detail_encode_features_alike(client, sample_feature_data):
+    """A feature serializes the same in the list as on its own, datetimes included"""
+    feature_id = client.post("/api/v1/features", json=sample_feature_data).json()["id"]
+
+    detail = client.get(f"/api/v1/features/{feature_id}").json()
+    listed = client.get("/api/v1/features").json()
+
+    assert listed == [detail]
+    assert detail["created_at"].endswith("Z")
+
+def test_get_features_page(client, sample_feature_data):
+    """The feature management listing returns a page envelope of serialized features"""
+    client.post("/api/v1/features", json=sample_feature_data)
+    client.post("/api/v1/features", json={**sample_feature_data, "name": "another_feature"})
+
+    response = client.get("/api/features", params={"page": 2, "page_size": 1})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert {key: data[key] for key in ("total", "page", "page_size", "total_pages")} == {
+        "total": 2, "page": 2, "page_size": 1, "total_pages": 2
+    }
+    assert [feature["name"] for feature in data["items"]] == ["test_feature"]
+    assert data["items"][0]["tags"] == ["test_tag1", "test_tag2"]
+
+def test_create_feature_refreshes_features_page(client, sample_feature_data):
+    """A feature created through the management API shows up on the next listing"""
+    assert client.get("/api/features").json()["total"] == 0
+
+    response = client.post("/api/features", json=sample_feature_data)
+    assert response.status_code == 200
+
+    data = client.get("/api/features").json()
+    assert data["total"] == 1
+    assert [feature["name"] for feature in data["items"]] == ["test_feature"]
+
+def test_update_feature_through_management_api(client, sample_feature_data):
+    """PUT /api/features updates the feature named by the body's id and refreshes the listing"""
+    feature_id = client.post("/api/features", json=sample_feature_data).json()["id"]
+    assert client.get("/api/features").json()["items"][0]["description"] == sample_feature_data["description"]
+
+    response = client.put("/api/features", json={"id": feature_id, "description": "Updated", "tags": ["new_tag"]})
+    assert response.status_code == 200
+    assert response.json()["description"] == "Updated"
+    assert response.json()["tags"] == ["new_tag"]
+
+    item = client.get("/api/features").json()["items"][0]
+    assert item["description"] == "Updated"
+    assert client.get(f"/api/v1/features/{feature_id}").json()["description"] == "Updated"
+
+def test_update_feature_through_management_api_unknown_id(client):
+    """PUT /api/features answers 404 for a feature that does not exist"""
+    response = client.put("/api/features", json={"id": 999, "description": "Updated"})
+    assert response.status_code == 404
+
+@pytest.mark.parametrize("invalid_body", [
+    {"description": "Updated"},  # Missing id
+    {"id": 1, "importance_score": 2},  # Out of range
+])
+def test_update_feature_through_management_api_validates_body(client, invalid_body):
+    """PUT /api/features rejects bodies that are not a valid feature update"""
+    response = client.put("/api/features", json=invalid_body)
+    assert response.status_code == 422
+
+def test_compute_features_through_api(client, monkeypatch):
+    """A user's feature values are read from the feature API"""
+    def feature_api(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"values": {"income_level": 0.4}})
+
+    api_client = httpx.AsyncClient(base_url="http://features.test", transport=httpx.MockTransport(feature_api))
+    monkeypatch.setattr(get_feature_service(), "_client", api_client)
+    response = client.post("/api/v1/features/compute", json={"user_id": "user-1", "feature_names": ["income_level"]})
+    assert response.status_code == 200
+    assert response.json() == {"values": {"income_level": 0.4}}
+
+    assert client.post("/api/v1/features/compute", json={"user_id": "user-1", "feature_names": []}).status_code == 422
+
+def test_list_features_listing(client, sample_feature_data):
+    """The listing returns listing columns in name order with a cursor for the next page"""
+    for name in ("b_feature", "a_feature"):
+        assert client.post("/api/v1/features", json={**sample_feature_data, "name": name}).status_code == 200
+
+    response = client.get("/api/v1/features/listing", params={"page_size": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["name"] for item in data["items"]] == ["a_feature"]
+    assert data["total"] == 2
+    assert data["next_cursor"] == "a_feature"
+
+    response = client.get("/api/v1/features/listing", params={"page_size": 1, "cursor": "a_feature"})
+    assert [item["name"] for item in response.json()["items"]] == ["b_feature"]
+
+async def test_feature_listing_is_cached_until_a_feature_write(client, db_session, sample_feature_data):
+    """Listing pages are served from the shared cache and refreshed by writes through the API"""
+    assert client.post("/api/v1/features", json={**sample_feature_data, "name": "b_feature"}).status_code == 200
+    assert [item["name"] for item in client.get("/api/v1/features/listing").json()["items"]] == ["b_feature"]
+
+    # Written behind the API's back, so the cached page does not change
+    db_session.add(Feature(name="a_feature", data_type="numeric", feature_type=FeatureType.NUMERIC))
+    await db_session.flush()
+    assert [item["name"] for item in client.get("/api/v1/features/listing").json()["items"]] == ["b_feature"]
+
+    assert client.post("/api/v1/features", json={**sample_feature_data, "name": "c_feature"}).status_code == 200
+    assert [item["name"] for item in client.get("/api/v1/features/listing").json()["items"]] == [
+        "a_feature", "b_feature", "c_feature"
+    ]
+
+def test_bulk_create_features(client, sample_feature_data):
+    """Many features are created in one request; a duplicate name rejects the batch"""
+    batch = [{**sample_feature_data, "name": name} for name in ("bulk_a", "bulk_b")]
+    response = client.post("/api/v1/features/bulk", json=batch)
+    assert response.status_code == 200
+    assert response.json() == {"created": 2}
+    assert [item["name"] for item in client.get("/api/v1/features/listing").json()["items"]] == ["bulk_a", "bulk_b"]
+
+    assert client.post("/api/v1/features/bulk", json=batch[:1]).status_code == 400
+    assert client.post("/api/v1/features/bulk", json=[]).status_code == 422
@@ -1,15 +1,67 @@
+import asyncio
+import httpx
+import orjson
 import pytest
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from ..models import Feature, Tag, FeatureValue
+from .. import upstream
+from ..models import Feature, FeatureType, Tag, FeatureValue
 from ..services.feature_service import FeatureService
 from ..schemas import FeatureCreate, FeatureUpdate, FeatureValueCreate
 
 @pytest.fixture
-def feature_service(db_session: Session):
-    return FeatureService(db_session)
+def feature_service():
+    return FeatureService()
+
+class FakeFeatureAPI:
+    """Mock transport handler serving per-user feature values and recording each call."""
+
+    def __init__(self):
+        self.values = {("user-1", "income_level"): 0.4, ("user-1", "debt_ratio"): 0.2}
+        self.calls = []
+        self.batch_available = True
+        # When set, each GET is held until this many requests have arrived, so sequential callers time out
+        self.hold_until = 0
+        self._all_arrived = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append((request.method, request.url.path))
+        if request.method == "POST" and request.url.path == "/features/batch":
+            if not self.batch_available:
+                return httpx.Response(404)
+            body = orjson.loads(request.content)
+            values = {name: self.values.get((body["user_id"], name)) for name in body["features"]}
+            return httpx.Response(200, json={"values": values})
+        if self.hold_until:
+            await self._wait_for_others()
+        parts = request.url.path.strip("/").split("/")
+        if request.method == "GET" and len(parts) == 4 and parts[0] == "features" and parts[2] == "users":
+            value = self.values.get((parts[3], parts[1]))
+            return httpx.Response(200, json={"value": value}) if value is not None else httpx.Response(404)
+        return httpx.Response(404)
+
+    async def _wait_for_others(self) -> None:
+        if self._all_arrived is None:
+            self._all_arrived = asyncio.Event()
+        if len(self.calls) >= self.hold_until:
+            self._all_arrived.set()
+        await asyncio.wait_for(self._all_arrived.wait(), timeout=1)
+
+@pytest.fixture
+def feature_api(feature_service, monkeypatch):
+    """The fake feature API behind ``feature_service``, with a fresh circuit breaker and empty value cache."""
+    fake = FakeFeatureAPI()
+    FeatureService.clear_cache()
+    monkeypatch.setattr(upstream, "feature_api_breaker", upstream.CircuitBreaker(fail_max=5, reset_timeout=30))
+    monkeypatch.setattr(
+        feature_service,
+        "_client",
+        httpx.AsyncClient(base_url="http://features.test", transport=httpx.MockTransport(fake))
+    )
+    return fake
 
 @pytest.fixture
 def sample_feature_data() -> Dict[str, Any]:
@@ -17,6 +69,7 @@ def sample_feature_data() -> Dict[str, Any]:
         "name": "test_feature",
         "description": "Test feature for unit tests",
         "data_type": "numeric",
+        "feature_type": "NUMERIC",
         "constraints": {
             "min": 0,
             "max": 100
@@ -34,10 +87,10 @@ def sample_feature_value_data() -> Dict[str, Any]:
         "value": 50
     }
 
-async def test_create_feature(feature_service: FeatureService, sample_feature_data: Dict[str, Any]):
+async def test_create_feature(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
     """Test feature creation"""
     feature_create = FeatureCreate(**sample_feature_data)
-    feature = await feature_service.create_feature(feature_create)
+    feature = await feature_service.create_feature(db_session, feature_create)
     
     assert feature.name == sample_feature_data["name"]
     assert feature.description == sample_feature_data["description"]
@@ -49,30 +102,31 @@ async def test_create_feature(feature_service: FeatureService, sample_feature_da
     assert len(feature.tags) == len(sample_feature_data["tags"])
     assert all(tag.name in sample_feature_data["tags"] for tag in feature.tags)
 
-async def test_get_feature(feature_service: FeatureService, sample_feature_data: Dict[str, Any]):
+async def test_get_feature(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
     """Test getting a feature by ID"""
     # First create a feature
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     # Then retrieve it
-    feature = await feature_service.get_feature(created_feature.id)
+    feature = await feature_service.get_feature(db_session, created_feature.id)
     assert feature is not None
     assert feature.id == created_feature.id
     assert feature.name == sample_feature_data["name"]
 
-async def test_get_features(feature_service: FeatureService, sample_feature_data: Dict[str, Any]):
+async def test_get_features(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
     """Test getting features with filters"""
     # Create multiple features
     feature_create = FeatureCreate(**sample_feature_data)
-    await feature_service.create_feature(feature_create)
+    await feature_service.create_feature(db_session, feature_create)
     
     sample_feature_data["name"] = "test_feature2"
     feature_create2 = FeatureCreate(**sample_feature_data)
-    await feature_service.create_feature(feature_create2)
+    await feature_service.create_feature(db_session, feature_create2)
     
     # Test different filter combinations
     features = await feature_service.get_features(
+        db_session,
         skip=0,
         limit=10,
         search="test",
@@ -85,11 +139,11 @@ async def test_get_features(feature_service: FeatureService, sample_feature_data
     assert all(feature.category == "test_category" for feature in features)
     assert all(feature.is_active for feature in features)
 
-async def test_update_feature(feature_service: FeatureService, sample_feature_data: Dict[str, Any]):
+async def test_update_feature(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
     """Test updating a feature"""
     # First create a feature
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     # Update the feature
     update_data = {
@@ -98,73 +152,74 @@ async def test_update_feature(feature_service: FeatureService, sample_feature_da
         "tags": ["new_tag"]
     }
     feature_update = FeatureUpdate(**update_data)
-    updated_feature = await feature_service.update_feature(created_feature.id, feature_update)
+    updated_feature = await feature_service.update_feature(db_session, created_feature.id, feature_update)
     
     assert updated_feature.name == update_data["name"]
     assert updated_feature.description == update_data["description"]
     assert len(updated_feature.tags) == 1
     assert updated_feature.tags[0].name == "new_tag"
 
-async def test_delete_feature(feature_service: FeatureService, sample_feature_data: Dict[str, Any]):
+async def test_delete_feature(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
     """Test deleting a feature"""
     # First create a feature
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     # Delete the feature
-    result = await feature_service.delete_feature(created_feature.id)
+    result = await feature_service.delete_feature(db_session, created_feature.id)
     assert result is True
     
     # Try to get the deleted feature
-    feature = await feature_service.get_feature(created_feature.id)
+    feature = await feature_service.get_feature(db_session, created_feature.id)
     assert feature is None
 
-async def test_validate_feature_value(feature_service: FeatureService, sample_feature_data: Dict[str, Any]):
+async def test_validate_feature_value(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
     """Test feature value validation"""
     # Create a feature
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     # Test valid value
-    validation = await feature_service.validate_feature_value(created_feature.id, 50)
+    validation = await feature_service.validate_feature_value(db_session, created_feature.id, 50)
     assert validation.is_valid is True
     assert len(validation.errors) == 0
     
     # Test invalid value (out of range)
-    validation = await feature_service.validate_feature_value(created_feature.id, 150)
+    validation = await feature_service.validate_feature_value(db_session, created_feature.id, 150)
     assert validation.is_valid is False
     assert len(validation.errors) > 0
     
     # Test invalid value (wrong type)
-    validation = await feature_service.validate_feature_value(created_feature.id, "not a number")
+    validation = await feature_service.validate_feature_value(db_session, created_feature.id, "not a number")
     assert validation.is_valid is False
     assert len(validation.errors) > 0
 
-async def test_set_feature_value(feature_service: FeatureService, sample_feature_data: Dict[str, Any], sample_feature_value_data: Dict[str, Any]):
+async def test_set_feature_value(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any], sample_feature_value_data: Dict[str, Any]):
     """Test setting feature values"""
     # Create a feature
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     # Set a value
     value_create = FeatureValueCreate(**sample_feature_value_data)
-    feature_value = await feature_service.set_feature_value(created_feature.id, value_create)
+    feature_value = await feature_service.set_feature_value(db_session, created_feature.id, value_create)
     
     assert feature_value.feature_id == created_feature.id
     assert feature_value.entity_id == sample_feature_value_data["entity_id"]
     assert feature_value.value == sample_feature_value_data["value"]
 
-async def test_get_feature_values(feature_service: FeatureService, sample_feature_data: Dict[str, Any], sample_feature_value_data: Dict[str, Any]):
+async def test_get_feature_values(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any], sample_feature_value_data: Dict[str, Any]):
     """Test getting feature values"""
     # Create a feature and set some values
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     value_create = FeatureValueCreate(**sample_feature_value_data)
-    await feature_service.set_feature_value(created_feature.id, value_create)
+    await feature_service.set_feature_value(db_session, created_feature.id, value_create)
     
     # Get values
     values = await feature_service.get_feature_values(
+        db_session,
         created_feature.id,
         entity_ids=[sample_feature_value_data["entity_id"]],
         skip=0,
@@ -192,6 +247,7 @@ async def test_get_feature_values(feature_service: FeatureService, sample_featur
 ])
 async def test_feature_value_validation_cases(
     feature_service: FeatureService,
+    db_session: AsyncSession,
     sample_feature_data: Dict[str, Any],
     data_type: str,
     value: Any,
@@ -207,8 +263,233 @@ async def test_feature_value_validation_cases(
     
     # Create feature
     feature_create = FeatureCreate(**sample_feature_data)
-    created_feature = await feature_service.create_feature(feature_create)
+    created_feature = await feature_service.create_feature(db_session, feature_create)
     
     # Validate value
-    validation = await feature_service.validate_feature_value(created_feature.id, value)
-    assert validation.is_valid == expected_valid 
\ No newline at end of file
+    validation = await feature_service.validate_feature_value(db_session, created_feature.id, value)
+    assert validation.is_valid == expected_valid 
+
+async def test_get_features_loads_tags_without_n_plus_one(db_session: AsyncSession, count_queries):
+    """Listing features with their tags takes one query for the features and one for all tags"""
+    tags = [Tag(name=f"tag{i}") for i in range(3)]
+    db_session.add_all([
+        Feature(name=f"feature{i}", data_type="numeric", feature_type=FeatureType.NUMERIC, tags=tags)
+        for i in range(5)
+    ])
+    await db_session.flush()
+    db_session.expunge_all()
+
+    with count_queries() as statements:
+        features = await FeatureService.get_features(db_session, limit=50)
+        tag_names = [[tag.name for tag in feature.tags] for feature in features]
+
+    assert len(features) == 5
+    assert all(sorted(names) == ["tag0", "tag1", "tag2"] for names in tag_names)
+    assert len(statements) <= 2
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+async def test_get_or_create_tags_resolves_names_in_one_query(db_session: AsyncSession, count_queries):
+    """Existing tags are looked up with a single IN query however many names are given"""
+    db_session.add(Tag(name="existing"))
+    await db_session.flush()
+
+    with count_queries() as statements:
+        tags = await FeatureService._get_or_create_tags(db_session, ["new1", "existing", "new2"])
+
+    assert [tag.name for tag in tags] == ["new1", "existing", "new2"]
+    assert len(statements) == 1
+
+async def test_get_feature_loads_tags_for_feature_already_in_session(db_session: AsyncSession):
+    """A feature loaded earlier without its tags still comes back with them"""
+    db_session.add(Feature(name="feature", data_type="numeric", feature_type=FeatureType.NUMERIC, tags=[Tag(name="tag")]))
+    await db_session.flush()
+    db_session.expunge_all()
+    loaded = await db_session.scalar(select(Feature).where(Feature.name == "feature"))
+
+    feature = await FeatureService.get_feature(db_session, loaded.id)
+
+    assert feature is loaded
+    assert "tags" not in inspect(feature).unloaded
+    assert feature.tag_names == ["tag"]
+
+async def test_compute_features_uses_one_batch_request(feature_service: FeatureService, feature_api: FakeFeatureAPI):
+    """All requested values come from a single batch call; features without a value are left out"""
+    values = await feature_service.compute_features("user-1", ["income_level", "debt_ratio", "unknown", "income_level"])
+
+    assert values == {"income_level": 0.4, "debt_ratio": 0.2}
+    assert feature_api.calls == [("POST", "/features/batch")]
+
+async def test_compute_features_falls_back_to_concurrent_fetches(feature_service: FeatureService, feature_api: FakeFeatureAPI):
+    """Without the batch endpoint every value request is in flight at once"""
+    feature_api.batch_available = False
+    feature_api.hold_until = 4
+    values = await feature_service.compute_features("user-1", ["income_level", "debt_ratio", "unknown", "income_level"])
+
+    assert values == {"income_level": 0.4, "debt_ratio": 0.2}
+    assert sorted(feature_api.calls) == [
+        ("GET", "/features/debt_ratio/users/user-1"),
+        ("GET", "/features/income_level/users/user-1"),
+        ("GET", "/features/unknown/users/user-1"),
+        ("POST", "/features/batch")
+    ]
+
+async def test_compute_features_skips_fetches_while_circuit_is_open(feature_service: FeatureService, feature_api: FakeFeatureAPI):
+    """An open circuit answers with no values and no requests"""
+    for _ in range(upstream.feature_api_breaker.fail_max):
+        upstream.feature_api_breaker.record_failure()
+
+    assert await feature_service.compute_features("user-1", ["income_level"]) == {}
+    assert feature_api.calls == []
+
+async def test_compute_features_reuses_cached_values_and_misses(feature_service: FeatureService, feature_api: FakeFeatureAPI):
+    """Values and misses from one call are not requested again by the next"""
+    await feature_service.compute_features("user-1", ["income_level", "unknown"])
+    values = await feature_service.compute_features("user-1", ["income_level", "unknown", "debt_ratio"])
+
+    assert values == {"income_level": 0.4, "debt_ratio": 0.2}
+    assert feature_api.calls == [("POST", "/features/batch")] * 2
+    assert await feature_service.get_feature_value("user-1", "debt_ratio") == 0.2
+    assert await feature_service.get_feature_value("user-1", "unknown") is None
+    assert len(feature_api.calls) == 2
+
+    FeatureService.clear_cache()
+    assert await feature_service.get_feature_value("user-1", "debt_ratio") == 0.2
+    assert feature_api.calls[-1] == ("GET", "/features/debt_ratio/users/user-1")
+
+async def test_validate_feature_value_text_pattern(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
+    """Text values must match a pattern constraint from their first character"""
+    sample_feature_data.update(data_type="text", constraints={"max_length": 20, "pattern": r"[A-Z]{2}-\d+$"})
+    created_feature = await feature_service.create_feature(db_session, FeatureCreate(**sample_feature_data))
+
+    assert (await feature_service.validate_feature_value(db_session, created_feature.id, "AB-123")).is_valid
+    validation = await feature_service.validate_feature_value(db_session, created_feature.id, "x AB-123")
+    assert validation.errors == [r"Text must match pattern [A-Z]{2}-\d+$"]
+
+_BELOW_MIN = "Value must be greater than or equal to 0"
+_ABOVE_MAX = "Value must be less than or equal to 100"
+
+@pytest.mark.parametrize("values,expected_errors", [
+    # Long numeric list, range-checked with NumPy
+    ([50] * 100 + [-1, 50, 101], [f"Value 100: {_BELOW_MIN}", f"Value 102: {_ABOVE_MAX}"]),
+    # Mixed types, every value checked on its own
+    ([50] * 100 + [-1, "50", 101], [f"Value 100: {_BELOW_MIN}", "Value 101: Value must be numeric", f"Value 102: {_ABOVE_MAX}"]),
+    # Short list, every value checked on its own
+    ([-1, 50, 101], [f"Value 0: {_BELOW_MIN}", f"Value 2: {_ABOVE_MAX}"]),
+])
+async def test_validate_feature_values_reports_each_invalid_value(
+    feature_service: FeatureService,
+    db_session: AsyncSession,
+    sample_feature_data: Dict[str, Any],
+    values: list,
+    expected_errors: list
+):
+    """Invalid values are reported by index, whichever path checks them"""
+    created_feature = await feature_service.create_feature(db_session, FeatureCreate(**sample_feature_data))
+
+    validation = await feature_service.validate_feature_values(db_session, created_feature.id, values)
+    assert validation.is_valid is False
+    assert validation.errors == expected_errors
+
+async def test_validate_feature_values_accepts_valid_list(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
+    """A long list of in-range values is valid"""
+    created_feature = await feature_service.create_feature(db_session, FeatureCreate(**sample_feature_data))
+
+    validation = await feature_service.validate_feature_values(db_session, created_feature.id, list(range(101)))
+    assert validation.is_valid is True
+    assert validation.errors == []
+
+@pytest.fixture
+async def listed_features(db_session: AsyncSession):
+    """Five features, one of them inactive and one categorical, added out of name order."""
+    db_session.add_all([
+        Feature(name=name, data_type=data_type, is_active=is_active, feature_type=FeatureType.NUMERIC)
+        for name, data_type, is_active in [
+            ("e_feature", "numeric", True),
+            ("b_feature", "numeric", True),
+            ("d_feature", "categorical", True),
+            ("a_feature", "numeric", False),
+            ("c_feature", "numeric", True),
+        ]
+    ])
+    await db_session.flush()
+
+async def test_list_features_pages_by_cursor(db_session: AsyncSession, listed_features):
+    """Following next_cursor walks the listing in name order with the listing columns only"""
+    names = []
+    cursor = None
+    while True:
+        page = await FeatureService.list_features(db_session, page_size=2, cursor=cursor)
+        assert page["total"] == 5
+        assert all(set(item) == {"id", "name", "data_type", "is_active"} for item in page["items"])
+        names.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert names == ["a_feature", "b_feature", "c_feature", "d_feature", "e_feature"]
+
+async def test_list_features_filters_and_counts(db_session: AsyncSession, listed_features):
+    """Filters narrow both the items and the exact total; offset paging still works"""
+    page = await FeatureService.list_features(db_session, page=2, page_size=1, data_type="numeric", is_active=True)
+
+    assert page["total"] == 3
+    assert [item["name"] for item in page["items"]] == ["c_feature"]
+    assert page["next_cursor"] == "c_feature"
+
+async def test_get_features_search_matches_wildcards_literally(db_session: AsyncSession):
+    """A search term's % and _ are not LIKE wildcards"""
+    db_session.add_all([
+        Feature(name=name, data_type="numeric", feature_type=FeatureType.NUMERIC)
+        for name in ("debt_ratio", "debtXratio", "Debt_Ratio_90d")
+    ])
+    await db_session.flush()
+
+    features = await FeatureService.get_features(db_session, search="DEBT_RATIO")
+    assert sorted(feature.name for feature in features) == ["Debt_Ratio_90d", "debt_ratio"]
+    assert await FeatureService.get_features(db_session, search="%") == []
+
+async def test_validate_feature_values_fail_fast_and_error_cap(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
+    """fail_fast stops at the first invalid value; max_errors caps the messages and counts the rest"""
+    created_feature = await feature_service.create_feature(db_session, FeatureCreate(**sample_feature_data))
+    values = [50, -1, 101, "x", 200]
+
+    validation = await feature_service.validate_feature_values(db_session, created_feature.id, values, fail_fast=True)
+    assert validation.errors == [f"Value 1: {_BELOW_MIN}"]
+
+    validation = await feature_service.validate_feature_values(db_session, created_feature.id, values, max_errors=2)
+    assert validation.is_valid is False
+    assert validation.errors == [f"Value 1: {_BELOW_MIN}", f"Value 2: {_ABOVE_MAX}", "...and 2 more errors"]
+
+async def test_bulk_create_features(db_session: AsyncSession, sample_feature_data: Dict[str, Any], count_queries):
+    """Features are inserted in one statement and their tags linked in a few more"""
+    db_session.add(Tag(name="test_tag1"))
+    await db_session.flush()
+    features = [FeatureCreate(**{**sample_feature_data, "name": f"bulk_feature{i}"}) for i in range(3)]
+    features.append(FeatureCreate(**{**sample_feature_data, "name": "untagged", "tags": []}))
+
+    with count_queries() as statements:
+        assert await FeatureService.bulk_create_features(db_session, features) == 4
+    assert sum(statement.lstrip().upper().startswith("INSERT INTO FEATURES") for statement in statements) == 1
+    assert len(statements) <= 5
+
+    db_session.expunge_all()
+    created = await FeatureService.get_features(db_session, limit=10)
+    assert sorted((feature.name, sorted(feature.tag_names)) for feature in created) == [
+        ("bulk_feature0", ["test_tag1", "test_tag2"]),
+        ("bulk_feature1", ["test_tag1", "test_tag2"]),
+        ("bulk_feature2", ["test_tag1", "test_tag2"]),
+        ("untagged", [])
+    ]
+
+async def test_validate_feature_value_text_length(feature_service: FeatureService, db_session: AsyncSession, sample_feature_data: Dict[str, Any]):
+    """Text values are checked against both length bounds"""
+    sample_feature_data.update(data_type="text", constraints={"min_length": 3, "max_length": 5})
+    created_feature = await feature_service.create_feature(db_session, FeatureCreate(**sample_feature_data))
+
+    assert (await feature_service.validate_feature_value(db_session, created_feature.id, "abcd")).is_valid
+    assert (await feature_service.validate_feature_value(db_session, created_feature.id, "ab")).errors == [
+        "Text length must be greater than or equal to 3"
+    ]
+    assert (await feature_service.validate_feature_value(db_session, created_feature.id, "abcdef")).errors == [
+        "Text length must be less than or equal to 5"
+    ]
@@ -0,0 +1,123 @@
+import asyncio
+import httpx
+import orjson
+import pytest
+
+from ..services.model import PREDICTION_CHUNK_SIZE, get_model_api_service
+
+class FakeModelAPI:
+    """Mock transport handler serving the model API's endpoints and recording each call."""
+
+    def __init__(self):
+        self.calls = []
+        self.failing_paths = set()
+        # When set, each request is held until this many have arrived, so sequential callers time out
+        self.hold_until = 0
+        self._all_arrived = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append((request.method, request.url.path))
+        if self.hold_until:
+            await self._wait_for_others()
+        if request.url.path in self.failing_paths:
+            return httpx.Response(503)
+        body = orjson.loads(request.content) if request.content else {}
+        if request.url.path == "/model/metrics":
+            return httpx.Response(200, json={"accuracy": 0.82})
+        if request.url.path == "/model/cutoff":
+            return httpx.Response(200, json={"cutoff": 0.55})
+        if request.url.path == "/model/feature-importance":
+            return httpx.Response(200, json={"importance": {"income_level": 0.25}})
+        if request.url.path == "/model/predict":
+            return httpx.Response(200, json={"predictions": {user_id: 0.1 for user_id in body["user_ids"]}})
+        if request.url.path == "/model/performance-trends":
+            return httpx.Response(200, json={"days": int(request.url.params["days"]), "auc": [0.81, 0.82]})
+        if request.url.path == "/model/simulate-cutoff":
+            return httpx.Response(200, json={"cutoff": body["cutoff"], "approval_rate": 0.7})
+        return httpx.Response(404)
+
+    async def _wait_for_others(self) -> None:
+        if self._all_arrived is None:
+            self._all_arrived = asyncio.Event()
+        if len(self.calls) >= self.hold_until:
+            self._all_arrived.set()
+        await asyncio.wait_for(self._all_arrived.wait(), timeout=1)
+
+@pytest.fixture
+def model_api(monkeypatch):
+    """The fake model API, behind the process-wide ModelAPIService the model router uses."""
+    fake = FakeModelAPI()
+    api_client = httpx.AsyncClient(base_url="http://model-api.test", transport=httpx.MockTransport(fake))
+    monkeypatch.setattr(get_model_api_service(), "_client", api_client)
+    return fake
+
+def test_get_model_dashboard(client, model_api):
+    """The dashboard's four model API reads are in flight together"""
+    model_api.hold_until = 4
+    response = client.get("/api/v1/model/dashboard", params={"days": 7})
+    assert response.status_code == 200
+    assert response.json() == {
+        "metrics": {"accuracy": 0.82},
+        "cutoff": 0.55,
+        "feature_importance": {"income_level": 0.25},
+        "performance_trends": {"days": 7, "auc": [0.81, 0.82]}
+    }
+    assert sorted(model_api.calls) == [
+        ("GET", "/model/cutoff"),
+        ("GET", "/model/feature-importance"),
+        ("GET", "/model/metrics"),
+        ("GET", "/model/performance-trends")
+    ]
+
+def test_get_model_performance_trends(client, model_api):
+    """Performance trends are read from the model API for the requested window"""
+    response = client.get("/api/v1/model/performance-trends", params={"days": 7})
+    assert response.status_code == 200
+    assert response.json() == {"days": 7, "auc": [0.81, 0.82]}
+    assert model_api.calls == [("GET", "/model/performance-trends")]
+
+def test_model_api_failure_is_logged(client, model_api, caplog):
+    """A failed model API read is logged and answered with an empty result"""
+    model_api.failing_paths.add("/model/performance-trends")
+    response = client.get("/api/v1/model/performance-trends")
+    assert response.status_code == 200
+    assert response.json() == {}
+    assert any(
+        record.levelname == "ERROR" and record.getMessage().startswith("Error fetching performance trends: ")
+        for record in caplog.records
+    )
+
+def test_simulate_cutoff_change(client, model_api):
+    """A cutoff simulation is forwarded to the model API"""
+    response = client.post("/api/v1/model/simulate-cutoff", json={"cutoff": 0.6})
+    assert response.status_code == 200
+    assert response.json() == {"cutoff": 0.6, "approval_rate": 0.7}
+
+def test_simulate_cutoff_change_rejects_out_of_range_cutoff(client, model_api):
+    """Cutoffs outside [0, 1] are rejected without calling the model API"""
+    response = client.post("/api/v1/model/simulate-cutoff", json={"cutoff": 1.5})
+    assert response.status_code == 422
+    assert model_api.calls == []
+
+def test_model_dashboard_reads_are_cached(client, model_api):
+    """Metrics, cutoff and feature importance come from the shared cache on a repeat dashboard load"""
+    for _ in range(2):
+        response = client.get("/api/v1/model/dashboard")
+        assert response.status_code == 200
+        assert response.json()["cutoff"] == 0.55
+
+    assert sorted(model_api.calls) == [
+        ("GET", "/model/cutoff"),
+        ("GET", "/model/feature-importance"),
+        ("GET", "/model/metrics"),
+        ("GET", "/model/performance-trends"),
+        ("GET", "/model/performance-trends")
+    ]
+
+def test_model_predictions_for_large_user_lists(client, model_api):
+    """A long user list is predicted in chunks whose results are merged"""
+    user_ids = [f"user-{i}" for i in range(2 * PREDICTION_CHUNK_SIZE + 1)]
+    response = client.post("/api/v1/model/predictions", json={"user_ids": user_ids})
+    assert response.status_code == 200
+    assert response.json()["predictions"] == {user_id: 0.1 for user_id in user_ids}
+    assert model_api.calls == [("POST", "/model/predict")] * 3
@@ -0,0 +1,14 @@
+import orjson
+import pytest
+from decimal import Decimal
+
+from ..responses import json_bytes
+
+def test_json_bytes_encodes_decimal_as_number():
+    """Decimal amounts come out as JSON numbers, not strings"""
+    assert orjson.loads(json_bytes({"amount": Decimal("12.50")})) == {"amount": 12.5}
+
+def test_json_bytes_rejects_unknown_types():
+    """Types without an encoding raise instead of being stringified"""
+    with pytest.raises(TypeError):
+        json_bytes({"value": object()})
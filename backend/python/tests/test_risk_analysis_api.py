@@ -0,0 +1,76 @@
+import orjson
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import RiskAnalysis, Transaction, User
+
+@pytest.fixture
+async def user_with_transactions(db_session: AsyncSession):
+    """A user with three recent transactions, oldest first, and one from two months ago."""
+    now = datetime.utcnow()
+    db_session.add(User(id="user-1"))
+    db_session.add_all([
+        Transaction(
+            id=f"tx-{i}",
+            user_id="user-1",
+            amount=10.0 * (i + 1),
+            type="purchase",
+            status="completed",
+            created_at=now - timedelta(days=3 - i)
+        )
+        for i in range(3)
+    ])
+    db_session.add(Transaction(
+        id="tx-old",
+        user_id="user-1",
+        amount=99.0,
+        type="refund",
+        status="completed",
+        created_at=now - timedelta(days=60)
+    ))
+    await db_session.flush()
+    return "user-1"
+
+def test_transactions_stream_through_middleware_stack(client, user_with_transactions):
+    """A streamed body reaches the client whole through every middleware"""
+    response = client.get(f"/api/risk-analysis/{user_with_transactions}/transactions")
+    assert response.status_code == 200
+
+    lines = response.content.splitlines()
+    assert len(lines) == 3
+    assert [orjson.loads(line)["id"] for line in lines] == ["tx-0", "tx-1", "tx-2"]
+
+def test_transactions_stream_every_row_as_ndjson(client, user_with_transactions):
+    """Each transaction in the period comes back as one JSON line"""
+    response = client.get(
+        f"/api/risk-analysis/{user_with_transactions}/transactions",
+        params={"period": "30d"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [row["id"] for row in rows] == ["tx-0", "tx-1", "tx-2"]
+    assert [row["amount"] for row in rows] == [10.0, 20.0, 30.0]
+    assert all(row["type"] == "purchase" and row["status"] == "completed" for row in rows)
+    assert all(set(row) == {"id", "amount", "type", "status", "created_at"} for row in rows)
+
+def test_transactions_stream_is_empty_for_unknown_user(client):
+    """A user without transactions gets an empty stream, not an error"""
+    response = client.get("/api/risk-analysis/nobody/transactions")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content == b""
+
+async def test_every_risk_analysis_is_recorded(client, db_session: AsyncSession, user_with_transactions):
+    """Repeated analyses of a user each add a row to the analysis history"""
+    for _ in range(2):
+        response = client.get(f"/api/risk-analysis/{user_with_transactions}")
+        assert response.status_code == 200
+
+    recorded = await db_session.scalar(
+        select(func.count(RiskAnalysis.id)).where(RiskAnalysis.user_id == user_with_transactions)
+    )
+    assert recorded == 2
@@ -0,0 +1,58 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import CreditInquiry, RiskAnalysis, Transaction, User
+from ..services.risk_analysis import RiskAnalysisService
+
+@pytest.fixture
+async def scored_users(db_session: AsyncSession):
+    """Three users, one per risk segment, with recent activity and one row outside the period each."""
+    now = datetime.utcnow()
+    db_session.add_all([
+        User(id="low", risk_score=0.8),
+        User(id="medium", risk_score=0.5),
+        User(id="high", risk_score=0.1),
+        User(id="unscored")
+    ])
+    db_session.add_all([
+        Transaction(id="tx-1", user_id="low", amount=10.0, created_at=now - timedelta(days=1)),
+        Transaction(id="tx-2", user_id="high", amount=20.0, created_at=now - timedelta(days=2)),
+        Transaction(id="tx-old", user_id="low", amount=30.0, created_at=now - timedelta(days=60))
+    ])
+    db_session.add_all([
+        CreditInquiry(id="ci-1", user_id="low", status="approved", inquiry_date=now - timedelta(days=1)),
+        CreditInquiry(id="ci-2", user_id="medium", status="approved", inquiry_date=now - timedelta(days=2)),
+        CreditInquiry(id="ci-3", user_id="high", status="rejected", inquiry_date=now - timedelta(days=3)),
+        CreditInquiry(id="ci-4", user_id="high", status="pending", inquiry_date=now - timedelta(days=4)),
+        CreditInquiry(id="ci-old", user_id="high", status="approved", inquiry_date=now - timedelta(days=60))
+    ])
+    # Oldest first: the earlier half is all low, the later half is all high
+    db_session.add_all([
+        RiskAnalysis(id=f"ra-{i}", user_id="high", risk_level=level, analysis_date=now - timedelta(days=10 - i))
+        for i, level in enumerate(["low", "low", "high", "high"])
+    ])
+    await db_session.flush()
+    return ["low", "medium", "high", "unscored"]
+
+async def test_calculate_risk_metrics(db_session, scored_users):
+    """Counts, rates and segments cover only the given users within the period"""
+    metrics = await RiskAnalysisService(db_session).calculate_risk_metrics(scored_users)
+
+    assert metrics["total_transactions"] == 2
+    assert metrics["total_inquiries"] == 4
+    assert metrics["approval_rate"] == 0.5
+    assert metrics["default_rate"] == 0.5
+    assert metrics["user_segments"] == pytest.approx({"low_risk": 1 / 3, "medium_risk": 1 / 3, "high_risk": 1 / 3})
+    assert metrics["trends"] == {"default_rate_trend": "increasing", "transaction_frequency_impact": "moderate"}
+
+async def test_calculate_risk_metrics_without_activity(db_session, scored_users):
+    """Users with nothing recorded get zero rates and no trend"""
+    metrics = await RiskAnalysisService(db_session).calculate_risk_metrics(["unscored"])
+
+    assert metrics["total_transactions"] == 0
+    assert metrics["total_inquiries"] == 0
+    assert metrics["approval_rate"] == 0
+    assert metrics["default_rate"] == 0
+    assert metrics["user_segments"] == {"low_risk": 0, "medium_risk": 0, "high_risk": 0}
+    assert metrics["trends"]["default_rate_trend"] == "insufficient_data"
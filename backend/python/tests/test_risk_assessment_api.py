@@ -0,0 +1,78 @@
+import pytest
+
+from ..models import Feature, FeatureType
+
+@pytest.fixture
+async def features(db_session):
+    """Two numeric features for risk factors to point at."""
+    rows = [
+        Feature(name=name, data_type="numeric", feature_type=FeatureType.SQL_FIELD)
+        for name in ("income_level", "open_inquiries")
+    ]
+    db_session.add_all(rows)
+    await db_session.flush()
+    return [row.id for row in rows]
+
+def _create_factor(client, feature_id, **overrides):
+    factor = {
+        "feature_id": feature_id,
+        "weight": 0.5,
+        "threshold": 3,
+        "operator": "gt",
+        "risk_level": "high",
+        "description": "Above threshold",
+        **overrides
+    }
+    response = client.post("/api/v1/risk-factors", json=factor)
+    assert response.status_code == 200
+    return response.json()
+
+def test_create_and_list_risk_factors(client, features):
+    """Created risk factors are listed a page at a time"""
+    created = [_create_factor(client, feature_id) for feature_id in features]
+    assert [factor["feature_id"] for factor in created] == features
+
+    response = client.get("/api/v1/risk-factors", params={"page": 2, "page_size": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [created[1]["id"]]
+    assert {key: data[key] for key in ("total", "page", "page_size", "total_pages")} == {
+        "total": 2, "page": 2, "page_size": 1, "total_pages": 2
+    }
+
+def test_update_risk_factor(client, features):
+    """Only the fields sent are changed"""
+    factor = _create_factor(client, features[0])
+    response = client.put(f"/api/v1/risk-factors/{factor['id']}", json={"weight": 0.9})
+    assert response.status_code == 200
+    assert response.json()["weight"] == 0.9
+    assert response.json()["threshold"] == 3
+
+    assert client.put("/api/v1/risk-factors/999", json={"weight": 0.9}).status_code == 404
+
+def test_assess_risk_and_read_history(client, features):
+    """Matching factors score the assessment, which is then listed and counted"""
+    income, inquiries = features
+    _create_factor(client, income, operator="lt", threshold=1000, weight=0.2)
+    _create_factor(client, inquiries, operator="gte", threshold=3, weight=0.8)
+
+    response = client.post("/api/v1/assess", json={
+        "customer_id": "customer-1",
+        "features": {str(income): 5000, str(inquiries): 4},
+        "metadata": {"channel": "web"}
+    })
+    assert response.status_code == 200
+    assessment = response.json()
+    assert assessment["risk_score"] == pytest.approx(0.8)
+    assert assessment["risk_level"] == "high"
+    assert assessment["metadata"] == {"channel": "web"}
+    assert [factor["score"] for factor in assessment["factors"]] == [0, 0.8]
+
+    history = client.get("/api/v1/assessments/customer-1")
+    assert history.status_code == 200
+    assert [item["id"] for item in history.json()] == [assessment["id"]]
+
+    stats = client.get("/api/v1/assessments/stats")
+    assert stats.status_code == 200
+    assert stats.json()["total_assessments"] == 1
+    assert stats.json()["risk_level_distribution"] == {"high": 1, "medium": 0, "low": 0}
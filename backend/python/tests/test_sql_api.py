@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Feature, FeatureType, SqlSet, Tag
+
+@pytest.fixture
+async def sql_set_with_features(db_session: AsyncSession):
+    """A SQL set holding two tagged features, loaded fresh by the next request."""
+    sql_set = SqlSet(name="credit_bureau", description="Bureau pulls")
+    tags = [Tag(name="bureau"), Tag(name="monthly")]
+    db_session.add(sql_set)
+    db_session.add_all([
+        Feature(
+            name=name,
+            data_type="numeric",
+            feature_type=FeatureType.SQL_FIELD,
+            sql_set=sql_set,
+            tags=tags
+        )
+        for name in ("inquiry_count", "open_accounts")
+    ])
+    await db_session.flush()
+    sql_set_id = sql_set.id
+    # Requests get their own session in the app; start them from an empty identity map
+    db_session.expunge_all()
+    return sql_set_id
+
+def test_get_sql_set_features_includes_tags(client, sql_set_with_features):
+    """Features of a SQL set are listed with their tag names"""
+    response = client.get(f"/api/v1/sql/sets/{sql_set_with_features}/features")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["total"] == 2
+    assert [feature["name"] for feature in data["items"]] == ["inquiry_count", "open_accounts"]
+    assert all(sorted(feature["tags"]) == ["bureau", "monthly"] for feature in data["items"])
+
+def test_get_sql_set_features_unknown_set(client):
+    """A missing SQL set answers 404"""
+    response = client.get("/api/v1/sql/sets/999/features")
+    assert response.status_code == 404
+
+def test_sql_set_stats_follow_feature_writes(client, sql_set_with_features):
+    """Cached set statistics are dropped when a feature of the set changes"""
+    stats_url = f"/api/v1/sql/sets/{sql_set_with_features}/stats"
+    assert client.get(stats_url).json()["active_features"] == 2
+
+    feature_id = client.get(f"/api/v1/sql/sets/{sql_set_with_features}/features").json()["items"][0]["id"]
+    response = client.put(f"/api/v1/features/{feature_id}", json={"is_active": False})
+    assert response.status_code == 200
+    assert client.get(stats_url).json()["active_features"] == 1
+
+    response = client.delete(f"/api/v1/features/{feature_id}")
+    assert response.status_code == 200
+    assert client.get(stats_url).json()["total_features"] == 1
+
+def test_sql_set_stats_follow_set_update(client, sql_set_with_features):
+    """Cached set statistics show the set's new name after an update"""
+    stats_url = f"/api/v1/sql/sets/{sql_set_with_features}/stats"
+    assert client.get(stats_url).json()["name"] == "credit_bureau"
+
+    response = client.put(f"/api/v1/sql/sets/{sql_set_with_features}", json={"name": "bureau_pulls"})
+    assert response.status_code == 200
+    assert client.get(stats_url).json()["name"] == "bureau_pulls"
+
+def test_sql_set_stats_answer_conditional_get(client, sql_set_with_features):
+    """A repeat poll sending the stats ETag gets 304 and no body"""
+    response = client.get(f"/api/v1/sql/sets/{sql_set_with_features}/stats")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    unchanged = client.get(f"/api/v1/sql/sets/{sql_set_with_features}/stats", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["etag"] == etag
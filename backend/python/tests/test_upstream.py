@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ..upstream import feature_api_request
+
+class SlowFeatureAPI:
+    """Mock transport handler that holds every request until ``release`` is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return httpx.Response(200, json={"path": request.url.path})
+
+@pytest.fixture
+def feature_api():
+    return SlowFeatureAPI()
+
+def _client(feature_api: SlowFeatureAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="http://features.test", transport=httpx.MockTransport(feature_api))
+
+async def test_concurrent_identical_gets_share_one_request(feature_api):
+    """Two clients of the same API asking for the same URL cause one upstream call"""
+    async with _client(feature_api) as first, _client(feature_api) as second:
+        requests = [
+            asyncio.ensure_future(feature_api_request(client, "GET", "/features", params={"page": 1}))
+            for client in (first, second)
+        ]
+        await feature_api.started.wait()
+        feature_api.release.set()
+        responses = await asyncio.gather(*requests)
+
+    assert feature_api.calls == 1
+    assert [response.json() for response in responses] == [{"path": "/features"}] * 2
+
+async def test_cancelled_waiter_does_not_cancel_shared_request(feature_api):
+    """The remaining caller still gets the response after another one gives up"""
+    async with _client(feature_api) as client:
+        abandoned = asyncio.ensure_future(feature_api_request(client, "GET", "/features"))
+        waiting = asyncio.ensure_future(feature_api_request(client, "GET", "/features"))
+        await feature_api.started.wait()
+
+        abandoned.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+        feature_api.release.set()
+        response = await waiting
+
+    assert feature_api.calls == 1
+    assert response.status_code == 200
@@ -0,0 +1,93 @@
+from typing import Any, Dict, Hashable, Optional
+import asyncio
+import time
+
+import httpx
+
+class FeatureAPIUnavailable(httpx.HTTPError):
+    """Raised instead of calling the feature API while its circuit is open."""
+
+class CircuitBreaker:
+    """
+    Stop calling a failing dependency for ``reset_timeout`` seconds after
+    ``fail_max`` consecutive failures. After the pause calls are let through
+    again; the next failure reopens the circuit, a success closes it.
+    """
+
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
+
+# One breaker per process for the Feature Management API host, shared by the
+# feature and model services so an outage is detected once
+feature_api_breaker = CircuitBreaker(fail_max=5, reset_timeout=30)
+
+# Connection failures are retried this many times by the transport; requests
+# that reached the server are never resent
+FEATURE_API_CONNECT_RETRIES = 2
+
+# Upstream GETs currently in flight, so identical concurrent calls share one request
+_INFLIGHT_GETS: Dict[Hashable, "asyncio.Future[httpx.Response]"] = {}
+
+async def feature_api_request(client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Call the feature API through ``feature_api_breaker``. Transport errors,
+    timeouts and 5xx responses count as failures; 4xx responses do not.
+    A GET made while an identical GET is in flight waits for that one's response.
+    """
+    if method != "GET" or not kwargs.keys() <= {"params"}:
+        return await _send(client, method, url, **kwargs)
+
+    # Keyed on what is requested, not on which client asks, so every client of the same API shares it
+    params = tuple(sorted(httpx.QueryParams(kwargs.get("params")).multi_items()))
+    key = (str(client.base_url), url, params)
+    request = _INFLIGHT_GETS.get(key)
+    if request is None:
+        request = asyncio.ensure_future(_send(client, method, url, **kwargs))
+        _INFLIGHT_GETS[key] = request
+
+        def forget(done: "asyncio.Future[httpx.Response]") -> None:
+            if _INFLIGHT_GETS.get(key) is done:
+                del _INFLIGHT_GETS[key]
+            if not done.cancelled():
+                done.exception()  # retrieved here in case every waiter was cancelled
+
+        request.add_done_callback(forget)
+    # One waiter being cancelled must not cancel the request for the others
+    return await asyncio.shield(request)
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    if not feature_api_breaker.allow():
+        raise FeatureAPIUnavailable("Feature API circuit is open")
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.TransportError:
+        feature_api_breaker.record_failure()
+        raise
+    if response.is_server_error:
+        feature_api_breaker.record_failure()
+    else:
+        feature_api_breaker.record_success()
+    return response